@@ -6,21 +6,123 @@
 # -----------------------------------------------------------------------------
 # OpenGL registry parser
 # See https://github.com/KhronosGroup/OpenGL-Registry/tree/master/xml
+#
+# The xml registry is compiled into an index (enum and command names, values
+# and prototypes plus a feature/item incidence table) that is cached on disk
+# (keyed by the hash of the xml file) such that the xml only needs to be
+# parsed once. API resolution is then made of array operations on the table.
+#
+# A minimal loader (python module with enum constants and commands that are
+# only bound, using ctypes, when first called) can be generated for a given
+# api, version and profile.
 # -----------------------------------------------------------------------------
-import re
+import os
+import pickle
+import hashlib
+import numpy as np
 from lxml import etree
 
 
+# ctypes equivalent of GL types (pointers are handled separately)
+TYPES = {
+    "void":                 "None",
+    "GLenum":               "ctypes.c_uint",
+    "GLboolean":            "ctypes.c_ubyte",
+    "GLbitfield":           "ctypes.c_uint",
+    "GLbyte":               "ctypes.c_byte",
+    "GLubyte":              "ctypes.c_ubyte",
+    "GLshort":              "ctypes.c_short",
+    "GLushort":             "ctypes.c_ushort",
+    "GLint":                "ctypes.c_int",
+    "GLuint":               "ctypes.c_uint",
+    "GLsizei":              "ctypes.c_int",
+    "GLfixed":              "ctypes.c_int",
+    "GLclampx":             "ctypes.c_int",
+    "GLfloat":              "ctypes.c_float",
+    "GLclampf":             "ctypes.c_float",
+    "GLdouble":             "ctypes.c_double",
+    "GLclampd":             "ctypes.c_double",
+    "GLhalfNV":             "ctypes.c_ushort",
+    "GLhandleARB":          "ctypes.c_uint",
+    "GLint64":              "ctypes.c_int64",
+    "GLint64EXT":           "ctypes.c_int64",
+    "GLuint64":             "ctypes.c_uint64",
+    "GLuint64EXT":          "ctypes.c_uint64",
+    "GLintptr":             "ctypes.c_ssize_t",
+    "GLintptrARB":          "ctypes.c_ssize_t",
+    "GLsizeiptr":           "ctypes.c_ssize_t",
+    "GLsizeiptrARB":        "ctypes.c_ssize_t",
+    "GLvdpauSurfaceNV":     "ctypes.c_ssize_t",
+}
+
+# Header of generated loaders
+LOADER = '''# -----------------------------------------------------------------------------
+# OpenGL loader for %(api)s %(version)s %(profile)s
+# Generated by registry.py (do not edit)
+# -----------------------------------------------------------------------------
+import ctypes
+import ctypes.util
+
+
+class Pointer(ctypes.c_void_p):
+    """ Pointer parameter (accepts None, addresses, bytes and numpy arrays) """
+
+    @classmethod
+    def from_param(cls, value):
+        if value is None or isinstance(value, int):
+            return ctypes.c_void_p(value)
+        if isinstance(value, bytes):
+            return ctypes.c_char_p(value)
+        if hasattr(value, "__array_interface__"):
+            return ctypes.c_void_p(value.__array_interface__["data"][0])
+        return value
+
+
+_library = None
+
+def _get_proc_address(name):
+    """ Default resolution (symbol of the system GL library) """
+
+    global _library
+    if _library is None:
+        _library = ctypes.CDLL(ctypes.util.find_library("GL"))
+    try:
+        return ctypes.cast(getattr(_library, name), ctypes.c_void_p).value
+    except AttributeError:
+        return None
+
+def set_proc_address(function):
+    """ Use the given function (name -> address) to resolve commands """
+
+    global _get_proc_address
+    _get_proc_address = function
+
+def _bind(name):
+    """ Resolve a command and replace its stub """
+
+    restype, argtypes = _prototypes[name]
+    address = _get_proc_address(name)
+    if not address:
+        raise RuntimeError("%%s is not available" %% name)
+    function = ctypes.CFUNCTYPE(restype, *argtypes)(address)
+    _functions[name] = function
+    globals()[name] = function
+    return function
+
+def _call(name, args):
+    function = _functions.get(name) or _bind(name)
+    return function(*args)
+
+_functions = {}
+'''
+
+
 class Node:
     """ Represents a registry element """
 
     def __init__(self, node):
-        self.required = False
         self.node = node
 
-    def reset(self):
-        self.required = False
-
     def find(self, key):
         return self.node.find(key)
 
@@ -33,31 +135,211 @@ class Node:
         return self.node.findall(key)
 
 
+class Index(object):
+    """
+    Compiled registry
+
+    Enums and commands are identified by their position in the enums and
+    commands lists. Features and extensions (sources) are described by an
+    incidence table whose rows are (source, action, kind, item, api, profile)
+    and are sorted by source, requirements coming before removals such that
+    the last action on an item wins.
+
+    Parameters
+    ----------
+    data : dict
+        Index data (as returned by compile)
+    """
+
+    VERSION = 2
+    REMOVE, REQUIRE = 0, 1
+    ENUM, COMMAND = 0, 1
+
+    def __init__(self, data):
+        self.__dict__.update(data)
+
+    @staticmethod
+    def compile(registry):
+        """ Compile a (parsed) registry into index data """
+
+        # Enums and commands (unique names)
+        enums, values = [], {}
+        for key, node in registry.enums.items():
+            name = key[0] if isinstance(key, tuple) else key
+            if name not in values:
+                enums.append(name)
+                values[name] = node.get("value")
+            values[key] = node.get("value")
+
+        commands, prototypes = [], {}
+        for key, node in registry.commands.items():
+            name = key[0] if isinstance(key, tuple) else key
+            if name not in prototypes:
+                commands.append(name)
+                prototypes[name] = Index._prototype(node)
+        enum = {name: i for i, name in enumerate(enums)}
+        command = {name: i for i, name in enumerate(commands)}
+
+        # Features and extensions
+        sources = ([("feature", node.get("api"), node.get("number"))
+                    for node in registry.features.values()] +
+                   [("extension", name,
+                     frozenset(node.get("supported").split("|")))
+                    for name, node in registry.extensions.items()])
+
+        # Extensions by vendor (GL_<vendor>_<name>)
+        vendors = {}
+        for i, (kind, name, supported) in enumerate(sources):
+            if kind == "extension":
+                vendors.setdefault(name.split("_")[1], []).append(i)
+        strings = [None]
+        rows = []
+        nodes = (list(registry.features.values()) +
+                 list(registry.extensions.values()))
+        for source, node in enumerate(nodes):
+            for tag, action in (("require", Index.REQUIRE),
+                                ("remove", Index.REMOVE)):
+                for request in node.findall(tag):
+                    attributes = []
+                    for key in "api", "profile":
+                        value = request.get(key)
+                        if value not in strings:
+                            strings.append(value)
+                        attributes.append(strings.index(value))
+                    for kind, ids in ((Index.ENUM, enum),
+                                      (Index.COMMAND, command)):
+                        element = "enum" if kind == Index.ENUM else "command"
+                        for item in request.findall(element):
+                            name = item.get("name")
+                            if name in ids:
+                                rows.append([source, action, kind, ids[name]]
+                                            + attributes)
+        table = np.array(rows, dtype=np.int32).reshape(-1, 6)
+        return { "enums": enums, "values": values,
+                 "commands": commands, "prototypes": prototypes,
+                 "sources": sources, "vendors": vendors, "strings": strings,
+                 "version": Index.VERSION,
+                 "source": table[:,0], "action": table[:,1].astype(np.int8),
+                 "kind": table[:,2].astype(np.int8), "item": table[:,3],
+                 "api": table[:,4].astype(np.int16),
+                 "profile": table[:,5].astype(np.int16) }
+
+    @staticmethod
+    def _prototype(node):
+        """ (return type, [(parameter type, parameter name), ...]) """
+
+        def split(node):
+            text = "".join(node.itertext())
+            name = node.find("name").text
+            return " ".join(text[:text.rindex(name)].split()), name
+
+        restype, name = split(node.find("proto"))
+        return restype, [split(param) for param in node.findall("param")]
+
+    def _string(self, value):
+        """ Id of the given attribute value (None if unknown) """
+
+        if value in self.strings:
+            return self.strings.index(value)
+        return None
+
+    def rows(self, sources, api, profile):
+        """
+        Rows of the incidence table for the given sources
+
+        Parameters
+        ----------
+        sources : np.ndarray
+            Boolean mask of selected sources
+
+        api, profile : str
+            Requests with a different api/profile attribute are ignored
+
+        Returns
+        -------
+        Sorted indices of the selected rows
+        """
+
+        rows = sources[self.source]
+        for column, value in (self.api, api), (self.profile, profile):
+            rows &= (column == 0) | (column == self._string(value))
+        return np.flatnonzero(rows)
+
+    def apply(self, rows, enums, commands):
+        """
+        Apply (in order) the requirements and removals of the given rows to
+        enums and commands boolean masks (in place)
+        """
+
+        for kind, required in (self.ENUM, enums), (self.COMMAND, commands):
+            R = rows[self.kind[rows] == kind]
+            last = np.full(len(required), -1)
+            np.maximum.at(last, self.item[R], R)
+            touched = last >= 0
+            required[touched] = self.action[last[touched]] == self.REQUIRE
+
+    def resolve(self, sources, api, profile):
+        """
+        Resolve enums and commands for the given sources
+
+        Returns
+        -------
+        (enums, commands) boolean masks of required items
+        """
+
+        enums = np.zeros(len(self.enums), dtype=bool)
+        commands = np.zeros(len(self.commands), dtype=bool)
+        self.apply(self.rows(sources, api, profile), enums, commands)
+        return enums, commands
+
+
+def parse_version(version):
+    """ Numeric version ("4.10" -> (4, 10)) """
+
+    return tuple(int(number) for number in version.split("."))
+
+
 class Registry(object):
     """ OpenGL Registry """
 
     def __init__(self):
         self.tree = None
-
-    def load(self, xml):
-        """ Load the given xml registry and parse it """
-
-        self.tree = etree.parse(xml)
-        self.parse()
-
-    def reset(self):
+        self.xml = None
+        self.index = None
+
+    def __getattr__(self, name):
+        # Xml nodes are only parsed when needed (index may come from cache)
+        nodes = "enums", "commands", "features", "extensions"
+        if name in nodes and self.xml:
+            self.tree = etree.parse(self.xml)
+            self.parse()
+            return getattr(self, name)
+        raise AttributeError(name)
+
+    def load(self, xml, cache=True):
         """
-        Reset type/enum/command dictionaries before generating another API
+        Load the given xml registry and compile it. The compiled index is
+        stored next to the xml file and reused as long as the xml file is
+        unchanged.
         """
 
-        # for item in self.types.values():
-        #     item.reset()
-        for item in self.enums.values():
-            item.reset()
-        for item in self.commands.values():
-            item.reset()
-        for item in self.features.values():
-            item.reset()
+        self.xml = xml
+        with open(xml, "rb") as file:
+            digest = hashlib.sha1(file.read()).hexdigest()
+        filename = xml + ".cache"
+        if cache and os.path.exists(filename):
+            with open(filename, "rb") as file:
+                data = pickle.load(file)
+            if (data.get("digest") == digest and
+                data.get("version") == Index.VERSION):
+                self.index = Index(data)
+                return
+        data = Index.compile(self)
+        data["digest"] = digest
+        self.index = Index(data)
+        if cache:
+            with open(filename, "wb") as file:
+                pickle.dump(data, file, pickle.HIGHEST_PROTOCOL)
 
     def parse(self):
         """ Parse the current xml registry """
@@ -122,17 +404,6 @@ class Registry(object):
                 key = node.get('name'), node.get('api')
             self.extensions[key] = Node(node)
 
-    def match(self, element, api, profile):
-        """ Check whether an element match a given api and profile """
-
-        if 'api' in element.attrib:
-            if api != element.get('api'):
-                return False
-        if 'profile' in element.attrib:
-            if profile != element.get('profile'):
-                return False
-        return True
-
     def get_extension(self, api="gl", vendor=None):
         """ Get a specific extension """
 
@@ -143,95 +414,146 @@ class Registry(object):
         #            "OML", "PGI", "QCOM", "S3", "SGIS", "SGIX", "SUNX",
         #            "SUN", "VIV", "WIN"]
 
-        prefix = "GL_%s_" % vendor
         extensions = {}
-        for name, extension in self.extensions.items():
-            if name.startswith(prefix):
-                supported = re.compile(extension.get("supported"))
-                if re.match(supported, api):
-                    extensions[name] = extension
+        for i in np.flatnonzero(self._extensions(api, [vendor])):
+            name = self.index.sources[i][1]
+            extensions[name] = self.extensions[name]
         return extensions
 
-    def get_api(self, api="gl", version="2.1", profile=None, extensions=[]):
-        """ Get a specific api as lists of enums and functions """
-
-        self.reset()
-
-        # Find all requested features (any version <= given version)
-        features = []
-        for feature in self.features.values():
-            if feature.get("api") == api and feature.get("number") <= version:
-                features.append(feature)
+    def _features(self, api):
+        """ Feature sources of the given api, sorted by version """
 
-        # Find all requested extensions (by vendor)
-        for vendor in extensions:
-            prefix = "GL_%s_" % vendor
-            for name, extension in self.extensions.items():
-                if name.startswith(prefix):
-                    supported = re.compile(extension.get("supported"))
-                    if re.match(supported, api):
-                        features.append(extension)
+        features = [(parse_version(number), i)
+                    for i, (kind, name, number) in enumerate(self.index.sources)
+                    if kind == "feature" and name == api]
+        return sorted(features)
 
-        # Tag all elements related to a feature
-        for feature in features:
+    def _extensions(self, api, vendors):
+        """ Boolean mask of extension sources (by vendor) """
 
-            # Tag required items
-            for request in feature.findall("require"):
-                if not self.match(request, api, profile):
-                    continue
+        sources = np.zeros(len(self.index.sources), dtype=bool)
+        for vendor in set(vendors):
+            for i in self.index.vendors.get(vendor, []):
+                if api in self.index.sources[i][2]:
+                    sources[i] = True
+        return sources
 
-                for item in request.findall('enum'):
-                    name = item.get("name")
-                    self.enums[name].required = True
+    def _items(self, E, C, api):
+        """ Enums and commands dictionaries from boolean masks """
 
-                for item in request.findall('command'):
-                    name = item.get("name")
-                    self.commands[name].required = True
-
-            # Tag removed items
-            for request in feature.findall("remove"):
+        index = self.index
+        enums = {}
+        for i in np.flatnonzero(E):
+            name = index.enums[i]
+            enums[name] = index.values.get((name, api), index.values[name])
+        commands = {}
+        for i in np.flatnonzero(C):
+            name = index.commands[i]
+            commands[name] = index.prototypes[name]
+        return enums, commands
 
-                if not self.match(request, api, profile):
-                    continue
+    def get_api(self, api="gl", version="2.1", profile=None, extensions=[]):
+        """
+        Get a specific api as dictionaries of enums (name -> value) and
+        commands (name -> prototype)
+        """
 
-                for item in request.findall('enum'):
-                    name = item.get("name")
-                    self.enums[name].required = False
+        # Find all requested features (any version <= given version) and
+        # extensions (by vendor) that are applied after features
+        sources = np.zeros(len(self.index.sources), dtype=bool)
+        for number, i in self._features(api):
+            if number <= parse_version(version):
+                sources[i] = True
+        sources |= self._extensions(api, extensions)
+        E, C = self.index.resolve(sources, api, profile)
+        return self._items(E, C, api)
+
+    def get_apis(self, api="gl", profile=None, extensions=[]):
+        """
+        Get all versions of a specific api in a single ordered sweep: each
+        feature applies its requirements and removals to the enums and
+        commands of the previous version.
+
+        Returns
+        -------
+        Dictionary version -> (enums, commands) sorted by version (enums and
+        commands as returned by get_api)
+        """
 
-                for item in request.findall('command'):
-                    name = item.get("name")
-                    self.commands[name].required = False
+        index = self.index
+        features = self._features(api)
+        sources = np.zeros(len(index.sources), dtype=bool)
+        sources[[i for number, i in features]] = True
+        rows = index.rows(sources, api, profile)
+        extra = index.rows(self._extensions(api, extensions), api, profile)
+        start = np.searchsorted(index.source[rows], [i for _, i in features])
+        stop = np.searchsorted(index.source[rows], [i for _, i in features],
+                               side="right")
+
+        E = np.zeros(len(index.enums), dtype=bool)
+        C = np.zeros(len(index.commands), dtype=bool)
+        apis = {}
+        for (number, i), first, last in zip(features, start, stop):
+            index.apply(rows[first:last], E, C)
+            version = ".".join(str(n) for n in number)
+            if len(extra):
+                E_, C_ = E.copy(), C.copy()
+                index.apply(extra, E_, C_)
+                apis[version] = self._items(E_, C_, api)
+            else:
+                apis[version] = self._items(E, C, api)
+        return apis
+
+
+    def loader(self, api="gl", version="2.1", profile=None, extensions=[]):
+        """
+        Generate a loader for a specific api
 
-        # Retrieve requested enums
-        enums = {}
-        for name, value in self.enums.items():
-            if self.enums[name].required:
-                enums[name] = value
+        The loader is a python module that defines enum constants and a stub
+        for each command. The actual command is resolved (using ctypes) when
+        first called and then replaces its stub.
 
-        # Retrieve requested commands
-        commands = {}
-        for name, value in self.commands.items():
-            if self.commands[name].required:
-                commands[name] = value
+        Returns
+        -------
+        Source code of the loader
+        """
 
-        return enums, commands
+        def ctype(name, pointer="Pointer"):
+            if "*" in name:
+                return pointer
+            name = name.replace("const", "").strip()
+            return TYPES.get(name, "ctypes.c_void_p")
+
+        enums, commands = self.get_api(api, version, profile, extensions)
+        lines = [LOADER % { "api": api, "version": version,
+                            "profile": profile or ""}]
+        lines.append("_prototypes = {")
+        for name, (restype, params) in sorted(commands.items()):
+            argtypes = [ctype(ptype) for ptype, _ in params]
+            argtypes = ", ".join(argtypes) + ("," if len(argtypes) == 1 else "")
+            restype = ctype(restype, "ctypes.c_void_p")
+            lines.append("    %r: (%s, (%s))," % (name, restype, argtypes))
+        lines.append("}\n")
+        for name, value in sorted(enums.items()):
+            lines.append("%s = %s" % (name, value))
+        for name, (restype, params) in sorted(commands.items()):
+            params = ", ".join("%s %s" % param for param in params)
+            lines.append("\ndef %s(*args):" % name)
+            lines.append('    """ %s %s(%s) """' % (restype, name, params))
+            lines.append("    return _call(%r, args)" % name)
+        return "\n".join(lines) + "\n"
 
 
 if __name__ == '__main__':
 
     registry = Registry()
     registry.load("./gl.xml")
-    versions = ["1.0", "1.1", "1.2", "1.3", "1.4", "1.5",
-                "2.0", "2.1",
-                "3.0", "3.1", "3.2", "3.3",
-                "4.0", "4.1", "4.2", "4.3", "4.4", "4.5", "4.6"]
-    for version in versions:
-        enums, commands = registry.get_api("gl", version, "core", extensions=[])
+    for version, (enums, commands) in registry.get_apis("gl", "core").items():
 
         for enum in enums.keys():
             if 'SHADER' in enum:
                 print(enum)
-        
+
         print("GL %s:  %4d constants, %3d functions" %
               (version, len(enums), len(commands)))
 
@@ -6,6 +6,7 @@
 # -----------------------------------------------------------------------------
 import numpy as np
 from glumpy import app, gloo, gl
+from sdf import Circle, shader
 
 vertex = """
     attribute vec2 position;
@@ -15,28 +16,7 @@ vertex = """
         gl_Position = vec4(position, 0.0, 1.0);
     } """
 
-fragment = """
-  float circle(vec2 p, float radius)
-  {
-      return length(p) - radius;
-  }
-
-  vec4 color(float d)
-  {
-      vec3 white = vec3(1.0, 1.0, 1.0);
-      vec3 blue  = vec3(0.1, 0.4, 0.7);
-      vec3 color = white - sign(d)*blue;
-      color *= (1.0 - exp(-4.0*abs(d))) * (0.8 + 0.2*cos(140.0*d));
-      color = mix(color, white, 1.0-smoothstep(0.0,0.02,abs(d)) );
-      return vec4(color, 1.0);
-  }
-
-  varying vec2 v_position;
-  uniform float radius;
-  void main() {
-      float d = circle(v_position, radius);
-      gl_FragColor = color(d);
-    } """
+fragment = shader(Circle((0.0, 0.0), "radius"), position="v_position")
 
 
 window = app.Window(512, 512)
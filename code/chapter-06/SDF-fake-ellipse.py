@@ -6,6 +6,7 @@
 # -----------------------------------------------------------------------------
 import numpy as np
 from glumpy import app, gloo, gl
+from sdf import palette
 
 vertex = """
     attribute vec2 position;
@@ -15,7 +16,7 @@ vertex = """
         gl_Position = vec4(position, 0.0, 1.0);
     } """
 
-fragment = """
+fragment = palette + """
   float SDF_fake_ellipse(vec2 p, vec2 size)
   {
       float r = 0.2;
@@ -24,16 +25,6 @@ fragment = """
       return f*(f-r)/length(p*size*size);
   }
 
-  vec4 color(float d)
-  {
-      vec3 white = vec3(1.0, 1.0, 1.0);
-      vec3 blue  = vec3(0.1, 0.4, 0.7);
-      vec3 color = white - sign(d)*blue;
-      color *= (1.0 - exp(-4.0*abs(d))) * (0.8 + 0.2*cos(140.0*d));
-      color = mix(color, white, 1.0-smoothstep(0.0,0.02,abs(d)) );
-      return vec4(color, 1.0);
-  }
-
   varying vec2 v_position;
   uniform vec2 size;
   void main()
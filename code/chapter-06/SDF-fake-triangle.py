@@ -6,6 +6,7 @@
 # -----------------------------------------------------------------------------
 import numpy as np
 from glumpy import app, gloo, gl
+from sdf import FakeTriangle, shader
 
 vertex = """
     attribute vec2 position;
@@ -15,41 +16,7 @@ vertex = """
         gl_Position = vec4(position, 0.0, 1.0);
     } """
 
-fragment = """
-  float SDF_fake_triangle(vec2 p0, vec2 p1, vec2 p2, vec2 p)
-  {
-      vec2 e0 = p1 - p0;
-      vec2 e1 = p2 - p1;
-      vec2 e2 = p0 - p2;
-
-      vec2 v0 = p - p0;
-      vec2 v1 = p - p1;
-      vec2 v2 = p - p2;
-
-      vec2 o0 = normalize(vec2(e0.y, -e0.x));
-      vec2 o1 = normalize(vec2(e1.y, -e1.x));
-      vec2 o2 = normalize(vec2(e2.y, -e2.x));
-
-      return max(max(dot(o0,v0),  dot(o1,v1)), dot(o2,v2));
-  }
-
-  vec4 color(float d)
-  {
-      vec3 white = vec3(1.0, 1.0, 1.0);
-      vec3 blue  = vec3(0.1, 0.4, 0.7);
-      vec3 color = white - sign(d)*blue;
-      color *= (1.0 - exp(-4.0*abs(d))) * (0.8 + 0.2*cos(140.0*d));
-      color = mix(color, white, 1.0-smoothstep(0.0,0.02,abs(d)) );
-      return vec4(color, 1.0);
-  }
-
-  varying vec2 v_position;
-  uniform vec2 p0, p1, p2;
-  void main()
-  {
-      float d = SDF_fake_triangle(p0, p1, p2, v_position);
-      gl_FragColor = color(d);
-  } """
+fragment = shader(FakeTriangle("p0", "p1", "p2"), position="v_position")
 
 window = app.Window(512, 512)
 quad = gloo.Program(vertex, fragment, count=4)
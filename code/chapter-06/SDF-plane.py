@@ -6,6 +6,7 @@
 # -----------------------------------------------------------------------------
 import numpy as np
 from glumpy import app, gloo, gl
+from sdf import Plane, shader
 
 vertex = """
     attribute vec2 position;
@@ -15,31 +16,7 @@ vertex = """
         gl_Position = vec4(position, 0.0, 1.0);
     } """
 
-fragment = """
-  float SDF_plane(vec2 p0, vec2 p1, vec2 p)
-  {
-    vec2 T = p1 - p0;
-    vec2 O = normalize(vec2(T.y, -T.x));
-    return dot(O, p0 - p);
-  }
-
-  vec4 color(float d)
-  {
-      vec3 white = vec3(1.0, 1.0, 1.0);
-      vec3 blue  = vec3(0.1, 0.4, 0.7);
-      vec3 color = white - sign(d)*blue;
-      color *= (1.0 - exp(-4.0*abs(d))) * (0.8 + 0.2*cos(140.0*d));
-      color = mix(color, white, 1.0-smoothstep(0.0,0.02,abs(d)) );
-      return vec4(color, 1.0);
-  }
-
-  varying vec2 v_position;
-  uniform vec2 p0, p1;
-  void main()
-  {
-      float d = SDF_plane(p0, p1, v_position);
-      gl_FragColor = color(d);
-  } """
+fragment = shader(Plane("p0", "p1"), position="v_position")
 
 
 window = app.Window(512, 512)
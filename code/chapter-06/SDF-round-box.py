@@ -6,6 +6,7 @@
 # -----------------------------------------------------------------------------
 import numpy as np
 from glumpy import app, gloo, gl
+from sdf import RoundBox, shader
 
 vertex = """
     attribute vec2 position;
@@ -15,28 +16,7 @@ vertex = """
         gl_Position = vec4(position, 0.0, 1.0);
     } """
 
-fragment = """
-  #include "./SDF-palette.glsl"
-
-  float SDF_box(vec2 p, vec2 size)
-  {
-       vec2 d = abs(p) - size;
-       return min(max(d.x,d.y),0.0) + length(max(d,0.0));
-  }
-
-  float SDF_round_box(vec2 p, vec2 size, float radius)
-  {
-       return SDF_box(p, size) - radius;
-  }
-
-  varying vec2 v_position;
-  uniform vec2 size;
-  void main()
-  {
-      float radius = 0.1;
-      float d = SDF_round_box(v_position, size, radius);
-      gl_FragColor = color(d);
-  } """
+fragment = shader(RoundBox((0.0, 0.0), "size", 0.1), position="v_position")
 
 
 window = app.Window(512, 512)
@@ -5,6 +5,7 @@
 # Distributed under the 2-Clause BSD License.
 # -----------------------------------------------------------------------------
 from glumpy import app, gloo, gl
+from sdf import palette
 
 vertex = """
     attribute vec2 position;
@@ -14,7 +15,7 @@ vertex = """
         gl_Position = vec4(position, 0.0, 1.0);
     } """
 
-fragment = """
+fragment = palette + """
   float segment_distance(vec2 P1, vec2 P2, vec2 P)
   {
       // Tangent vector to the segment
@@ -60,16 +61,6 @@ fragment = """
     return -min(min(d1,d2),d3);
   }
 
-  vec4 color(float d)
-  {
-      vec3 white = vec3(1.0, 1.0, 1.0);
-      vec3 blue  = vec3(0.1, 0.4, 0.7);
-      vec3 color = white - sign(d)*blue;
-      color *= (1.0 - exp(-4.0*abs(d))) * (0.8 + 0.2*cos(140.0*d));
-      color = mix(color, white, 1.0-smoothstep(0.0,0.02,abs(d)) );
-      return vec4(color, 1.0);
-  }
-
   varying vec2 v_position;
   void main()
   {
@@ -0,0 +1,203 @@
+# -----------------------------------------------------------------------------
+# Python & OpenGL for Scientific Visualization
+# www.labri.fr/perso/nrougier/python+opengl
+# Copyright (c) 2018, Nicolas P. Rougier
+# Distributed under the 2-Clause BSD License.
+# -----------------------------------------------------------------------------
+# Reference (CPU) rasterizer: coverage of triangles over a pixel grid, either
+# using a sample pattern (supersampling) or the signed distance to triangles.
+# The grid is processed by tiles: tiles outside (or fully inside) a triangle
+# are classified using their corners only and samples are only evaluated for
+# tiles that are crossed by an edge.
+#
+# Pixel (i,j) covers [j,j+1] x [i,i+1] (row 0 is the bottom row, as in OpenGL).
+# -----------------------------------------------------------------------------
+import numpy as np
+
+
+N4 = np.linspace(0,1,9, endpoint=True)[1:-1:2]
+G4 = np.dstack(np.meshgrid(N4,N4)).reshape(len(N4)**2,2)
+N8 = np.linspace(0,1,17, endpoint=True)[1:-1:2]
+G8 = np.dstack(np.meshgrid(N8,N8)).reshape(len(N8)**2,2)
+offsets = { "1 sample"   : [(0.5,0.5)],
+            "1x2 sample" : [(0.50, 0.25), (0.50, 0.75)],
+            "2x1 sample" : [(0.25, 0.50), (0.75, 0.50)],
+            "quincux"    : [(.05,.05), (.95,.05), (.05,.95), (.95,.95), (0.5,0.5)],
+            "2x2 grid"   : [(0.25,0.25), (0.75,0.25), (0.25,0.75), (0.75,0.75)],
+            "2x2 RGSS"   : G4[[2,4,11,13]],
+            "4x4 checker": G4[[0,2,5,7,8,10,13,15]],
+            "8 rooks"    : G8[[4,10,16,30,33,47,53,59]],
+            "4x4 grid"   : G4,
+            "8x8 checker": G8[[ 0, 2, 4, 6, 9,11,13,15,16,18,20,22,25,27,29,31,
+                               32,34,36,38,41,43,45,47,48,50,52,54,57,59,61,63]],
+            "8x8 grid"   : G8 }
+
+
+def _triangles(triangles):
+    """ Non degenerated (n,3,2) counterclockwise triangles """
+
+    T = np.array(triangles, dtype=float).reshape(-1,3,2)
+    A, B, C = T[:,0], T[:,1], T[:,2]
+    area = (B[:,0]-A[:,0])*(C[:,1]-A[:,1]) - (B[:,1]-A[:,1])*(C[:,0]-A[:,0])
+    T[area < 0] = T[area < 0][:,::-1]
+    return T[area != 0]
+
+
+def _edges(T):
+    """
+    Edge functions E(x,y) = a*x + b*y + c (positive inside) and whether
+    samples exactly on the edge are inside (top-left rule).
+    """
+
+    D = T[:,[1,2,0]] - T
+    a, b = -D[...,1], D[...,0]
+    c = -(a*T[...,0] + b*T[...,1])
+    topleft = (D[...,1] < 0) | ((D[...,1] == 0) & (D[...,0] < 0))
+    return a, b, c, topleft
+
+
+def _tiles(shape, tile):
+    """ Iterate over (y0, y1, x0, x1) tiles """
+
+    height, width = shape
+    for y0 in range(0, height, tile):
+        for x0 in range(0, width, tile):
+            yield y0, min(y0+tile, height), x0, min(x0+tile, width)
+
+
+def coverage(triangles, shape, offsets=[(0.5,0.5)], tile=64):
+    """
+    Coverage of triangles using a sample pattern
+
+    Parameters
+    ----------
+    triangles : np.ndarray
+        (3,2) or (n,3,2) triangles (pixel coordinates)
+
+    shape : (int, int)
+        Height and width of the grid
+
+    offsets : np.ndarray
+        (k,2) sample positions inside a pixel (in [0,1])
+
+    tile : int
+        Size of tiles
+
+    Returns
+    -------
+    (height, width) float32 array of the ratio of samples that are inside
+    (at least) one triangle.
+    """
+
+    T = _triangles(triangles)
+    a, b, c, topleft = _edges(T)
+    O = np.asarray(offsets, dtype=float).reshape(-1,2)
+    vmin, vmax = T.min(axis=1), T.max(axis=1)
+    Z = np.zeros(shape, dtype=np.float32)
+
+    for y0, y1, x0, x1 in _tiles(shape, tile):
+        # Extent of samples inside the tile
+        xmin, xmax = x0 + O[:,0].min(), x1 - 1 + O[:,0].max()
+        ymin, ymax = y0 + O[:,1].min(), y1 - 1 + O[:,1].max()
+        candidates = np.flatnonzero((vmin[:,0] <= xmax) & (vmax[:,0] >= xmin) &
+                                    (vmin[:,1] <= ymax) & (vmax[:,1] >= ymin))
+        if not len(candidates):
+            continue
+
+        # Edge functions at tile corners (they're linear)
+        E = [a[candidates]*x + b[candidates]*y + c[candidates]
+             for x in (xmin, xmax) for y in (ymin, ymax)]
+        lower, upper = np.minimum.reduce(E), np.maximum.reduce(E)
+        if (lower > 0).all(axis=-1).any():
+            Z[y0:y1,x0:x1] = 1
+            continue
+        crossed = (upper >= 0).all(axis=-1)
+        candidates, lower = candidates[crossed], lower[crossed]
+        if not len(candidates):
+            continue
+
+        # Samples evaluation (edge functions by broadcast), edges that are
+        # on the inner side of the whole tile being skipped
+        X = x0 + np.arange(x1-x0) + O[:,0,np.newaxis]
+        Y = y0 + np.arange(y1-y0) + O[:,1,np.newaxis]
+        X, Y = X[:,np.newaxis,:], Y[:,:,np.newaxis]
+        inside = np.zeros((len(O), y1-y0, x1-x0), dtype=bool)
+        for t, bounds in zip(candidates, lower):
+            covered = ~inside
+            for e in np.flatnonzero(bounds <= 0):
+                compare = np.greater_equal if topleft[t,e] else np.greater
+                covered &= compare(a[t,e]*X, -(b[t,e]*Y + c[t,e]))
+            inside |= covered
+        Z[y0:y1,x0:x1] = inside.mean(axis=0)
+    return Z
+
+
+def sdf(triangles, X, Y):
+    """
+    Signed distance to the union of triangles (negative inside)
+
+    Parameters
+    ----------
+    triangles : np.ndarray
+        (3,2) or (n,3,2) triangles
+
+    X, Y : np.ndarray
+        Coordinates of points (any broadcastable shape)
+
+    Returns
+    -------
+    Signed distance at points
+    """
+
+    X, Y = np.broadcast_arrays(np.asarray(X, dtype=float),
+                               np.asarray(Y, dtype=float))
+    D = np.full(X.shape, np.inf)
+    for P in _triangles(triangles):
+        distance = np.full(X.shape, np.inf)
+        inside = np.ones(X.shape, dtype=bool)
+        for (x0, y0), (x1, y1) in zip(P, np.roll(P, -1, axis=0)):
+            ex, ey = x1-x0, y1-y0
+            vx, vy = X-x0, Y-y0
+            t = np.clip((vx*ex + vy*ey)/(ex*ex + ey*ey), 0, 1)
+            np.minimum(distance, (vx - t*ex)**2 + (vy - t*ey)**2, out=distance)
+            inside &= ex*vy - ey*vx >= 0
+        distance = np.sqrt(distance)
+        distance[inside] *= -1
+        np.minimum(D, distance, out=D)
+    return D
+
+
+def sdf_coverage(triangles, shape, tile=256):
+    """
+    Analytic coverage of triangles using the signed distance d at pixel
+    centers (coverage is 0.5-d clipped to [0,1], i.e. the area covered by
+    a straight edge orthogonal to the gradient).
+
+    Parameters
+    ----------
+    triangles : np.ndarray
+        (3,2) or (n,3,2) triangles (pixel coordinates)
+
+    shape : (int, int)
+        Height and width of the grid
+
+    tile : int
+        Size of tiles
+
+    Returns
+    -------
+    (height, width) float32 coverage
+    """
+
+    T = _triangles(triangles)
+    vmin, vmax = T.min(axis=1) - 1, T.max(axis=1) + 1
+    Z = np.zeros(shape, dtype=np.float32)
+    for y0, y1, x0, x1 in _tiles(shape, tile):
+        candidates = ((vmin[:,0] <= x1) & (vmax[:,0] >= x0) &
+                      (vmin[:,1] <= y1) & (vmax[:,1] >= y0))
+        if not candidates.any():
+            continue
+        X = x0 + 0.5 + np.arange(x1-x0)[np.newaxis,:]
+        Y = y0 + 0.5 + np.arange(y1-y0)[:,np.newaxis]
+        Z[y0:y1,x0:x1] = np.clip(0.5 - sdf(T[candidates], X, Y), 0, 1)
+    return Z
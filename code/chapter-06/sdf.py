@@ -0,0 +1,23 @@
+# -----------------------------------------------------------------------------
+# Python & OpenGL for Scientific Visualization
+# www.labri.fr/perso/nrougier/python+opengl
+# Copyright (c) 2018, Nicolas P. Rougier
+# Distributed under the 2-Clause BSD License.
+# -----------------------------------------------------------------------------
+# The SDF library (primitives, CSG operations and shader compilation) lives in
+# chapter 8 (see ../chapter-08/sdf.py). This module loads it and re-exports its
+# public names such that the listings of this chapter can simply use
+#
+#   from sdf import Circle, shader
+# -----------------------------------------------------------------------------
+import os
+import importlib.util
+
+_filename = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "..", "chapter-08", "sdf.py")
+_spec = importlib.util.spec_from_file_location("_sdf", _filename)
+_sdf = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_sdf)
+
+globals().update({name: value for name, value in vars(_sdf).items()
+                  if not name.startswith("_")})
@@ -1,6 +1,7 @@
 import numpy as np
 from glumpy.ext import png
 from glumpy import app, gloo, gl
+from sdf import FakeTriangle, function
 
 vertex_scene = """
   attribute vec2 position;
@@ -8,24 +9,10 @@ vertex_scene = """
       gl_Position = vec4(position, 0.0, 1.0);
   } """
 
-fragment_scene = """
-  float SDF_fake_triangle(vec2 p, vec2 p0, vec2 p1, vec2 p2) {
-    vec2 e0 = p1 - p0;
-    vec2 e1 = p2 - p1;
-    vec2 e2 = p0 - p2;
-    vec2 v0 = p - p0;
-    vec2 v1 = p - p1;
-    vec2 v2 = p - p2;
-    vec2 o0 = normalize(vec2(e0.y, -e0.x));
-    vec2 o1 = normalize(vec2(e1.y, -e1.x));
-    vec2 o2 = normalize(vec2(e2.y, -e2.x));
-    return max(max(dot(o0,v0), dot(o1,v1)), dot(o2,v2));
-  }
-
-  uniform vec2 p0, p1, p2;
+fragment_scene = function(FakeTriangle("p0", "p1", "p2")) + """
   void main() {
       vec2 p = gl_FragCoord.xy;
-      float d = SDF_fake_triangle(p, p0, p1, p2);
+      float d = sdf(p);
       d = abs(d) + 0.125;
       float a = 1.0;
       if(d > 0.0) a = exp(-d*d);
@@ -0,0 +1,31 @@
+# -----------------------------------------------------------------------------
+# Python & OpenGL for Scientific Visualization
+# www.labri.fr/perso/nrougier/python+opengl
+# Copyright (c) 2018, Nicolas P. Rougier
+# Distributed under the 2-Clause BSD License.
+# -----------------------------------------------------------------------------
+# Same images as triangle-ssaa.py (filled version) computed without OpenGL
+# using the reference rasterizer (raster.py), plus the analytic SDF coverage.
+# -----------------------------------------------------------------------------
+import numpy as np
+import matplotlib.image as mpimg
+from raster import offsets, coverage, sdf_coverage
+
+width, height, zoom = 32, 16, 20
+p0, p1, p2 = (26,3), (10,13), (4,6)
+triangle = np.array([p0, p1, p2])
+
+def save(filename, Z):
+    """ Save coverage as a black on white zoomed image """
+
+    image = np.round(255*(1-Z)).astype(np.uint8)
+    image = np.repeat(np.repeat(image[::-1], zoom, axis=0), zoom, axis=1)
+    mpimg.imsave(filename, np.dstack([image]*3))
+
+for name, offset in offsets.items():
+    # triangle-ssaa.py moves the triangle by (offset - 0.5) pixels and samples
+    # pixel centers, i.e. samples are located at (1 - offset) in each pixel.
+    Z = coverage(triangle, (height, width), 1 - np.asarray(offset))
+    save("triangle-ssaa-filled-%s.png" % name, Z)
+
+save("triangle-sdf-coverage.png", sdf_coverage(triangle, (height, width)))
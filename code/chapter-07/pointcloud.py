@@ -0,0 +1,173 @@
+# -----------------------------------------------------------------------------
+# Python & OpenGL for Scientific Visualization
+# www.labri.fr/perso/nrougier/python+opengl
+# Copyright (c) 2018, Nicolas P. Rougier
+# Distributed under the 2-Clause BSD License.
+# -----------------------------------------------------------------------------
+# Large point clouds (sphere impostors): points are sorted once along a uniform
+# grid over their centers (depth slabs first, then rows and columns) such that
+# each grid cell is a contiguous range of the vertex buffer, ordered from front
+# to back. At each view change, cells are culled against the view box (all
+# cells at once) and only the indices of the visible ranges are uploaded.
+# -----------------------------------------------------------------------------
+import numpy as np
+from glumpy import gl, gloo
+
+
+class Grid(object):
+    """
+    Uniform grid over sphere centers
+
+    Parameters
+    ----------
+    centers : np.ndarray
+        (n,d) sphere centers (d = 2 or 3, the last axis being depth)
+
+    radii : np.ndarray or float
+        Sphere radii
+
+    shape : int or tuple of int
+        Number of cells along each axis (default is such that there are
+        about 1024 points per cell)
+
+    Attributes
+    ----------
+    order : np.ndarray
+        (n,) permutation sorting points by cell and depth
+
+    ranges : np.ndarray
+        (k,2) index ranges (into sorted points) of the non-empty cells
+
+    lower, upper : np.ndarray
+        (k,d) bounds of the spheres of each non-empty cell
+    """
+
+    def __init__(self, centers, radii, shape=None):
+        centers = np.asarray(centers, dtype=np.float64)
+        n, d = centers.shape
+        radii = np.broadcast_to(np.asarray(radii, dtype=np.float64), (n,))
+        if shape is None:
+            shape = int(np.ceil((n/1024) ** (1.0/d)))
+        shape = np.broadcast_to(np.maximum(shape, 1), (d,)).astype(int)
+
+        vmin, vmax = centers.min(axis=0), centers.max(axis=0)
+        extent = np.where(vmax > vmin, vmax - vmin, 1.0)
+        cells = np.minimum(((centers - vmin)/extent * shape).astype(int),
+                           shape-1)
+
+        # Cell key with depth (last axis) as the most significant index,
+        # points inside a cell being sorted by (quantized) depth as well
+        key = np.ravel_multi_index(cells[:,::-1].T, shape[::-1])
+        depth = (centers[:,-1] - vmin[-1])/extent[-1]
+        depth = (depth * (2**20 - 1)).astype(np.int64)
+        self.order = np.argsort((key << 20) | depth)
+        key = key[self.order]
+
+        starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+        stops = np.r_[starts[1:], n]
+        self.ranges = np.stack([starts, stops], axis=-1)
+        self.shape = tuple(int(s) for s in shape)
+
+        R = radii[self.order, np.newaxis]
+        C = centers[self.order]
+        self.lower = np.minimum.reduceat(C - R, starts, axis=0)
+        self.upper = np.maximum.reduceat(C + R, starts, axis=0)
+
+    def __len__(self):
+        return len(self.order)
+
+    def cull(self, lower, upper):
+        """
+        Index ranges of the cells intersecting a box
+
+        Parameters
+        ----------
+        lower, upper : (float, ...)
+            View box bounds (d values each, use +/- np.inf for unbounded axes)
+
+        Returns
+        -------
+        (k,2) index ranges (into sorted points) ordered from front to back,
+        adjacent ranges being merged.
+        """
+
+        visible = np.all((self.upper >= lower) & (self.lower <= upper), axis=1)
+        starts, stops = self.ranges[visible].T
+        if not len(starts):
+            return np.zeros((0,2), dtype=int)
+        split = np.flatnonzero(starts[1:] != stops[:-1]) + 1
+        return np.stack([starts[np.r_[0, split]],
+                         stops[np.r_[split-1, len(stops)-1]]], axis=-1)
+
+    def indices(self, lower, upper):
+        """
+        Indices (into sorted points) of the points of the visible cells
+
+        Parameters
+        ----------
+        lower, upper : (float, ...)
+            View box bounds
+
+        Returns
+        -------
+        (m,) uint32 indices ordered from front to back
+        """
+
+        ranges = self.cull(lower, upper)
+        sizes = ranges[:,1] - ranges[:,0]
+        offsets = np.cumsum(sizes) - sizes
+        I = np.arange(sizes.sum(), dtype=np.int64)
+        I += np.repeat(ranges[:,0] - offsets, sizes)
+        return I.astype(np.uint32)
+
+
+class PointCloud(object):
+    """
+    Point cloud drawn through a grid culled index buffer
+
+    Parameters
+    ----------
+    program : gloo.Program
+        Program whose attributes are the fields of data
+
+    data : np.ndarray
+        Structured array with (at least) "center" and "radius" fields
+
+    shape : int or tuple of int
+        Grid shape (see Grid)
+    """
+
+    def __init__(self, program, data, shape=None):
+        self.grid = Grid(data["center"], data["radius"], shape)
+        self.data = data[self.grid.order].view(gloo.VertexBuffer)
+        self.indices = np.zeros(len(data), np.uint32).view(gloo.IndexBuffer)
+        self.count = 0
+        self.box = None
+        self.program = program
+        self.program.bind(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def cull(self, lower, upper):
+        """
+        Restrict drawing to the points whose cell intersects the view box
+        (indices are only computed and uploaded when the box changes)
+
+        Parameters
+        ----------
+        lower, upper : (float, ...)
+            View box bounds (data coordinates)
+        """
+
+        box = tuple(lower) + tuple(upper)
+        if box != self.box:
+            I = self.grid.indices(lower, upper)
+            self.indices[:len(I)] = I
+            self.count, self.box = len(I), box
+
+    def draw(self, mode=gl.GL_POINTS):
+        """ Draw visible points (front to back) """
+
+        if self.count:
+            self.program.draw(mode, self.indices[:self.count])
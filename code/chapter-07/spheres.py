@@ -4,21 +4,30 @@
 # Copyright (c) 2018, Nicolas P. Rougier
 # Distributed under the 2-Clause BSD License.
 # -----------------------------------------------------------------------------
+# Sphere impostors drawn through a culled point cloud (see pointcloud.py): only
+# the spheres of the grid cells intersecting the view are drawn, front to back.
+# Number of spheres can be given on the command line (mouse scroll to zoom,
+# mouse drag to pan).
+# -----------------------------------------------------------------------------
+import sys
 import numpy as np
 from glumpy import app, gloo, gl
+from pointcloud import PointCloud
 
 vertex = """
     uniform vec2 resolution;
+    uniform vec2 translate;
+    uniform float scale;
     attribute vec3 center;
     attribute float radius;
     varying vec3 v_center;
     varying float v_radius;
     void main()
     {
-        v_radius = radius;
-        v_center = center;
-        gl_PointSize = 2.0 + ceil(2.0*radius);
-        gl_Position = vec4(2.0*center.xy/resolution-1.0, v_center.z, 1.0);
+        v_radius = scale*radius;
+        v_center = vec3(scale*center.xy + translate, center.z);
+        gl_PointSize = 2.0 + ceil(2.0*v_radius);
+        gl_Position = vec4(2.0*v_center.xy/resolution-1.0, v_center.z, 1.0);
     } """
 
 fragment = """
@@ -42,24 +51,50 @@ fragment = """
 
 
 np.random.seed(1)
-V = np.zeros(100, [("center", np.float32, 3),
-                   ("radius", np.float32, 1)])
-V["center"] = np.random.uniform(50,512-50,(len(V),3))
+n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+size = 512*np.sqrt(n/100)
+V = np.zeros(n, [("center", np.float32, 3),
+                 ("radius", np.float32, 1)])
+V["center"] = np.random.uniform(50,size-50,(len(V),3))
 V["center"][:,2] = np.random.uniform(0,1,len(V))
 V["radius"] = np.random.uniform(25,50,len(V))
 
 window = app.Window(512, 512, color=(1,1,1,1))
 points = gloo.Program(vertex, fragment)
-points.bind(V.view(gloo.VertexBuffer))
+cloud = PointCloud(points, V)
+translate, scale = np.zeros(2), 1.0
+
+def update():
+    points["translate"] = translate
+    points["scale"] = scale
+    lower = -translate/scale
+    upper = np.array([window.width, window.height])/scale + lower
+    cloud.cull((lower[0], lower[1], -np.inf), (upper[0], upper[1], np.inf))
 
 @window.event
 def on_resize(width, height):
     points["resolution"] = width, height
-    
+    update()
+
+@window.event
+def on_mouse_scroll(x, y, dx, dy):
+    global translate, scale
+    factor = 1.1 if dy > 0 else 1/1.1
+    y = window.height - y
+    translate = (x,y) - factor*((x,y) - translate)
+    scale *= factor
+    update()
+
+@window.event
+def on_mouse_drag(x, y, dx, dy, buttons):
+    global translate
+    translate = translate + (dx,-dy)
+    update()
+
 @window.event
 def on_draw(dt):
     window.clear()
     gl.glEnable(gl.GL_DEPTH_TEST)
-    points.draw(gl.GL_POINTS)
-    
+    cloud.draw(gl.GL_POINTS)
+
 app.run()
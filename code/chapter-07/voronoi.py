@@ -4,8 +4,14 @@
 # Copyright (c) 2018, Nicolas P. Rougier
 # Distributed under the 2-Clause BSD License.
 # -----------------------------------------------------------------------------
+# Voronoi diagram using cones (depth) drawn through a culled point cloud (see
+# pointcloud.py): cones whose cell does not intersect the window are skipped.
+# Number of cells can be given on the command line.
+# -----------------------------------------------------------------------------
+import sys
 import numpy as np
 from glumpy import app, gloo, gl
+from pointcloud import PointCloud
 
 vertex = """
     uniform vec2 resolution;
@@ -38,25 +44,27 @@ fragment = """
   } """
 
 
-V = np.zeros(1000, [("center", np.float32, 2),
-                    ("color",  np.float32, 3),
-                    ("radius", np.float32, 1)])
+n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+V = np.zeros(n, [("center", np.float32, 2),
+                 ("color",  np.float32, 3),
+                 ("radius", np.float32, 1)])
 V["center"] = np.random.uniform(0,1024,(len(V),2))
 V["color"] = np.random.uniform(0.25,1.00,(len(V),3))
-V["radius"] = 100
+V["radius"] = 100*np.sqrt(1000/n)
 
 window = app.Window(1024, 1024, color=(1,1,1,1))
 points = gloo.Program(vertex, fragment)
-points.bind(V.view(gloo.VertexBuffer))
+cloud = PointCloud(points, V)
 
 @window.event
 def on_resize(width, height):
     points["resolution"] = width, height
-    
+    cloud.cull((0, 0), (width, height))
+
 @window.event
 def on_draw(dt):
     window.clear()
-    points.draw(gl.GL_POINTS)
+    cloud.draw(gl.GL_POINTS)
 
 @window.event
 def on_init():
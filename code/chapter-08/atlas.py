@@ -0,0 +1,212 @@
+# -----------------------------------------------------------------------------
+# Python & OpenGL for Scientific Visualization
+# www.labri.fr/perso/nrougier/python+opengl
+# Copyright (c) 2018, Nicolas P. Rougier
+# Distributed under the 2-Clause BSD License.
+# -----------------------------------------------------------------------------
+# Signed distance field atlas for texture markers: marker images (dark shapes
+# on a light background) are turned into signed distance fields using an exact
+# euclidean distance transform (Felzenszwalb & Huttenlocher, 2012) and packed
+# into a single texture. Atlases are cached on disk (keyed by the content of
+# the images) such that they're only computed once.
+# -----------------------------------------------------------------------------
+import os
+import hashlib
+import numpy as np
+
+
+def _edt1d(f):
+    """
+    Squared distance transform along the last axis: lower envelope of
+    parabolas rooted at (q, f[q]), all rows being processed at once.
+    """
+
+    m, n = f.shape
+    F = f.ravel()
+    base = np.arange(m)*n
+    v = np.zeros(m*n, dtype=int)
+    z = np.full((m, n+1), np.inf)
+    z[:,0] = -np.inf
+    Z = z.ravel()
+    k = np.zeros(m, dtype=int)
+
+    # Lower envelope: parabolas v[0..k] separated at z[1..k] (parabolas of
+    # empty sites are never part of the envelope and are skipped)
+    for q in range(1, n):
+        R = np.flatnonzero(f[:,q] < 1e20)
+        while len(R):
+            p = v[base[R] + k[R]]
+            s = ((F[base[R] + q] + q*q) - (F[base[R] + p] + p*p)) / (2*q - 2*p)
+            pop = s <= Z[base[R] + R + k[R]]
+            D, s = R[~pop], s[~pop]
+            k[D] += 1
+            v[base[D] + k[D]] = q
+            Z[base[D] + D + k[D]] = s
+            Z[base[D] + D + k[D] + 1] = np.inf
+            R = R[pop]
+            k[R] -= 1
+
+    # Samples q in ]z[j], z[j+1]] belong to parabola v[j]
+    C = np.clip(np.floor(z) + 1, 0, n).astype(int)
+    C[np.arange(n+1) > k[:,np.newaxis]+1] = n
+    p = np.repeat(v, np.diff(C, axis=1).ravel())
+    q = np.tile(np.arange(n), m)
+    return ((q - p)**2 + F[np.repeat(base, n) + p]).reshape(m, n)
+
+
+def _edt(masks):
+    """
+    Squared euclidean distance transforms of several masks at once (rows of
+    all masks are padded to the same length and stacked)
+    """
+
+    F = [np.where(mask, 0.0, 1e20) for mask in masks]
+    for axis in 0, 1:
+        F = [np.moveaxis(f, axis, -1) for f in F]
+        n = max(f.shape[-1] for f in F)
+        stack = np.concatenate([np.pad(f, ((0,0), (0, n-f.shape[-1])),
+                                       constant_values=1e20) for f in F])
+        stack = _edt1d(stack)
+        offsets = np.cumsum([0] + [len(f) for f in F])
+        F = [np.moveaxis(stack[start:stop,:f.shape[-1]], -1, axis)
+             for f, start, stop in zip(F, offsets[:-1], offsets[1:])]
+    return F
+
+
+def edt(mask):
+    """
+    Exact euclidean distance transform
+
+    Parameters
+    ----------
+    mask : np.ndarray
+        (h,w) boolean array
+
+    Returns
+    -------
+    (h,w) distance of each pixel to the nearest True pixel
+    """
+
+    return np.sqrt(_edt([mask])[0])
+
+
+def _sdf(images, threshold=0.5):
+    """ Signed distance fields of several images (see sdf) """
+
+    masks = [np.asarray(image) < threshold for image in images]
+    D = _edt([~mask for mask in masks] + masks)
+    inner, outer = D[:len(masks)], D[len(masks):]
+    return [np.where(mask, 0.5 - np.sqrt(I), np.sqrt(O) - 0.5)
+            for mask, I, O in zip(masks, inner, outer)]
+
+
+def sdf(image, threshold=0.5):
+    """
+    Signed distance field of a dark shape on a light background
+
+    Parameters
+    ----------
+    image : np.ndarray
+        (h,w) image with values in [0,1]
+
+    threshold : float
+        Pixels below threshold are inside the shape
+
+    Returns
+    -------
+    (h,w) signed distance (in pixels) to the border of the shape, negative
+    inside.
+    """
+
+    return _sdf([image], threshold)[0]
+
+
+def build(images, padding=8):
+    """
+    Build a SDF atlas from several marker images
+
+    Each marker is stored as 0.5 - d/size where d is the signed distance and
+    size the largest side of the marker image, such that texture values are
+    above 0.5 inside the marker and (size*(value-0.5)) is the distance in
+    screen pixels when the marker is displayed with the given size.
+
+    Parameters
+    ----------
+    images : list of np.ndarray
+        (h_i,w_i) images with values in [0,1]
+
+    padding : int
+        Padding around each marker (where distance is extended)
+
+    Returns
+    -------
+    (texture, rects) where texture is a (H,W) float32 array and rects is a
+    (n,4) float32 array of the (u0,v0,u1,v1) texture coordinates of each
+    marker (v0 corresponding to the first row of the marker image).
+    """
+
+    images = [np.asarray(image, dtype=float) for image in images]
+    shapes = np.array([image.shape for image in images]) + 2*padding
+
+    # Shelf packing (tallest markers first)
+    width = max(shapes[:,1].max(), int(np.sqrt((shapes.prod(axis=1)).sum())))
+    origins = np.zeros((len(images), 2), dtype=int)
+    x, y, shelf = 0, 0, 0
+    for i in np.argsort(-shapes[:,0], kind="stable"):
+        h, w = shapes[i]
+        if x + w > width:
+            x, y, shelf = 0, y + shelf, 0
+        origins[i] = y, x
+        x, shelf = x + w, max(shelf, h)
+    height = y + shelf
+
+    texture = np.zeros((height, width), dtype=np.float32)
+    rects = np.zeros((len(images), 4), dtype=np.float32)
+    D = _sdf([np.pad(image, padding, mode="edge") for image in images])
+    for i, image in enumerate(images):
+        (y, x), (h, w) = origins[i], shapes[i]
+        texture[y:y+h, x:x+w] = np.clip(0.5 - D[i]/max(image.shape), 0, 1)
+        rects[i] = ((x+padding)/width, (y+padding)/height,
+                    (x+w-padding)/width, (y+h-padding)/height)
+    return texture, rects
+
+
+def load(filenames, padding=8, cache="."):
+    """
+    SDF atlas of marker image files (see build), cached on disk
+
+    Parameters
+    ----------
+    filenames : list of str
+        Marker image files (grayscale)
+
+    padding : int
+        Padding around each marker
+
+    cache : str
+        Cache directory (None to disable cache)
+
+    Returns
+    -------
+    (texture, rects) as returned by build
+    """
+
+    from PIL import Image
+
+    key = hashlib.sha1(b"sdf-atlas:%d" % padding)
+    for filename in filenames:
+        with open(filename, "rb") as file:
+            key.update(hashlib.sha1(file.read()).digest())
+    if cache is not None:
+        filename = "sdf-atlas-%s.npz" % key.hexdigest()[:16]
+        filename = os.path.join(cache, filename)
+        if os.path.exists(filename):
+            atlas = np.load(filename)
+            return atlas["texture"], atlas["rects"]
+
+    images = [np.array(Image.open(filename).convert("L"))/255.0
+              for filename in filenames]
+    texture, rects = build(images, padding)
+    if cache is not None:
+        np.savez_compressed(filename, texture=texture, rects=rects)
+    return texture, rects
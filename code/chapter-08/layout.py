@@ -0,0 +1,178 @@
+# -----------------------------------------------------------------------------
+# Python & OpenGL for Scientific Visualization
+# www.labri.fr/perso/nrougier/python+opengl
+# Copyright (c) 2018, Nicolas P. Rougier
+# Distributed under the 2-Clause BSD License.
+# -----------------------------------------------------------------------------
+# Marker layouts (spiral, phyllotaxis, grid, polar) computed for all items at
+# once and written directly into the fields of a (structured) buffer, e.g.
+#
+#   data = np.zeros(n, [("position", np.float32, 2),
+#                       ("orientation", np.float32)])
+#   spiral(data, (256,256), radius=250, dradius=-0.45, angle="orientation")
+# -----------------------------------------------------------------------------
+import numpy as np
+
+
+def _polar(out, center, radius, theta, position, angle, chunk=2**16):
+    """
+    Write center + radius(i)*(cos(theta(i)), sin(theta(i))) (and theta(i))
+    into out, items being processed by chunks that fit in cache.
+    """
+
+    n, P = len(out), out[position]
+    for start in range(0, n, chunk):
+        stop = min(start + chunk, n)
+        i = np.arange(start, stop, dtype=np.float64)
+
+        # Angles are reduced to [0,2pi[ in double precision such that the
+        # (faster) single precision cos/sin remain accurate
+        T = theta(i)
+        T -= 2*np.pi*np.floor(T/(2*np.pi))
+        T = T.astype(np.float32)
+        R = radius(i).astype(np.float32)
+        P[start:stop,0] = R*np.cos(T) + center[0]
+        P[start:stop,1] = R*np.sin(T) + center[1]
+        if angle is not None:
+            out[angle][start:stop] = T
+
+
+def spiral(out, center=(0,0), radius=1.0, dradius=0.0, theta=0.0,
+           dtheta=np.pi/32, position="position", angle=None):
+    """
+    Spiral layout: item i is at angle theta + i*dtheta and distance
+    radius + i*dradius from center.
+
+    Parameters
+    ----------
+    out : np.ndarray
+        Structured buffer (one item per marker)
+
+    center : (float, float)
+        Center of the spiral
+
+    radius, dradius : float
+        Initial radius and radius increment (may be negative)
+
+    theta, dtheta : float
+        Initial angle and angle increment (radians)
+
+    position : str
+        Name of the (2 floats) position field
+
+    angle : str
+        Name of the field where to write the angle of each item (optional)
+    """
+
+    _polar(out, center, lambda i: radius + i*dradius,
+           lambda i: theta + i*dtheta, position, angle)
+
+
+def phyllotaxis(out, center=(0,0), scale=1.0, theta=np.pi*(3-np.sqrt(5)),
+                position="position", angle=None):
+    """
+    Phyllotaxis (sunflower) layout: item i is at angle i*theta and distance
+    scale*sqrt(i) from center, i.e. items are evenly distributed on a disc.
+
+    Parameters
+    ----------
+    out : np.ndarray
+        Structured buffer (one item per marker)
+
+    center : (float, float)
+        Center of the layout
+
+    scale : float
+        Distance between neighbour items
+
+    theta : float
+        Angle increment (default is the golden angle)
+
+    position : str
+        Name of the (2 floats) position field
+
+    angle : str
+        Name of the field where to write the angle of each item (optional)
+    """
+
+    _polar(out, center, lambda i: scale*np.sqrt(i),
+           lambda i: i*theta, position, angle)
+
+
+def polar(out, center=(0,0), radius=1.0, dradius=1.0, count=None,
+          theta=0.0, position="position", angle=None):
+    """
+    Polar layout: items are laid out on concentric circles (count items per
+    circle), item i being on circle i // count at angle
+    theta + 2*pi*(i % count)/count.
+
+    Parameters
+    ----------
+    out : np.ndarray
+        Structured buffer (one item per marker)
+
+    center : (float, float)
+        Center of the circles
+
+    radius, dradius : float
+        Radius of the first circle and distance between circles
+
+    count : int
+        Number of items per circle (default is all items on one circle)
+
+    theta : float
+        Angle of the first item of each circle
+
+    position : str
+        Name of the (2 floats) position field
+
+    angle : str
+        Name of the field where to write the angle of each item (optional)
+    """
+
+    # Angles are the same on every circle (cos/sin are only computed once)
+    n = len(out)
+    count = count or max(n, 1)
+    circles = -(-n // count)
+    T = theta + 2*np.pi*np.arange(count)/count
+    T = (T - 2*np.pi*np.floor(T/(2*np.pi))).astype(np.float32)
+    R = np.repeat(radius + dradius*np.arange(circles, dtype=np.float32),
+                  count)[:n]
+    P = out[position]
+    P[:,0] = R*np.tile(np.cos(T), circles)[:n] + center[0]
+    P[:,1] = R*np.tile(np.sin(T), circles)[:n] + center[1]
+    if angle is not None:
+        out[angle] = np.tile(T, circles)[:n]
+
+
+def grid(out, cols=None, origin=(0,0), spacing=(1,1), position="position"):
+    """
+    Grid layout: items are laid out in row-major order, item i being at
+    column i % cols and row i // cols.
+
+    Parameters
+    ----------
+    out : np.ndarray
+        Structured buffer (one item per marker)
+
+    cols : int
+        Number of columns (default is a square grid)
+
+    origin : (float, float)
+        Position of the first item
+
+    spacing : (float, float)
+        Horizontal and vertical distance between items
+
+    position : str
+        Name of the (2 floats) position field
+    """
+
+    n = len(out)
+    cols = cols or max(int(np.ceil(np.sqrt(n))), 1)
+    rows = -(-n // cols)
+    X = origin[0] + spacing[0]*np.arange(cols, dtype=np.float32)
+    Y = origin[1] + spacing[1]*np.arange(rows, dtype=np.float32)
+    P = out[position]
+    P[:,0] = np.tile(X, rows)[:n]
+    P[:,1] = np.repeat(Y, cols)[:n]
@@ -7,6 +7,7 @@
 import numpy as np
 from glumpy import app, gl, gloo
 from glumpy.transforms import Position, OrthographicProjection, PanZoom
+from layout import spiral
 
 # Create window
 window = app.Window(width=2*512, height=512, color=(1,1,1,1))
@@ -26,22 +27,14 @@ data = np.zeros(n, dtype=[('position',    np.float32, 2),
                           ('size',        np.float32, 1),
                           ('orientation', np.float32, 1),
                           ('linewidth',   np.float32, 1)])
-data = data.view(gloo.VertexBuffer)
 data['linewidth'] = 1
 data['fg_color'] = 0, 0, 0, 1
 data['bg_color'] = 1, 1, 1, 0
-data['orientation'] = 0
-radius, theta, dtheta = 250.0, 0.0, 5.5 / 180.0 * np.pi
-for i in range(500):
-    theta += dtheta
-    x = 256 + radius * np.cos(theta)
-    y = 256 + radius * np.sin(theta)
-    r = 10.0 - i * 0.02
-    radius -= 0.45
-    data['orientation'][i] = theta - np.pi/2
-    data['position'][i] = x, y
-    data['size'][i] = 2 * r
-    data['linewidth'][i] = 1
+dtheta = 5.5 / 180.0 * np.pi
+spiral(data[:-1], (256, 256), radius=250.0, dradius=-0.45,
+       theta=dtheta, dtheta=dtheta, angle='orientation')
+data['orientation'][:-1] -= np.pi/2
+data['size'][:-1] = 2 * (10.0 - 0.02*np.arange(n-1))
 
 data['position'][-1]    = 512+256, 256
 data['size'][-1]        = 512/np.sqrt(2)
@@ -49,6 +42,7 @@ data['linewidth'][-1]   = 3.0
 data['fg_color'][-1]    = 0, 0, 0, 1
 data['bg_color'][-1]    = .95, .95, .95, 1
 data['orientation'][-1] = 0
+data = data.view(gloo.VertexBuffer)
 
 program = gloo.Program("markers/marker.vert", "markers/marker.frag")
 program.bind(data)
@@ -0,0 +1,35 @@
+# -----------------------------------------------------------------------------
+# Python & OpenGL for Scientific Visualization
+# www.labri.fr/perso/nrougier/python+opengl
+# Copyright (c) 2018, Nicolas P. Rougier
+# Distributed under the 2-Clause BSD License.
+# -----------------------------------------------------------------------------
+# Time varying vector field (64x64 arrows) using the Quiver class: only the
+# vectors are uploaded at each frame.
+# -----------------------------------------------------------------------------
+import numpy as np
+from glumpy import app
+from vectorfield import Quiver
+
+rows, cols = 64, 64
+window = app.Window(width=1024, height=1024, color=(1,1,1,1))
+
+X, Y = np.meshgrid(np.linspace(-np.pi, np.pi, cols),
+                   np.linspace(-np.pi, np.pi, rows))
+X, Y = X.ravel(), Y.ravel()
+time = 0.0
+
+def field(t):
+    return np.stack([np.sin(Y + t), np.cos(X - 0.5*t)], axis=-1)
+
+quiver = Quiver(np.stack([X, Y], axis=-1), field(time), size=16.0)
+
+@window.event
+def on_draw(dt):
+    global time
+    window.clear()
+    quiver.draw()
+    time += dt
+    quiver.update(field(time))
+
+app.run()
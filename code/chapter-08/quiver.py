@@ -5,11 +5,20 @@
 import numpy as np
 from glumpy import app, gl, glm, gloo
 
+# One point sprite per arrow (arrows are only evaluated where they are)
 vertex = """
+    uniform vec2 iResolution;
+    uniform vec2 iMouse;
+    uniform float size;
     attribute vec2 position;
+    varying float v_theta;
     void main()
     {
-        gl_Position = vec4(position, 0.0, 1.0);
+        const float M_PI = 3.14159265358979323846;
+        vec2 center = position*iResolution;
+        v_theta = M_PI-atan(center.y-iMouse.y,  center.x-iMouse.x);
+        gl_Position = vec4(2.0*position - 1.0, 0.0, 1.0);
+        gl_PointSize = size;
     }
 """
 
@@ -18,26 +27,18 @@ fragment = """
 #include "arrows/arrows.glsl"
 #include "antialias/antialias.glsl"
 
-uniform vec2 iResolution;
-uniform vec2 iMouse;
+uniform float size;
+varying float v_theta;
 void main()
 {
-    const float M_PI = 3.14159265358979323846;
     const float SQRT_2 = 1.4142135623730951;
     const float linewidth = 3.0;
     const float antialias =  1.0;
 
-    const float rows = 32.0;
-    const float cols = 32.0;
-    float body = min(iResolution.x/cols, iResolution.y/rows) / SQRT_2;
-    vec2 texcoord = gl_FragCoord.xy;
-    vec2 size   = iResolution.xy / vec2(cols,rows);
-    vec2 center = (floor(texcoord/size) + vec2(0.5,0.5)) * size;
-
-    texcoord -= center;
-    float theta = M_PI-atan(center.y-iMouse.y,  center.x-iMouse.x);
-    float cos_theta = cos(theta);
-    float sin_theta = sin(theta);
+    float body = size / SQRT_2;
+    vec2 texcoord = (gl_PointCoord - 0.5) * vec2(1.0, -1.0) * size;
+    float cos_theta = cos(v_theta);
+    float sin_theta = sin(v_theta);
     texcoord = vec2(cos_theta*texcoord.x - sin_theta*texcoord.y,
                     sin_theta*texcoord.x + cos_theta*texcoord.y);
 
@@ -46,24 +47,26 @@ void main()
 }
 """
 
+rows, cols = 32, 32
 
 window = app.Window(width=2*512, height=2*512, color=(1,1,1,1))
 
 @window.event
 def on_draw(dt):
     window.clear()
-    program.draw(gl.GL_TRIANGLE_STRIP)
+    program.draw(gl.GL_POINTS)
 
 @window.event
 def on_resize(width, height):
     program["iResolution"] = width, height
+    program["size"] = min(width/cols, height/rows)
 
 @window.event
 def on_mouse_motion(x, y, dx, dy):
     program["iMouse"] = x,window.height-y
 
-program = gloo.Program(vertex, fragment, count=4)
-dx,dy = 1,1
-program['position'] = (-dx,-dy), (-dx,+dy), (+dx,-dy), (+dx,+dy)
+program = gloo.Program(vertex, fragment, count=rows*cols)
+X, Y = np.meshgrid((np.arange(cols)+0.5)/cols, (np.arange(rows)+0.5)/rows)
+program['position'] = np.stack([X.ravel(), Y.ravel()], axis=-1)
 
 app.run()
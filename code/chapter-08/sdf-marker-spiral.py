@@ -5,43 +5,57 @@
 # Distributed under the 2-Clause BSD License.
 # -----------------------------------------------------------------------------
 import numpy as np
-from PIL import Image
 from glumpy import app, gl, gloo, data
-from glumpy.ext.sdf import compute_sdf
+from atlas import load
+from layout import spiral
 
 
+# Markers are drawn as point sprites: one record (position, size, orientation)
+# per marker, the quad being generated by the rasterizer and rotated in the
+# fragment shader. A global rotation (uniform) allows to animate all markers
+# without any upload.
 vertex = """
-  uniform vec2 resolution;
   uniform float linewidth;
   uniform float antialias;
+  uniform vec2 resolution;
 
   attribute float size;
   attribute float orientation;
   attribute vec2 position;
-  attribute vec2 texcoord;
 
   varying float v_size;
-  varying vec2 v_texcoord;
+  varying float v_orientation;
   void main() {
       float s = size + linewidth + 2.0*antialias;
-       vec2 p = ((2.0*texcoord - 1.0)*s)/resolution;
-       p =  vec2(p.x*cos(orientation) - p.y*sin(orientation),
-                 p.y*cos(orientation) + p.x*sin(orientation));
-       p += 2.0*position/resolution - 1.0;
-       gl_Position = vec4(p, 0.0, 1.0);
-       v_texcoord = texcoord;
-       v_size = size;
+      gl_Position = vec4(2.0*position/resolution - 1.0, 0.0, 1.0);
+      gl_PointSize = ceil(s*1.4142135623730951);
+      v_size = size;
+      v_orientation = orientation;
   } """
 
 fragment = """
   varying float v_size;
-  varying vec2 v_texcoord;
+  varying float v_orientation;
   uniform float linewidth;
   uniform float antialias;
+  uniform float rotation;
+  uniform vec4 rect;
   uniform sampler2D texture;
   void main() {
       float size = v_size + linewidth + 2.0*antialias;
-      float signed_distance = size*(texture2D(texture, v_texcoord).r - 0.5);
+
+      // Point coordinates (pixels, y up) rotated back into the marker frame
+      vec2 p = (gl_PointCoord - 0.5)*vec2(1.0,-1.0);
+      p *= ceil(size*1.4142135623730951);
+      float c = cos(v_orientation + rotation);
+      float s = sin(v_orientation + rotation);
+      vec2 texcoord = vec2(c*p.x + s*p.y, c*p.y - s*p.x)/size + 0.5;
+      if (any(lessThan(texcoord, vec2(0.0))) ||
+          any(greaterThan(texcoord, vec2(1.0))))
+          discard;
+
+      texcoord = mix(rect.xy, rect.zw, texcoord);
+      float signed_distance = size*(texture2D(texture, texcoord).r - 0.5);
       float border_distance = abs(signed_distance) - linewidth/2.0 + antialias;
       float alpha = border_distance/antialias;
       alpha = exp(-alpha*alpha);
@@ -55,65 +69,48 @@ fragment = """
   } """
 
 window = app.Window(width=512, height=512, color=(1,1,1,1))
-orientation = 0
+rotation = 0
 
 @window.event
 def on_draw(dt):
-    global orientation
-    
+    global rotation
+
     window.clear()
-    marker.draw(gl.GL_TRIANGLES, I) 
-    orientation += 1.0 * np.pi/180
-    marker["orientation"] = orientation
-#    marker["size"] = 512*abs(np.cos(orientation))
-#    marker["linewidth"] = 0.5+2*abs(np.cos(orientation))
-    
+    marker.draw(gl.GL_POINTS)
+    rotation += 1.0 * np.pi/180
+    marker["rotation"] = rotation
+
 @window.event
 def on_resize(width, height):
     marker["resolution"] = width, height
 
 
 n = 150
-data = np.zeros((n,4), dtype=[('position',    np.float32, 2),
-                              ('size',        np.float32, 1),
-                              ('size',        np.float32, 1),
-                              ('orientation', np.float32, 1),
-                              ('texcoord',    np.float32, 2)])
-
-radius, theta, dtheta = 245.0, 0.0, 10 / 180.0 * np.pi
-for i in range(n):
-    theta += dtheta
-    x = 256 + radius * np.cos(theta)
-    y = 256 + radius * np.sin(theta)
-    r = 20.1 - i * 0.12
-    radius -= 1.25
-    data['orientation'][i] = theta + np.pi
-    data['position'][i] = x, y
-    data['size'][i] = 2 * r
-    data["texcoord"][i] = (0,1), (0,0), (1,1), (1,0)
-data = data.ravel().view(gloo.VertexBuffer)
-
-texture = np.array(Image.open("firefox.png"))/255.0
-compute_sdf(texture)
-image = Image.fromarray((texture*255).astype(np.ubyte))
-image.save("firefox-sdf.png")
+data = np.zeros(n, dtype=[('position',    np.float32, 2),
+                          ('size',        np.float32),
+                          ('orientation', np.float32)])
+
+dtheta = 10 / 180.0 * np.pi
+spiral(data, (256, 256), radius=245.0, dradius=-1.25,
+       theta=dtheta, dtheta=dtheta, angle='orientation')
+data['orientation'] += np.pi
+data['size'] = 2 * (20.1 - 0.12*np.arange(n))
+data = data.view(gloo.VertexBuffer)
+
+texture, rects = load(["firefox.png"])
 
 
 # Generate texture
 marker = gloo.Program(vertex, fragment)
 marker.bind(data)
 marker["texture"] = texture
+marker["rect"] = rects[0]
 marker["texture"].interpolation = gl.GL_LINEAR
 marker["texture"].wrapping = gl.GL_CLAMP
 
 marker["antialias"] = 2.0
 marker["linewidth"] = 1.0
-
-# Generate indices
-I = np.zeros((n,6), dtype=np.uint32)
-I[:] = [0,1,2,1,2,3]
-I += 4*np.arange(n,dtype=np.uint32).reshape(n,1)
-I = I.ravel().view(gloo.IndexBuffer)
+marker["rotation"] = 0.0
 
 app.run()
 
@@ -0,0 +1,722 @@
+# -----------------------------------------------------------------------------
+# Python & OpenGL for Scientific Visualization
+# www.labri.fr/perso/nrougier/python+opengl
+# Copyright (c) 2018, Nicolas P. Rougier
+# Distributed under the 2-Clause BSD License.
+# -----------------------------------------------------------------------------
+# Signed distance field primitives (circle, box, round box, ellipse, triangle,
+# round triangle, plane and the fake box and triangle approximations) and CSG
+# operations (union, intersection, difference, exclusion).
+# Shapes can be evaluated on the CPU (vectorized over arrays of points) or
+# compiled into a single GLSL function, e.g.
+#
+#   shape = Circle((192,256), 128) | Circle((320,256), 128)
+#   D = shape(P)                     # (n,2) points -> (n,) distances
+#   program = gloo.Program(vertex, shader(shape, scale=128.0))
+#
+# Parameters given as strings are uniforms (their values are then given as
+# keyword arguments for CPU evaluation), such that a shader can be reused for
+# any value. Compiled sources are cached and only contain the functions that
+# are actually used, branches that cannot change the distances being removed
+# (see simplify).
+# -----------------------------------------------------------------------------
+import numpy as np
+
+
+class SDF(object):
+    """
+    Signed distance field (node of a CSG tree), negative inside the shape.
+    Shapes are combined with | (union), & (intersection), - (difference)
+    and ^ (exclusion). A field is exact when its value is the actual
+    (signed) distance to the shape everywhere.
+    """
+
+    exact = True
+
+    def __or__(self, other):
+        return Union(self, other)
+
+    def __and__(self, other):
+        return Intersection(self, other)
+
+    def __sub__(self, other):
+        return Difference(self, other)
+
+    def __xor__(self, other):
+        return Exclusion(self, other)
+
+    def __call__(self, P, **uniforms):
+        """
+        Signed distance at given points
+
+        Parameters
+        ----------
+        P : np.ndarray
+            (...,2) points
+
+        uniforms : dict
+            Values of the uniform parameters
+
+        Returns
+        -------
+        (...) signed distances
+        """
+
+        return self.distance(np.asarray(P, dtype=np.float64), uniforms)
+
+    def __repr__(self):
+        return "%s%r" % (type(self).__name__, self.key[1:])
+
+    def __eq__(self, other):
+        return isinstance(other, SDF) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+
+class Empty(SDF):
+    """ Empty shape (infinite distance) """
+
+    key = ("Empty",)
+    bounds = None
+
+    def distance(self, P, uniforms):
+        return np.full(P.shape[:-1], np.inf)
+
+
+class Primitive(SDF):
+    """
+    Primitive shape: name is the GLSL function, params the (name, type) of
+    its parameters (after the point), glsl its source and requires the
+    primitives whose functions it calls.
+    """
+
+    name, params, glsl, requires = None, (), None, ()
+
+    def __init__(self, *args):
+        if len(args) != len(self.params):
+            raise TypeError("%s expects %d parameters (%s)" % (
+                type(self).__name__, len(self.params),
+                ", ".join(name for name, gtype in self.params)))
+        self.args = tuple(arg if isinstance(arg, str) else
+                          tuple(float(v) for v in np.ravel(arg))
+                          for arg in args)
+        self.key = (type(self).__name__,) + self.args
+
+    @property
+    def bounds(self):
+        """ Bounding box (xmin, ymin, xmax, ymax) or None if unknown """
+
+        if any(isinstance(arg, str) for arg in self.args):
+            return None
+        return self._bounds(*[np.array(arg) for arg in self.args])
+
+    def _bounds(self, *args):
+        return None
+
+    def distance(self, P, uniforms):
+        args = [np.asarray(uniforms[arg] if isinstance(arg, str) else arg,
+                           dtype=np.float64) for arg in self.args]
+        return self._distance(P, *args)
+
+
+class Circle(Primitive):
+    """ Circle (center, radius) """
+
+    name = "SDF_circle"
+    params = ("center", "vec2"), ("radius", "float")
+    glsl = """
+float SDF_circle(vec2 p, vec2 center, float radius)
+{
+    return length(p - center) - radius;
+}
+"""
+
+    def _bounds(self, center, radius):
+        return tuple(center - radius) + tuple(center + radius)
+
+    def _distance(self, P, center, radius):
+        P = P - center
+        return np.hypot(P[...,0], P[...,1]) - radius
+
+
+class Box(Primitive):
+    """ Axis aligned box (center, half size) """
+
+    name = "SDF_box"
+    params = ("center", "vec2"), ("size", "vec2")
+    glsl = """
+float SDF_box(vec2 p, vec2 center, vec2 size)
+{
+    vec2 d = abs(p - center) - size;
+    return min(max(d.x,d.y),0.0) + length(max(d,0.0));
+}
+"""
+
+    def _bounds(self, center, size):
+        return tuple(center - size) + tuple(center + size)
+
+    def _distance(self, P, center, size):
+        D = np.abs(P - center) - size
+        inside = np.minimum(np.maximum(D[...,0], D[...,1]), 0)
+        D = np.maximum(D, 0)
+        return inside + np.hypot(D[...,0], D[...,1])
+
+
+class RoundBox(Box):
+    """ Axis aligned box with rounded corners (center, half size, radius) """
+
+    name = "SDF_round_box"
+    params = ("center", "vec2"), ("size", "vec2"), ("radius", "float")
+    glsl = """
+float SDF_round_box(vec2 p, vec2 center, vec2 size, float radius)
+{
+    vec2 d = abs(p - center) - size;
+    return min(max(d.x,d.y),0.0) + length(max(d,0.0)) - radius;
+}
+"""
+
+    def _bounds(self, center, size, radius):
+        return Box._bounds(self, center, size + radius)
+
+    def _distance(self, P, center, size, radius):
+        return Box._distance(self, P, center, size) - radius
+
+
+class FakeBox(Box):
+    """
+    Axis aligned box (center, half size) using the maximum of the distances
+    to the sides (exact inside, underestimated outside of the corners)
+    """
+
+    name = "SDF_fake_box"
+    exact = False
+    glsl = """
+float SDF_fake_box(vec2 p, vec2 center, vec2 size)
+{
+    vec2 d = abs(p - center) - size;
+    return max(d.x, d.y);
+}
+"""
+
+    def _distance(self, P, center, size):
+        D = np.abs(P - center) - size
+        return np.maximum(D[...,0], D[...,1])
+
+
+class Ellipse(Primitive):
+    """ Axis aligned ellipse (center, semi axes) """
+
+    name = "SDF_ellipse"
+    params = ("center", "vec2"), ("size", "vec2")
+    glsl = """
+float SDF_ellipse(vec2 p, vec2 center, vec2 ab)
+{
+    // The function does not like circles
+    if (ab.x == ab.y) ab.x = ab.x*0.9999;
+
+    p = abs(p - center); if( p.x > p.y ){ p=p.yx; ab=ab.yx; }
+    float l = ab.y*ab.y - ab.x*ab.x;
+    float m = ab.x*p.x/l;
+    float n = ab.y*p.y/l;
+    float m2 = m*m;
+    float n2 = n*n;
+    float c = (m2 + n2 - 1.0)/3.0;
+    float c3 = c*c*c;
+    float q = c3 + m2*n2*2.0;
+    float d = c3 + m2*n2;
+    float g = m + m*n2;
+    float co;
+
+    if( d<0.0 ) {
+        float h = acos(q/c3)/3.0;
+        float s = cos(h);
+        float t = sin(h)*sqrt(3.0);
+        float rx = sqrt( -c*(s + t + 2.0) + m2 );
+        float ry = sqrt( -c*(s - t + 2.0) + m2 );
+        co = ( ry + sign(l)*rx + abs(g)/(rx*ry) - m)/2.0;
+    } else {
+        float h = 2.0*m*n*sqrt( d );
+        float s = sign(q+h)*pow( abs(q+h), 1.0/3.0 );
+        float u = sign(q-h)*pow( abs(q-h), 1.0/3.0 );
+        float rx = -s - u - c*4.0 + 2.0*m2;
+        float ry = (s - u)*sqrt(3.0);
+        float rm = sqrt( rx*rx + ry*ry );
+        float h2 = ry/sqrt(rm-rx);
+        co = (h2 + 2.0*g/rm - m)/2.0;
+    }
+    float si = sqrt( 1.0 - co*co );
+    vec2 r = vec2( ab.x*co, ab.y*si );
+    return length(r - p ) * sign(p.y-r.y);
+}
+"""
+
+    def _bounds(self, center, size):
+        return tuple(center - size) + tuple(center + size)
+
+    def _distance(self, P, center, size):
+        P = np.abs(P - center)
+        A = np.broadcast_to(size, P.shape).copy()
+        A[...,0] = np.where(A[...,0] == A[...,1], A[...,0]*0.9999, A[...,0])
+        swap = P[...,0] > P[...,1]
+        px = np.where(swap, P[...,1], P[...,0])
+        py = np.where(swap, P[...,0], P[...,1])
+        a = np.where(swap, A[...,1], A[...,0])
+        b = np.where(swap, A[...,0], A[...,1])
+
+        l = b*b - a*a
+        m, n = a*px/l, b*py/l
+        m2, n2 = m*m, n*n
+        c = (m2 + n2 - 1)/3
+        c3 = c*c*c
+        q = c3 + 2*m2*n2
+        d = c3 + m2*n2
+        g = m + m*n2
+
+        # Both branches are evaluated and selected (as in the shader)
+        with np.errstate(all="ignore"):
+            h = np.arccos(np.clip(q/c3, -1, 1))/3
+            s, t = np.cos(h), np.sin(h)*np.sqrt(3)
+            rx = np.sqrt(-c*(s + t + 2) + m2)
+            ry = np.sqrt(-c*(s - t + 2) + m2)
+            co_inner = (ry + np.sign(l)*rx + np.abs(g)/(rx*ry) - m)/2
+
+            h = 2*m*n*np.sqrt(d)
+            s, u = np.cbrt(q + h), np.cbrt(q - h)
+            rx = -s - u - 4*c + 2*m2
+            ry = (s - u)*np.sqrt(3)
+            rm = np.hypot(rx, ry)
+            co_outer = (ry/np.sqrt(rm - rx) + 2*g/rm - m)/2
+        co = np.where(d < 0, co_inner, co_outer)
+        si = np.sqrt(np.maximum(1 - co*co, 0))
+        rx, ry = a*co, b*si
+        return np.hypot(rx - px, ry - py) * np.sign(py - ry)
+
+
+class Triangle(Primitive):
+    """ Triangle (p0, p1, p2) """
+
+    name = "SDF_triangle"
+    params = ("p0", "vec2"), ("p1", "vec2"), ("p2", "vec2")
+    glsl = """
+float SDF_triangle(vec2 p, vec2 p0, vec2 p1, vec2 p2)
+{
+    vec2 e0 = p1 - p0;
+    vec2 e1 = p2 - p1;
+    vec2 e2 = p0 - p2;
+
+    vec2 v0 = p - p0;
+    vec2 v1 = p - p1;
+    vec2 v2 = p - p2;
+
+    vec2 pq0 = v0 - e0*clamp( dot(v0,e0)/dot(e0,e0), 0.0, 1.0 );
+    vec2 pq1 = v1 - e1*clamp( dot(v1,e1)/dot(e1,e1), 0.0, 1.0 );
+    vec2 pq2 = v2 - e2*clamp( dot(v2,e2)/dot(e2,e2), 0.0, 1.0 );
+
+    float s = sign( e0.x*e2.y - e0.y*e2.x );
+    vec2 d = min( min( vec2( dot( pq0, pq0 ), s*(v0.x*e0.y-v0.y*e0.x) ),
+                       vec2( dot( pq1, pq1 ), s*(v1.x*e1.y-v1.y*e1.x) )),
+                       vec2( dot( pq2, pq2 ), s*(v2.x*e2.y-v2.y*e2.x) ));
+    return -sqrt(d.x)*sign(d.y);
+}
+"""
+
+    def _bounds(self, p0, p1, p2):
+        V = np.array([p0, p1, p2])
+        return tuple(V.min(axis=0)) + tuple(V.max(axis=0))
+
+    def _distance(self, P, p0, p1, p2):
+        E = [p1 - p0, p2 - p1, p0 - p2]
+        V = [P - p0, P - p1, P - p2]
+        s = np.sign(E[0][0]*E[2][1] - E[0][1]*E[2][0])
+        D2, S = [], []
+        for e, v in zip(E, V):
+            t = np.clip((v @ e)/(e @ e), 0, 1)
+            pq = v - e*t[...,np.newaxis]
+            D2.append((pq*pq).sum(axis=-1))
+            S.append(s*(v[...,0]*e[1] - v[...,1]*e[0]))
+        return -np.sqrt(np.minimum.reduce(D2)) * np.sign(np.minimum.reduce(S))
+
+
+class RoundTriangle(Triangle):
+    """ Triangle with rounded corners (p0, p1, p2, radius) """
+
+    name = "SDF_round_triangle"
+    params = Triangle.params + (("radius", "float"),)
+    requires = Triangle,
+    glsl = """
+float SDF_round_triangle(vec2 p, vec2 p0, vec2 p1, vec2 p2, float radius)
+{
+    return SDF_triangle(p, p0, p1, p2) - radius;
+}
+"""
+
+    def _bounds(self, p0, p1, p2, radius):
+        (xmin, ymin, xmax, ymax) = Triangle._bounds(self, p0, p1, p2)
+        return xmin-radius[0], ymin-radius[0], xmax+radius[0], ymax+radius[0]
+
+    def _distance(self, P, p0, p1, p2, radius):
+        return Triangle._distance(self, P, p0, p1, p2) - radius
+
+
+class FakeTriangle(Triangle):
+    """
+    Triangle (p0, p1, p2) using the maximum of the distances to the lines
+    supporting its edges (exact inside, underestimated outside of the
+    corners)
+    """
+
+    name = "SDF_fake_triangle"
+    exact = False
+    glsl = """
+float SDF_fake_triangle(vec2 p, vec2 p0, vec2 p1, vec2 p2)
+{
+    vec2 e0 = p1 - p0;
+    vec2 e1 = p2 - p1;
+    vec2 e2 = p0 - p2;
+
+    vec2 v0 = p - p0;
+    vec2 v1 = p - p1;
+    vec2 v2 = p - p2;
+
+    float s = -sign( e0.x*e2.y - e0.y*e2.x );
+    vec2 o0 = s*normalize(vec2(e0.y, -e0.x));
+    vec2 o1 = s*normalize(vec2(e1.y, -e1.x));
+    vec2 o2 = s*normalize(vec2(e2.y, -e2.x));
+
+    return max(max(dot(o0,v0), dot(o1,v1)), dot(o2,v2));
+}
+"""
+
+    def _distance(self, P, p0, p1, p2):
+        E = [p1 - p0, p2 - p1, p0 - p2]
+        s = -np.sign(E[0][0]*E[2][1] - E[0][1]*E[2][0])
+        D = [(P - p) @ (s*np.array([e[1], -e[0]])/np.hypot(e[0], e[1]))
+             for p, e in zip((p0, p1, p2), E)]
+        return np.maximum.reduce(D)
+
+
+class Plane(Primitive):
+    """ Half plane on the right of the (p0, p1) line """
+
+    name = "SDF_plane"
+    params = ("p0", "vec2"), ("p1", "vec2")
+    glsl = """
+float SDF_plane(vec2 p, vec2 p0, vec2 p1)
+{
+    vec2 T = p1 - p0;
+    vec2 O = normalize(vec2(T.y, -T.x));
+    return dot(O, p0 - p);
+}
+"""
+
+    def _distance(self, P, p0, p1):
+        T = p1 - p0
+        O = np.array([T[1], -T[0]]) / np.hypot(T[0], T[1])
+        return (p0 - P) @ O
+
+
+class Operation(SDF):
+    """ CSG operation on two shapes (not exact in general) """
+
+    name, glsl = None, None
+    exact = False
+
+    def __init__(self, a, b):
+        self.a, self.b = a, b
+        self.key = (type(self).__name__, a.key, b.key)
+
+    def __repr__(self):
+        return "%s(%r, %r)" % (type(self).__name__, self.a, self.b)
+
+    def distance(self, P, uniforms):
+        return self._combine(self.a.distance(P, uniforms),
+                             self.b.distance(P, uniforms))
+
+
+def _union(A, B):
+    """ Union of bounding boxes (None if unknown) """
+
+    if A is None or B is None:
+        return None
+    return tuple(np.minimum(A[:2], B[:2])) + tuple(np.maximum(A[2:], B[2:]))
+
+
+def _disjoint(a, b):
+    """
+    Whether shapes a and b have exact fields and bounding boxes known to be
+    disjoint. The distance to one of them is then never larger than the
+    distance to the boundary of the other one, such that their difference
+    is a and their exclusion is their union (distances included).
+    """
+
+    if not (a.exact and b.exact):
+        return False
+    A, B = a.bounds, b.bounds
+    if A is None or B is None:
+        return False
+    return A[2] < B[0] or B[2] < A[0] or A[3] < B[1] or B[3] < A[1]
+
+
+class Union(Operation):
+    """ Union (A or B) """
+
+    name = "csg_union"
+    glsl = """
+float csg_union(float d1, float d2)
+{
+    return min(d1,d2);
+}
+"""
+
+    @property
+    def bounds(self):
+        return _union(self.a.bounds, self.b.bounds)
+
+    def _combine(self, d1, d2):
+        return np.minimum(d1, d2)
+
+    def _simplify(self, a, b):
+        if isinstance(a, Empty) or a == b:
+            return b
+        if isinstance(b, Empty):
+            return a
+        return Union(a, b)
+
+
+class Intersection(Operation):
+    """ Intersection (A and B) """
+
+    name = "csg_intersection"
+    glsl = """
+float csg_intersection(float d1, float d2)
+{
+    return max(d1,d2);
+}
+"""
+
+    @property
+    def bounds(self):
+        A, B = self.a.bounds, self.b.bounds
+        if A is None or B is None:
+            return A or B
+        return tuple(np.maximum(A[:2], B[:2])) + tuple(np.minimum(A[2:], B[2:]))
+
+    def _combine(self, d1, d2):
+        return np.maximum(d1, d2)
+
+    def _simplify(self, a, b):
+        # Disjoint operands are kept: the shape is empty but its distance
+        # field is not (max(d1,d2) is finite)
+        if isinstance(a, Empty) or isinstance(b, Empty):
+            return Empty()
+        if a == b:
+            return a
+        return Intersection(a, b)
+
+
+class Difference(Operation):
+    """ Difference (A not B) """
+
+    name = "csg_difference"
+    glsl = """
+float csg_difference(float d1, float d2)
+{
+    return max(d1,-d2);
+}
+"""
+
+    @property
+    def bounds(self):
+        return self.a.bounds
+
+    def _combine(self, d1, d2):
+        return np.maximum(d1, -d2)
+
+    def _simplify(self, a, b):
+        if isinstance(a, Empty):
+            return a
+        if isinstance(b, Empty) or _disjoint(a, b):
+            return a
+        return Difference(a, b)
+
+
+class Exclusion(Operation):
+    """ Exclusion (A xor B) """
+
+    name = "csg_exclusion"
+    glsl = """
+float csg_exclusion(float d1, float d2)
+{
+    return min(max(d1,-d2), max(-d1,d2));
+}
+"""
+
+    @property
+    def bounds(self):
+        return _union(self.a.bounds, self.b.bounds)
+
+    def _combine(self, d1, d2):
+        return np.minimum(np.maximum(d1, -d2), np.maximum(-d1, d2))
+
+    def _simplify(self, a, b):
+        if isinstance(a, Empty):
+            return b
+        if isinstance(b, Empty):
+            return a
+        if _disjoint(a, b):
+            return Union(a, b)._simplify(a, b)
+        return Exclusion(a, b)
+
+
+def simplify(shape):
+    """
+    Remove the branches of a CSG tree that cannot change the distance field:
+    empty operands, identical operands and exact operands whose bounding
+    boxes are disjoint (e.g. the difference of disjoint circles A and B is A,
+    and their exclusion is their union). Disjoint operands are kept when one
+    of them is not exact (fake primitives, operations) since the rule then
+    changes distances, as well as disjoint intersections (the shape is empty
+    but its distance field is not).
+
+    Parameters
+    ----------
+    shape : SDF
+        CSG tree
+
+    Returns
+    -------
+    Simplified CSG tree
+    """
+
+    if isinstance(shape, Operation):
+        return shape._simplify(simplify(shape.a), simplify(shape.b))
+    return shape
+
+
+def _literal(value, gtype):
+    """ GLSL literal of a float or vec2 parameter """
+
+    if gtype == "float":
+        return repr(value[0])
+    return "%s(%s)" % (gtype, ", ".join(repr(v) for v in value))
+
+
+_cache = {}
+
+def function(shape, name="sdf"):
+    """
+    GLSL source of a "float name(vec2 p)" function computing a shape
+
+    The source contains the uniform declarations and the primitive and
+    operation functions it needs. Identical sub-trees are only computed once.
+
+    Parameters
+    ----------
+    shape : SDF
+        CSG tree (simplified before compilation)
+
+    name : str
+        Name of the function
+
+    Returns
+    -------
+    GLSL source (cached)
+    """
+
+    key = (name, shape.key)
+    if key in _cache:
+        return _cache[key]
+
+    functions, uniforms, variables, code = {}, {}, {}, []
+
+    def emit(node):
+        if node.key in variables:
+            return variables[node.key]
+        if isinstance(node, Empty):
+            return "1e20"
+        if isinstance(node, Operation):
+            args = [emit(node.a), emit(node.b)]
+        else:
+            args = ["p"]
+            for arg, (_, gtype) in zip(node.args, node.params):
+                if isinstance(arg, str):
+                    if uniforms.setdefault(arg, gtype) != gtype:
+                        raise ValueError("Uniform '%s' is both %s and %s" %
+                                         (arg, uniforms[arg], gtype))
+                    args.append(arg)
+                else:
+                    args.append(_literal(arg, gtype))
+            for primitive in node.requires:
+                functions.setdefault(primitive.name, primitive.glsl)
+        functions.setdefault(node.name, node.glsl)
+        variables[node.key] = "d%d" % len(variables)
+        code.append("    float %s = %s(%s);" % (
+            variables[node.key], node.name, ", ".join(args)))
+        return variables[node.key]
+
+    result = emit(simplify(shape))
+    source = "".join("uniform %s %s;\n" % (gtype, uniform)
+                     for uniform, gtype in uniforms.items())
+    source += "".join(functions.values())
+    source += "\nfloat %s(vec2 p)\n{\n" % name
+    source += "".join(line + "\n" for line in code)
+    source += "    return %s;\n}\n" % result
+    _cache[key] = source
+    return source
+
+
+palette = """
+vec4 color(float d)
+{
+    vec3 white = vec3(1.0, 1.0, 1.0);
+    vec3 blue  = vec3(0.1, 0.4, 0.7);
+    vec3 color = white - sign(d)*blue;
+    color *= (1.0 - exp(-4.0*abs(d))) * (0.8 + 0.2*cos(140.0*d));
+    color = mix(color, white, 1.0-smoothstep(0.0,0.02,abs(d)) );
+    return vec4(color, 1.0);
+}
+"""
+
+def shader(shape, position="gl_FragCoord.xy", scale=1.0):
+    """
+    Fragment shader displaying the distance field of a shape (using the
+    distance palette)
+
+    Parameters
+    ----------
+    shape : SDF
+        CSG tree
+
+    position : str
+        Fragment position in shape coordinates, either a GLSL expression
+        (e.g. gl_FragCoord.xy) or the name of a (declared) vec2 varying
+
+    scale : float
+        Distances are divided by scale before coloring
+
+    Returns
+    -------
+    GLSL source
+    """
+
+    declaration = ""
+    if not position.startswith("gl_"):
+        declaration = "varying vec2 %s;\n" % position
+    return (declaration + function(shape) + palette +
+            "\nvoid main()\n{\n"
+            "    gl_FragColor = color(sdf(%s)/%r);\n}\n" % (position,
+                                                           float(scale)))
+
+
+if __name__ == '__main__':
+
+    # Simplification must not change distances (CPU check)
+    P = np.random.uniform(-64, 64, (100000, 2))
+    A, B = Circle((30,0), 15), Circle((-30,0), 15)
+    F = FakeTriangle((0,-1), (10,0), (0,1))
+    for shape in (A - B, A ^ B, A & B, A - F, A ^ F, F - A, (A | F) - B,
+                  (A - B) - (B | F), A | Empty(), A - Empty(), A & A):
+        error = np.abs(shape(P) - simplify(shape)(P)).max()
+        print("%-.60s -> %-.60s: %g" % (shape, simplify(shape), error))
+        assert error < 1e-9
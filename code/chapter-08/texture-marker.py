@@ -5,15 +5,15 @@
 # Distributed under the 2-Clause BSD License.
 # -----------------------------------------------------------------------------
 import numpy as np
-from PIL import Image
 from glumpy import app, gl, gloo, data
-from glumpy.ext.sdf import compute_sdf
+from atlas import load
 
 
 vertex = """
   uniform vec2 resolution;
   uniform float linewidth;
   uniform float antialias;
+  uniform vec4 rect;
   attribute float size;
   attribute float orientation;
   attribute vec2 position;
@@ -27,7 +27,7 @@ vertex = """
                 p.y*cos(orientation) + p.x*sin(orientation));
       p += 2.0*position/resolution - 1.0;
       gl_Position = vec4(p, 0.0, 1.0);
-      v_texcoord = texcoord;
+      v_texcoord = mix(rect.xy, rect.zw, texcoord);
       v_size = size;
   } """
 
@@ -77,11 +77,10 @@ marker["texcoord"] = (0,1), (0,0), (1,1), (1,0),
 marker["antialias"] = 2.0
 marker["linewidth"] = 3.0
 
-texture = np.array(Image.open("firefox.png"))/255.0
-compute_sdf(texture)
-image = Image.fromarray((texture*255).astype(np.ubyte))
-image.save("firefox-sdf.png")
+texture, rects = load(["firefox.png"])
 marker["texture"] = texture[::-1,:]
+u0, v0, u1, v1 = rects[0]
+marker["rect"] = u0, 1-v1, u1, 1-v0
 marker["texture"].interpolation = gl.GL_LINEAR
 marker["texture"].wrapping = gl.GL_CLAMP
 
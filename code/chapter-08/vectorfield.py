@@ -0,0 +1,199 @@
+# -----------------------------------------------------------------------------
+# Python & OpenGL for Scientific Visualization
+# www.labri.fr/perso/nrougier/python+opengl
+# Copyright (c) 2018, Nicolas P. Rougier
+# Distributed under the 2-Clause BSD License.
+# -----------------------------------------------------------------------------
+# Vector field (quiver) driven by data arrays: each arrow is a point sprite
+# whose orientation, length and color are computed from its vector in the
+# vertex shader such that the arrow signed distance is only evaluated where
+# arrows are. Positions and vectors are stored in two different buffers such
+# that updating the vectors (e.g. streaming a simulation output, possibly
+# memory-mapped) does not upload the positions.
+# -----------------------------------------------------------------------------
+import numpy as np
+from glumpy import gl, gloo
+
+vertex = """
+    uniform vec4 extent;
+    uniform float size;
+    uniform float scale;
+    uniform float vmax;
+    uniform float linewidth;
+    uniform float antialias;
+    uniform sampler2D colormap;
+    attribute vec2 position;
+    attribute vec2 vector;
+    varying float v_theta;
+    varying float v_length;
+    varying vec4 v_color;
+    void main()
+    {
+        float magnitude = length(vector);
+        v_theta = -atan(vector.y, vector.x);
+        // Length of the arrow body, the outline and antialias area being kept
+        // inside the sprite
+        float body = size - linewidth - 2.0*antialias;
+        v_length = clamp(magnitude*scale, 0.0, body);
+        float t = clamp(magnitude/vmax, 0.0, 1.0);
+        v_color = texture2D(colormap, vec2(t, 0.5));
+        vec2 p = (position - extent.xy) / (extent.zw - extent.xy);
+        gl_Position = vec4(2.0*p - 1.0, 0.0, 1.0);
+        gl_PointSize = size;
+    }
+"""
+
+fragment = """
+#include "math/constants.glsl"
+#include "arrows/arrows.glsl"
+#include "antialias/antialias.glsl"
+
+uniform float size;
+uniform float linewidth;
+uniform float antialias;
+varying float v_theta;
+varying float v_length;
+varying vec4 v_color;
+void main()
+{
+    if (v_length <= 0.0)
+        discard;
+    vec2 texcoord = (gl_PointCoord - 0.5) * vec2(1.0, -1.0) * size;
+    float cos_theta = cos(v_theta);
+    float sin_theta = sin(v_theta);
+    texcoord = vec2(cos_theta*texcoord.x - sin_theta*texcoord.y,
+                    sin_theta*texcoord.x + cos_theta*texcoord.y);
+
+    float d = arrow_stealth(texcoord, v_length, 0.25*v_length,
+                            linewidth, antialias);
+    gl_FragColor = filled(d, linewidth, antialias, v_color);
+}
+"""
+
+
+def colormap(colors=None, count=256):
+    """
+    Colormap texture (linear interpolation of colors)
+
+    Parameters
+    ----------
+    colors : np.ndarray
+        (k,3) or (k,4) colors (default is a dark blue to yellow ramp)
+
+    count : int
+        Number of entries of the texture
+
+    Returns
+    -------
+    (1,count,4) float32 texture
+    """
+
+    if colors is None:
+        colors = [(0.27, 0.00, 0.33), (0.23, 0.32, 0.55), (0.13, 0.57, 0.55),
+                  (0.37, 0.79, 0.38), (0.99, 0.91, 0.14)]
+    colors = np.asarray(colors, dtype=np.float32)
+    if colors.shape[1] == 3:
+        colors = np.column_stack([colors, np.ones(len(colors))])
+    T = np.linspace(0, 1, count)
+    X = np.linspace(0, 1, len(colors))
+    C = np.column_stack([np.interp(T, X, colors[:,i]) for i in range(4)])
+    return C.astype(np.float32).reshape(1,count,4).view(gloo.Texture2D)
+
+
+class Quiver(object):
+    """
+    Vector field displayed as arrows
+
+    Parameters
+    ----------
+    positions : np.ndarray
+        (n,2) arrow positions (data coordinates)
+
+    vectors : np.ndarray
+        (n,2) arrow vectors (possibly memory-mapped)
+
+    size : float
+        Size of an arrow sprite (pixels), the longest arrow being
+        size - linewidth - 2*antialias long
+
+    scale : float
+        Length (pixels) of a unit vector, arrows being clamped to the maximum
+        length (default is such that the longest vector has the maximum
+        length)
+
+    extent : (float, float, float, float)
+        Visible domain (xmin, ymin, xmax, ymax), default to positions bounds
+        (padded by the mean spacing, or by 1 if positions are empty, a single
+        point or aligned)
+
+    vmax : float
+        Magnitude mapped to the last color of the colormap (default is the
+        largest initial magnitude), see also update()
+
+    colors : np.ndarray
+        Colors of the colormap (indexed by vector magnitude)
+    """
+
+    def __init__(self, positions, vectors, size=16.0, scale=None,
+                 extent=None, vmax=None, colors=None, linewidth=1.0,
+                 antialias=1.0):
+        n = len(positions)
+        self.positions = np.zeros((n,2), np.float32).view(gloo.VertexBuffer)
+        self.vectors = np.zeros((n,2), np.float32).view(gloo.VertexBuffer)
+        self.positions[...] = positions
+        self.update(vectors)
+
+        V, P = np.asarray(self.vectors), np.asarray(self.positions)
+        magnitude = np.sqrt((V**2).sum(axis=-1)).max() if n else 0
+        magnitude = magnitude if magnitude > 0 else 1.0
+        if extent is None:
+            low = P.min(axis=0) if n else np.zeros(2)
+            high = P.max(axis=0) if n else np.zeros(2)
+            pad = (high - low) / np.sqrt(max(n, 1))
+            pad[pad == 0] = pad.max() if pad.max() > 0 else 1.0
+            extent = tuple(low - pad) + tuple(high + pad)
+        xmin, ymin, xmax, ymax = extent
+        if xmax <= xmin or ymax <= ymin:
+            raise ValueError("Extent must have a positive width and height")
+        body = size - linewidth - 2*antialias
+
+        self.program = gloo.Program(vertex, fragment)
+        self.program["position"] = self.positions
+        self.program["vector"] = self.vectors
+        self.program["colormap"] = colormap(colors)
+        self.program["colormap"].interpolation = gl.GL_LINEAR
+        self.program["extent"] = extent
+        self.program["size"] = size
+        self.program["scale"] = scale if scale is not None else body/magnitude
+        self.program["vmax"] = vmax if vmax is not None else magnitude
+        self.program["linewidth"] = linewidth
+        self.program["antialias"] = antialias
+
+    def __len__(self):
+        return len(self.positions)
+
+    def update(self, vectors, start=0, vmax=None):
+        """
+        Update vectors (only the updated range is uploaded)
+
+        Parameters
+        ----------
+        vectors : np.ndarray
+            (k,2) new vectors (possibly memory-mapped)
+
+        start : int
+            Index of the first updated arrow
+
+        vmax : float
+            Magnitude mapped to the last color of the colormap (unchanged if
+            None, i.e. colors are not rescaled to the new vectors)
+        """
+
+        self.vectors[start:start+len(vectors)] = vectors
+        if vmax is not None:
+            self.program["vmax"] = vmax
+
+    def draw(self):
+        """ Draw arrows """
+
+        self.program.draw(gl.GL_POINTS)
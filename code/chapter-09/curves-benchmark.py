@@ -0,0 +1,27 @@
+# -----------------------------------------------------------------------------
+# Python & OpenGL for Scientific Visualization
+# www.labri.fr/perso/nrougier/python+opengl
+# Copyright (c) 2018, Nicolas P. Rougier
+# Distributed under the 2-Clause BSD License.
+# -----------------------------------------------------------------------------
+# Compare recursive (adaptive) and incremental (curve_inc) Bézier flattening
+# in terms of vertex count and wall time.
+# -----------------------------------------------------------------------------
+import timeit
+import numpy as np
+from curves import curve3_bezier, curve4_bezier, curve3_inc, curve4_inc
+
+np.random.seed(1)
+n = 1000
+Q = np.random.uniform(0, 512, (n,3,2))
+C = np.random.uniform(0, 512, (n,4,2))
+
+for name, P, recursive, incremental in [
+        ("curve3", Q, curve3_bezier, curve3_inc),
+        ("curve4", C, curve4_bezier, curve4_inc) ]:
+    for method, func in [("recursive", recursive), ("incremental", incremental)]:
+        count = sum(len(func(*p)) for p in P)
+        duration = min(timeit.repeat(lambda: [func(*p) for p in P],
+                                     number=1, repeat=3))
+        print("%s %-12s: %7d vertices, %6.1f ms (%d curves)"
+              % (name, method, count, 1000*duration, n))
@@ -332,3 +332,53 @@ def curve4_bezier( p1, p2, p3, p4 ):
     return np.array( points ).reshape(len(points),2)
 
 
+
+
+# -----------------------------------------------------------------------------
+def curve_horner(P, num_steps):
+    """
+    Evaluate a Bézier curve given by its control points P at num_steps+1
+    regularly spaced parameters using the Horner scheme on the power basis.
+    """
+    P = np.asarray(P, dtype=float)
+    if len(P) == 3:
+        p1, p2, p3 = P
+        C = [p1 - 2*p2 + p3, 2*(p2 - p1), p1]
+    else:
+        p1, p2, p3, p4 = P
+        C = [-p1 + 3*(p2 - p3) + p4, 3*(p1 - 2*p2 + p3), 3*(p2 - p1), p1]
+    t = np.linspace(0, 1, num_steps+1)[:,np.newaxis]
+    V = C[0]*np.ones_like(t)
+    for c in C[1:]:
+        V = V*t + c
+    # Make sure end point is exact
+    V[-1] = P[-1]
+    return V
+
+
+# -----------------------------------------------------------------------------
+def curve3_inc( p1, p2, p3, scale=None ):
+    """
+    Non recursive (incremental) approximation of a quadratic Bézier curve
+    where the number of steps is computed from the control polygon length
+    (see AGG curve3_inc).
+    """
+    scale = m_approximation_scale if scale is None else scale
+    P = np.array([p1, p2, p3], dtype=float)
+    length = np.sqrt(((P[1:]-P[:-1])**2).sum(axis=-1)).sum()
+    num_steps = max(int(round(length * 0.25 * scale)), 4)
+    return curve_horner(P, num_steps)
+
+
+# -----------------------------------------------------------------------------
+def curve4_inc( p1, p2, p3, p4, scale=None ):
+    """
+    Non recursive (incremental) approximation of a cubic Bézier curve
+    where the number of steps is computed from the control polygon length
+    (see AGG curve4_inc).
+    """
+    scale = m_approximation_scale if scale is None else scale
+    P = np.array([p1, p2, p3, p4], dtype=float)
+    length = np.sqrt(((P[1:]-P[:-1])**2).sum(axis=-1)).sum()
+    num_steps = max(int(round(length * 0.25 * scale)), 4)
+    return curve_horner(P, num_steps)
@@ -0,0 +1,176 @@
+# -----------------------------------------------------------------------------
+# Python & OpenGL for Scientific Visualization
+# www.labri.fr/perso/nrougier/python+opengl
+# Copyright (c) 2018, Nicolas P. Rougier
+# Distributed under the 2-Clause BSD License.
+# -----------------------------------------------------------------------------
+# Level of detail for long time series: when many samples fall onto the same
+# pixel column, only their minimum and maximum are visible. A pyramid of
+# min/max levels allows to get the min/max per pixel of any view at a cost
+# proportional to the width of the view (in pixels).
+# -----------------------------------------------------------------------------
+import numpy as np
+
+
+def minmax(Y, bins):
+    """
+    Min/max decimation of signals
+
+    Parameters
+    ----------
+    Y : np.ndarray
+        (..., n) signals
+
+    bins : int
+        Number of bins (e.g. pixel columns)
+
+    Returns
+    -------
+    (X, Y) where X is the (2*bins,) normalized position of the bins (in
+    [0,1]) and Y the (..., 2*bins) interleaved min and max of each bin.
+    """
+
+    return _minmax(Y, Y, bins)
+
+
+def _minmax(lower, upper, bins):
+    """ Min/max of lower and upper bounds over bins """
+
+    n = lower.shape[-1]
+    edges = np.linspace(0, n, bins+1)
+    start = np.minimum(edges[:-1].astype(int), n-1)
+    X = np.repeat((edges[:-1] + edges[1:])/(2*n), 2)
+    Y = np.empty(lower.shape[:-1] + (2*bins,), dtype=lower.dtype)
+    Y[...,0::2] = np.minimum.reduceat(lower, start, axis=-1)
+    Y[...,1::2] = np.maximum.reduceat(upper, start, axis=-1)
+    return X, Y
+
+
+def lttb(X, Y, count):
+    """
+    Largest triangle three buckets decimation of signals
+
+    The first and last samples are always kept and a sample is chosen in each
+    of the (count-2) buckets in between such that it forms the largest
+    triangle with the previously chosen sample and the average of the next
+    bucket. Signals are processed at once, the loop being on buckets.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        (n,) samples position
+
+    Y : np.ndarray
+        (..., n) signals
+
+    count : int
+        Number of samples to keep
+
+    Returns
+    -------
+    (..., count) indices of the kept samples
+    """
+
+    n = Y.shape[-1]
+    if count >= n or count < 3:
+        return np.broadcast_to(np.arange(n), Y.shape).copy()
+    every = (n-2)/(count-2)
+    edges = 1 + (np.arange(count-1)*every).astype(int)
+    edges[-1] = n-1
+    index = np.zeros(Y.shape[:-1] + (count,), dtype=int)
+    index[...,-1] = n-1
+    for i in range(count-2):
+        start, stop = edges[i], edges[i+1]
+        after = edges[i+2] if i+2 < len(edges) else n
+        cx = X[stop:after].mean()
+        cy = Y[...,stop:after].mean(axis=-1)
+        ax = X[index[...,i]]
+        ay = np.take_along_axis(Y, index[...,i:i+1], axis=-1)[...,0]
+        ax, ay = ax[...,np.newaxis], ay[...,np.newaxis]
+        area = np.abs((ax - cx)*(Y[...,start:stop] - ay) -
+                      (ax - X[start:stop])*(cy[...,np.newaxis] - ay))
+        index[...,i+1] = start + np.argmax(area, axis=-1)
+    return index
+
+
+class Pyramid(object):
+    """
+    Multi-resolution min/max pyramid of signals
+
+    Level 0 is the signals themselves and each level is made of the min and
+    max of `factor` consecutive entries of the previous level.
+
+    Parameters
+    ----------
+    Y : np.ndarray
+        (..., n) signals (not copied)
+
+    factor : int
+        Reduction factor between two consecutive levels
+
+    size : int
+        Minimum size of the coarsest level
+    """
+
+    def __init__(self, Y, factor=4, size=1024):
+        self.factor = factor
+        self.levels = [(Y, Y)]
+        lower, upper = Y, Y
+        while lower.shape[-1] > size*factor:
+            lower = self._reduce(lower, np.minimum)
+            upper = self._reduce(upper, np.maximum)
+            self.levels.append((lower, upper))
+
+    def __len__(self):
+        return self.levels[0][0].shape[-1]
+
+    def _reduce(self, Z, ufunc):
+        """ Reduce Z along last axis by blocks of `factor` entries """
+
+        n = Z.shape[-1] - Z.shape[-1] % self.factor
+        blocks = Z[...,:n].reshape(Z.shape[:-1] + (-1, self.factor))
+        R = blocks[...,0].copy()
+        for i in range(1, self.factor):
+            ufunc(R, blocks[...,i], out=R)
+        if n < Z.shape[-1]:
+            tail = ufunc.reduce(Z[...,n:], axis=-1)[...,np.newaxis]
+            R = np.concatenate([R, tail], axis=-1)
+        return R
+
+    def level(self, count, width):
+        """
+        Coarsest level such that there are at least `width` entries for
+        `count` samples.
+        """
+
+        level = 0
+        while (level+1 < len(self.levels) and
+               count // self.factor**(level+1) >= width):
+            level += 1
+        return level
+
+    def view(self, start, stop, width):
+        """
+        Min/max decimation of samples between start and stop
+
+        Parameters
+        ----------
+        start, stop : int
+            Samples range
+
+        width : int
+            Width of the view (in pixels)
+
+        Returns
+        -------
+        (X, Y) where X is the (2*width,) position of the bins (in samples)
+        and Y the (..., 2*width) interleaved min and max of each bin.
+        """
+
+        start, stop = max(int(start), 0), min(int(stop), len(self))
+        level = self.level(stop - start, width)
+        step = self.factor**level
+        first, last = start // step, -(-stop // step)
+        lower, upper = self.levels[level]
+        X, Y = _minmax(lower[...,first:last], upper[...,first:last], width)
+        return first*step + X*(last-first)*step, Y
@@ -0,0 +1,227 @@
+# -----------------------------------------------------------------------------
+# Python & OpenGL for Scientific Visualization
+# www.labri.fr/perso/nrougier/python+opengl
+# Copyright (c) 2018, Nicolas P. Rougier
+# Distributed under the 2-Clause BSD License.
+# -----------------------------------------------------------------------------
+# Line baking for triangle strip rendering: each point of a line is turned
+# into two vertices (one on each side of the line) that know about the
+# previous and next points of the line and the curvilinear abscissa.
+# -----------------------------------------------------------------------------
+import numpy as np
+
+
+def _close(P, closed, epsilon=1e-10):
+    """ Append first point of P at the end if closed and not already there """
+
+    if closed and ((P[0]-P[-1])**2).sum() > epsilon:
+        P = np.concatenate([P, P[:1]])
+    return P
+
+
+def _cumlength(P, start=0.0):
+    """ Cumulative length along P (starting at given length) """
+
+    L = np.empty(len(P))
+    L[0] = start
+    np.cumsum(np.sqrt(((P[1:]-P[:-1])**2).sum(axis=-1)), out=L[1:])
+    L[1:] += start
+    return L
+
+
+def bake(P, closed=False):
+    """
+    Bake a 2D line for triangle strip rendering
+
+    Parameters
+    ----------
+    P : np.ndarray
+        (n,2) line points
+
+    closed : bool
+        Whether line is closed
+
+    Returns
+    -------
+    (V_prev, V_curr, V_next, length) where V_* are (n,2,4) views of the
+    same array (x, y, side, curvilinear abscissa).
+    """
+
+    P = _close(np.asarray(P), closed)
+    n = len(P)
+    V = np.zeros(((1+n+1),2,4), dtype=np.float32)
+    V_prev, V_curr, V_next = V[:-2], V[1:-1], V[2:]
+    V_curr[...,0] = P[:,np.newaxis,0]
+    V_curr[...,1] = P[:,np.newaxis,1]
+    V_curr[...,2] = 1,-1
+    L = _cumlength(P)
+    V_curr[...,3] = L[:,np.newaxis]
+    if closed:
+        V[0], V[-1] = V[-3], V[2]
+    else:
+        V[0], V[-1] = V[1], V[-2]
+    return V_prev, V_curr, V_next, L[-1:]
+
+
+def bake3d(P, closed=False):
+    """
+    Bake a 3D line for triangle strip rendering
+
+    Parameters
+    ----------
+    P : np.ndarray
+        (n,3) line points
+
+    closed : bool
+        Whether line is closed
+
+    Returns
+    -------
+    (V_prev, V_curr, V_next, UV, length) where V_* are (n,2,3) views of the
+    same array and UV (n,2,2) holds curvilinear abscissa and side.
+    """
+
+    P = _close(np.asarray(P), closed)
+    n = len(P)
+    V = np.zeros(((1+n+1),2,3), dtype=np.float32)
+    UV = np.zeros((n,2,2), dtype=np.float32)
+    V_prev, V_curr, V_next = V[:-2], V[1:-1], V[2:]
+    V_curr[...] = P[:,np.newaxis]
+    L = _cumlength(P)
+    UV[...,0] = L[:,np.newaxis]
+    UV[...,1] = 1,-1
+    if closed:
+        V[0], V[-1] = V[-3], V[2]
+    else:
+        V[0], V[-1] = V[1], V[-2]
+    return V_prev, V_curr, V_next, UV, L[-1:]
+
+
+def bake_many(lines, closed=False):
+    """
+    Bake several 2D lines into a single buffer that can be rendered using a
+    single triangle strip (lines are separated by degenerated triangles).
+
+    Parameters
+    ----------
+    lines : list of np.ndarray
+        (n_i,2) line points
+
+    closed : bool
+        Whether lines are closed
+
+    Returns
+    -------
+    (vertices, offsets, lengths) where vertices is a structured array with
+    prev, curr, next (x, y, side, curvilinear abscissa) and length (length
+    of the line) fields, offsets the (k+1) offsets of the lines in vertices
+    (the last two vertices of a line being separators) and lengths the
+    length of each line.
+    """
+
+    lines = [_close(np.asarray(P, dtype=float).reshape(-1,2), closed)
+             for P in lines]
+    count = np.array([len(P) for P in lines], dtype=int)
+    start = np.cumsum(count) - count
+    end = start + count - 1
+    P = np.concatenate(lines) if lines else np.zeros((0,2))
+    line = np.repeat(np.arange(len(lines)), count)
+
+    # Cumulative length restarting at each line
+    D = np.zeros(len(P))
+    D[1:] = np.sqrt(((P[1:]-P[:-1])**2).sum(axis=-1))
+    D[start] = 0
+    L = np.cumsum(D)
+    L -= L[start][line]
+    lengths = L[end]
+
+    # Previous and next points (wrapping around for closed lines)
+    index = np.arange(len(P))
+    prev, next = index - 1, index + 1
+    prev[start], next[end] = (end-1, start+1) if closed else (start, end)
+
+    vtype = [('prev',   np.float32, 4),
+             ('curr',   np.float32, 4),
+             ('next',   np.float32, 4),
+             ('length', np.float32)]
+    V = np.zeros(2*len(P) + 2*max(len(lines)-1, 0), dtype=vtype)
+    row = 2*index + 2*line
+    for side, offset in (1, 0), (-1, 1):
+        for name, I in ("prev", prev), ("curr", index), ("next", next):
+            V[name][row+offset] = np.column_stack(
+                [P[I], np.full(len(P), side), L[I]])
+        V["length"][row+offset] = lengths[line]
+
+    # Degenerated triangles (repeating last and first vertices)
+    separator = 2*end[:-1] + 2*np.arange(len(lines)-1) + 2
+    V[separator] = V[separator-1]
+    V[separator+1] = V[separator+2]
+    offsets = np.append(2*start + 2*np.arange(len(lines)), len(V))
+    return V, offsets, lengths
+
+
+class Line(object):
+    """
+    2D line that can grow by appending points, previously baked points
+    being left untouched (appending k points costs O(k)).
+
+    Parameters
+    ----------
+    capacity : int
+        Initial number of points that can be stored before reallocation
+    """
+
+    def __init__(self, capacity=1024):
+        self._data = np.zeros((1+capacity+1,2,4), dtype=np.float32)
+        self._count = 0
+        self._length = 0.0
+        self._last = None
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def length(self):
+        """ Current length of the line """
+        return self._length
+
+    @property
+    def baked(self):
+        """ (V_prev, V_curr, V_next) views (as returned by bake) """
+        V = self._data[:self._count+2]
+        return V[:-2], V[1:-1], V[2:]
+
+    def append(self, P):
+        """
+        Append points to the line
+
+        Parameters
+        ----------
+        P : np.ndarray
+            (k,2) points
+        """
+
+        P = np.asarray(P, dtype=float).reshape(-1,2)
+        n, k = self._count, len(P)
+        if not k:
+            return
+        if n+k+2 > len(self._data):
+            data = np.zeros((2*(n+k)+2,2,4), dtype=np.float32)
+            data[:n+2] = self._data[:n+2]
+            self._data = data
+
+        # Curvilinear abscissa continues from the last point
+        if n:
+            L = _cumlength(np.concatenate([[self._last], P]), self._length)[1:]
+        else:
+            L = _cumlength(P)
+        V = self._data[1+n:1+n+k]
+        V[...,0] = P[:,np.newaxis,0]
+        V[...,1] = P[:,np.newaxis,1]
+        V[...,2] = 1,-1
+        V[...,3] = L[:,np.newaxis]
+        self._data[0] = self._data[1]
+        self._data[1+n+k] = self._data[n+k]
+        self._count = n+k
+        self._length = L[-1]
+        self._last = P[-1]
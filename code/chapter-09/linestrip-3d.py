@@ -8,6 +8,7 @@ import sys
 import ctypes
 import numpy as np
 from glumpy import app, gloo, gl, glm
+from lines import bake3d
 
 vertex = """
 uniform vec2 viewport;
@@ -101,28 +102,6 @@ def on_draw(dt):
     spiral['model'] = model
 
 
-def bake(P, closed=False):
-    epsilon = 1e-10
-    n = len(P)
-    if closed and ((P[0]-P[-1])**2).sum() > epsilon:
-        P = np.append(P, P[0])
-        P = P.reshape(n+1,3)
-        n = n+1
-    V = np.zeros(((1+n+1),2,3), dtype=np.float32)
-    UV = np.zeros((n,2,2), dtype=np.float32)
-    V_prev, V_curr, V_next = V[:-2], V[1:-1], V[2:]
-    V_curr[...,0] = P[:,np.newaxis,0]
-    V_curr[...,1] = P[:,np.newaxis,1]
-    V_curr[...,2] = P[:,np.newaxis,2]
-    L = np.cumsum(np.sqrt(((P[1:]-P[:-1])**2).sum(axis=-1))).reshape(n-1,1)
-    UV[1:,:,0] = L
-    UV[...,1] = 1,-1
-    if closed:
-        V[0], V[-1] = V[-3], V[2]
-    else:
-        V[0], V[-1] = V[1], V[-2]
-    return V_prev, V_curr, V_next, UV, L[-1]
-
 n = 2048
 T = np.linspace(0, 20*2*np.pi, n, dtype=np.float32)
 R = np.linspace(.1, np.pi-.1, n, dtype=np.float32)
@@ -132,7 +111,7 @@ Z = np.cos(R)
 P = np.dstack((X,Y,Z)).squeeze()
 
 
-V_prev, V_curr, V_next, UV, length = bake(P)
+V_prev, V_curr, V_next, UV, length = bake3d(P)
 spiral = gloo.Program(vertex, fragment)
 spiral["prev"], spiral["curr"], spiral["next"]  = V_prev, V_curr, V_next
 spiral["uv"] = UV
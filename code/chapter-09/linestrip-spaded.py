@@ -8,6 +8,7 @@ import sys
 import ctypes
 import numpy as np
 from glumpy import app, gloo, gl
+from lines import bake
 
 vertex = """
 uniform vec2 resolution;
@@ -105,18 +106,6 @@ def on_draw(dt):
     line["phase"] = phase
     line.draw(gl.GL_TRIANGLE_STRIP)
 
-def bake(P):
-    n = len(P)
-    V = np.zeros(((1+n+1),2,4), dtype=np.float32)
-    V_prev, V_curr, V_next = V[:-2], V[1:-1], V[2:]
-    V_curr[...,0] = P[:,np.newaxis,0]
-    V_curr[...,1] = P[:,np.newaxis,1]
-    V_curr[...,2] = 1,-1
-    L = np.cumsum(np.sqrt(((P[1:]-P[:-1])**2).sum(axis=-1))).reshape(n-1,1)
-    V_curr[1:,:,3] = L
-    V[0], V[-1] = V[1], V[-2]
-    return V_prev, V_curr, V_next, L[-1]
-
 n = 512
 T = np.linspace(0, 5*2*np.pi, n, dtype=np.float32)
 R = np.linspace(64, 240, n, dtype=np.float32)
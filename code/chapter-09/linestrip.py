@@ -8,6 +8,7 @@ import sys
 import ctypes
 import numpy as np
 from glumpy import app, gloo, gl
+from lines import bake
 
 vertex = """
 uniform vec2 resolution;
@@ -93,26 +94,6 @@ def star(inner=0.45, outer=1.0, n=5):
     P[:,1]= R*np.sin(T)
     return P
 
-def bake(P, closed=False):
-    epsilon = 1e-10
-    n = len(P)
-    if closed and ((P[0]-P[-1])**2).sum() > epsilon:
-        P = np.append(P, P[0])
-        P = P.reshape(n+1,2)
-        n = n+1
-    V = np.zeros(((1+n+1),2,4), dtype=np.float32)
-    V_prev, V_curr, V_next = V[:-2], V[1:-1], V[2:]
-    V_curr[...,0] = P[:,np.newaxis,0]
-    V_curr[...,1] = P[:,np.newaxis,1]
-    V_curr[...,2] = 1,-1
-    L = np.cumsum(np.sqrt(((P[1:]-P[:-1])**2).sum(axis=-1))).reshape(n-1,1)
-    V_curr[1:,:,3] = L
-    if closed:
-        V[0], V[-1] = V[-3], V[2]
-    else:
-        V[0], V[-1] = V[1], V[-2]
-    return V_prev, V_curr, V_next, L[-1]
-
 n = 1024
 T = np.linspace(0, 12*2*np.pi, n, dtype=np.float32)
 R = np.linspace(10, 246, n, dtype=np.float32)
@@ -0,0 +1,169 @@
+# -----------------------------------------------------------------------------
+# Python & OpenGL for Scientific Visualization
+# www.labri.fr/perso/nrougier/python+opengl
+# Copyright (c) 2018, Nicolas P. Rougier
+# Distributed under the 2-Clause BSD License.
+# -----------------------------------------------------------------------------
+# Multi-channel recordings stored as raw binary files (sample-major, i.e. all
+# channels for sample 0, then sample 1, etc.) and accessed through a memory
+# map: only the pages corresponding to the requested windows are read from
+# disk, such that recordings much larger than memory can be scrubbed. A
+# background thread pages in the next window while the current one is used.
+# -----------------------------------------------------------------------------
+import os
+import mmap
+import threading
+import numpy as np
+
+
+class Recording(object):
+    """
+    Memory-mapped multi-channel recording
+
+    Parameters
+    ----------
+    filename : str
+        Raw binary file (sample-major)
+
+    count : int
+        Number of channels
+
+    dtype : np.dtype
+        Type of samples
+
+    prefetch : bool
+        Whether to page in the next window in a background thread
+    """
+
+    def __init__(self, filename, count, dtype=np.float32, prefetch=True):
+        dtype = np.dtype(dtype)
+        n = os.path.getsize(filename) // (dtype.itemsize*count)
+        if n:
+            self.data = np.memmap(filename, dtype=dtype, mode="r",
+                                  shape=(n, count))
+        else:
+            # An empty file cannot be memory-mapped
+            self.data = np.zeros((0, count), dtype=dtype)
+        self.cursor = 0
+        self._pending = None
+        self._condition = threading.Condition()
+        self._thread = None
+        if prefetch and n:
+            self._thread = threading.Thread(target=self._prefetch)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def count(self):
+        """ Number of channels """
+        return self.data.shape[1]
+
+    def view(self, start, stop):
+        """
+        Window of the recording (no copy, nothing is read until used)
+
+        Parameters
+        ----------
+        start, stop : int
+            Samples range (clipped to the recording)
+
+        Returns
+        -------
+        (stop-start, count) memory-mapped view
+        """
+
+        start = min(max(int(start), 0), len(self))
+        stop = min(max(int(stop), start), len(self))
+        return self.data[start:stop]
+
+    def read(self, start, stop):
+        """
+        Read a window of the recording and schedule the next one
+
+        Parameters
+        ----------
+        start, stop : int
+            Samples range (clipped to the recording)
+
+        Returns
+        -------
+        (stop-start, count) float32 array (that can be directly uploaded
+        as ydata of a ring buffer)
+        """
+
+        Y = np.array(self.view(start, stop), dtype=np.float32)
+        self.prefetch(stop, 2*stop - start)
+        return Y
+
+    def next(self, k):
+        """
+        Read the next k samples (looping at the end of the recording, the
+        recording being repeated if it is shorter than k samples)
+
+        Parameters
+        ----------
+        k : int
+            Number of samples
+
+        Returns
+        -------
+        (k, count) float32 array (empty if the recording is empty)
+        """
+
+        if not len(self) or k <= 0:
+            return np.zeros((0, self.count), dtype=np.float32)
+        blocks = []
+        while k > 0:
+            stop = min(self.cursor + k, len(self))
+            blocks.append(self.read(self.cursor, stop))
+            k -= stop - self.cursor
+            self.cursor = stop % len(self)
+        if len(blocks) == 1:
+            return blocks[0]
+        return np.concatenate(blocks)
+
+    def prefetch(self, start, stop):
+        """
+        Page in a window of the recording in the background. Only the most
+        recent request is kept such that fast scrubbing does not queue stale
+        windows.
+        """
+
+        if self._thread is None or stop <= start:
+            return
+        with self._condition:
+            self._pending = start, stop
+            self._condition.notify()
+
+    def _prefetch(self):
+        """ Prefetch thread: touch one value per page of pending windows """
+
+        step = max(mmap.PAGESIZE // self.data.itemsize, 1)
+        while True:
+            with self._condition:
+                while self._pending is None:
+                    self._condition.wait()
+                start, stop = self._pending
+                self._pending = None
+            view = self.view(start, stop).reshape(-1)
+            view[::step].sum()
+            view[-1:].sum()
+
+
+def save(filename, Y):
+    """
+    Save signals as a raw recording
+
+    Parameters
+    ----------
+    filename : str
+        Raw binary file
+
+    Y : np.ndarray
+        (n, count) samples
+    """
+
+    np.ascontiguousarray(Y).tofile(filename)
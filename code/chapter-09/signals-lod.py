@@ -0,0 +1,65 @@
+# -----------------------------------------------------------------------------
+# Python & OpenGL for Scientific Visualization
+# www.labri.fr/perso/nrougier/python+opengl
+# Copyright (c) 2018, Nicolas P. Rougier
+# Distributed under the 2-Clause BSD License.
+# -----------------------------------------------------------------------------
+# Long signal (10 millions samples) displayed using a min/max pyramid: the
+# number of vertices is twice the width of the window whatever the zoom level
+# (mouse scroll to zoom, mouse drag to pan).
+# -----------------------------------------------------------------------------
+import numpy as np
+from glumpy import app, gloo, gl
+from decimate import Pyramid
+
+vertex = """
+    attribute vec2 position;
+    void main() {
+        gl_Position = vec4(position, 0.0, 1.0);
+    } """
+
+fragment = """
+  void main() {
+      gl_FragColor = vec4(vec3(0.0), 1.0);
+  } """
+
+width, height = 2*512, 512
+window = app.Window(width, height, color=(1,1,1,1))
+
+n = 10000000
+data = np.cumsum(np.random.normal(0, 1, n)).astype(np.float32)
+data = (data - data.min()) / (data.max() - data.min())
+pyramid = Pyramid(data)
+start, stop = 0, n
+
+signal = gloo.Program(vertex, fragment, count=2*width)
+
+def update():
+    X, Y = pyramid.view(start, stop, width)
+    signal["position"] = np.stack([-1.0 + 2.0*(X-start)/(stop-start),
+                                   -0.9 + 1.8*Y], axis=-1)
+
+def zoom(center, size):
+    global start, stop
+    size = int(min(max(size, 32), n))
+    start = int(min(max(center - size/2, 0), n - size))
+    stop = start + size
+    update()
+
+@window.event
+def on_draw(dt):
+    window.clear()
+    signal.draw(gl.GL_LINE_STRIP)
+
+@window.event
+def on_mouse_scroll(x, y, dx, dy):
+    center = start + (stop-start)*x/width
+    scale = 0.9 if dy > 0 else 1/0.9
+    zoom(center + (start + (stop-start)/2 - center)*scale, (stop-start)*scale)
+
+@window.event
+def on_mouse_drag(x, y, dx, dy, buttons):
+    zoom(start + (stop-start)/2 - dx*(stop-start)/width, stop-start)
+
+update()
+app.run()
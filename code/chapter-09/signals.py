@@ -4,52 +4,134 @@
 # Copyright (c) 2018, Nicolas P. Rougier
 # Distributed under the 2-Clause BSD License.
 # -----------------------------------------------------------------------------
+# Real-time signals using a ring buffer: new samples are written at a moving
+# head and only the corresponding part of the buffer is uploaded.
+#
+# Samples are stored slot-major (all signals for slot 0, then slot 1, etc.) such
+# that a new sample for every signal is a contiguous block of the buffer. An
+# index buffer gives the drawing order (signal by signal). An extra slot (copy
+# of the first one) allows to link the last and the first slot.
+#
+# Uploads only depend on the number of new samples, but drawing does not: each
+# frame draws (size+1)*count vertices, and the ydata, slot and index
+# attributes together with the index buffer take 16 bytes per vertex. For
+# example, 10,000 signals of 10,000 samples take 1.6 GB of GPU memory.
+#
+# Usage: signals.py [recording] where recording is an optional raw float32
+# file (sample-major, 300 channels) that is memory-mapped (see recording.py).
+# -----------------------------------------------------------------------------
+import sys
 import numpy as np
 from glumpy import app, gloo, gl
+from recording import Recording
 
 vertex = """
     uniform vec2 shape;
-    attribute float xdata, ydata, index;
-    varying float v_index;
+    uniform float size;
+    uniform float head;
+    attribute float ydata, slot, index;
+    varying float v_index, v_wrap;
     void main() {
         float rows = shape.x;
         float cols = shape.y;
         float i = mod(index,cols);
         float j = index/cols - fract(index/cols);
+
+        // Oldest sample is at head, newest sample is at head-1
+        float wrap = floor((slot - head)/size);
+        float xdata = (slot - head - wrap*size)/(size - 1.0);
+
         float x = -1.0 + (0.025 + i + 0.95*xdata)*(2.0/cols);
         float y = -1.0 + (0.025 + j + 0.95*ydata)*(2.0/rows);
         gl_Position = vec4(vec2(x, y), 0.0, 1.0);
         v_index = index;
+        v_wrap = wrap;
     } """
 
 fragment = """
-  varying float v_index;
+  varying float v_index, v_wrap;
   void main() {
-      if (fract(v_index) == 0)
+      if ((fract(v_index) == 0) && (fract(v_wrap) == 0))
           gl_FragColor = vec4(vec3(0.5), 1.0);
   } """
 
 window = app.Window(2*512, 512, color=(1,1,1,1))
 
 rows, cols, size = 15, 20, 100
-ydata = np.random.uniform(0, 1, (rows, cols, size)).astype(np.float32)
-xdata = np.zeros((rows*cols, size), dtype=np.float32)
-xdata[:] = np.linspace(0, 1, size, endpoint=True)
-index = np.zeros((rows*cols, size), dtype=np.float32)
-index[:] = np.arange(rows*cols)[:,np.newaxis]
-
-signals = gloo.Program(vertex, fragment, count=rows*cols*size)
-signals["xdata"] = xdata.ravel()
-signals["ydata"] = ydata.ravel()
-signals["index"] = index.ravel()
+count = rows*cols
+head = 0
+
+if len(sys.argv) > 1:
+    source = Recording(sys.argv[1], count)
+    if not len(source):
+        raise ValueError("Recording %s has no samples" % sys.argv[1])
+    read = source.next
+else:
+    read = lambda k: np.random.uniform(0, 1, (k, count))
+
+ydata = np.zeros((size+1, count), dtype=np.float32)
+ydata[:size] = read(size)
+ydata[size] = ydata[0]
+ydata = ydata.ravel().view(gloo.VertexBuffer)
+slot = np.repeat(np.arange(size+1), count).astype(np.float32)
+index = np.tile(np.arange(count), size+1).astype(np.float32)
+indices = np.arange((size+1)*count, dtype=np.uint32)
+indices = indices.reshape(size+1, count).T.ravel().view(gloo.IndexBuffer)
+
+signals = gloo.Program(vertex, fragment)
+signals["ydata"] = ydata
+signals["slot"] = slot
+signals["index"] = index
 signals["shape"] = rows, cols
+signals["size"] = size
+signals["head"] = head
+
+def push(samples):
+    """
+    Write new samples at head (and move head)
+
+    Parameters
+    ----------
+    samples : np.ndarray
+        (k, rows*cols) new samples (only the last size samples are kept if
+        k is greater than size)
+    """
+
+    global head
+    samples = np.asarray(samples, dtype=np.float32).reshape(-1, count)
+    k = len(samples)
+    if k == 0:
+        return
+    if k > size:
+        head = (head + k - size) % size
+        samples, k = samples[-size:], size
+
+    # Slot ranges written, up to the end of the ring and then from its start
+    # (the extra slot being a copy of slot 0)
+    n = min(k, size - head)
+    blocks = [(head, samples[:n])]
+    if k > n:
+        blocks.append((0, samples[n:]))
+    if head == 0 or k > n:
+        blocks.append((size, samples[n if k > n else 0][np.newaxis]))
+
+    # glumpy uploads a single (merged) dirty range per buffer: ranges that are
+    # not contiguous are uploaded one at a time (instead of the whole buffer)
+    blocks.sort(key=lambda block: block[0])
+    stop = None
+    for start, block in blocks:
+        if stop is not None and start != stop:
+            ydata.activate()
+            ydata.deactivate()
+        stop = start + len(block)
+        ydata[start*count:stop*count] = block.ravel()
+    head = (head + k) % size
+    signals["head"] = head
 
 @window.event
 def on_draw(dt):
     window.clear()
-    signals.draw(gl.GL_LINE_STRIP)
-    ydata = signals["ydata"].reshape(rows, cols, size)
-    ydata[:,:,:-1] = ydata[:,:,1:]
-    ydata[:,:,-1] = np.random.uniform(0, 1, (rows, cols))
-    
+    signals.draw(gl.GL_LINE_STRIP, indices)
+    push(read(1))
+
 app.run()
@@ -362,7 +362,7 @@ def elliptical_arc(x0, y0, rx, ry, angle, large_arc_flag, sweep_flag, x2, y2):
     cos_a = math.cos(angle)
     sin_a = math.sin(angle)
     if rx < 0.0: rx = -rx
-    if ry < 0.0: ry = -rx
+    if ry < 0.0: ry = -ry
 
     # Calculate the middle point between
     # the current and the final points
@@ -451,10 +451,415 @@ def elliptical_arc(x0, y0, rx, ry, angle, large_arc_flag, sweep_flag, x2, y2):
     if sweep_angle <= -2.0 * math.pi:
         sweep_angle = -2.0 * math.pi
 
-    V = arc( cx, cy, rx, ry, start_angle, start_angle+sweep_angle, sweep_flag )
+    V = np.array(arc( cx, cy, rx, ry, start_angle, start_angle+sweep_angle, sweep_flag ))
     c = math.cos(angle)
     s = math.sin(angle)
     X,Y = V[:,0]-cx, V[:,1]-cy
     V[:,0] = c*X - s*Y + cx
     V[:,1] = s*X + c*Y + cy
     return V
+
+
+
+def elliptical_arc_batch(P0, R, angle, large_arc_flag, sweep_flag, P2):
+    """
+    Flatten many elliptical arcs (SVG parameterization) at once.
+
+    This is a vectorized version of `elliptical_arc` (and `arc`). Arcs with a
+    null radius or identical endpoints are replaced with a straight line.
+
+    Parameters
+    ----------
+    P0 : array_like
+        The ``(n, 2)`` start points of the arcs.
+
+    R : array_like
+        The ``(n, 2)`` radii of the arcs.
+
+    angle : array_like
+        The ``n`` rotation angles (radians) of the arcs.
+
+    large_arc_flag, sweep_flag : array_like
+        The ``n`` SVG arc flags.
+
+    P2 : array_like
+        The ``(n, 2)`` end points of the arcs.
+
+    Returns
+    -------
+    (V, offsets) where V is the ``(m, 2)`` array of all vertices and offsets
+    the ``n+1`` array such that V[offsets[i]:offsets[i+1]] are the vertices of
+    arc i.
+    """
+    P0 = np.asarray(P0, dtype=float).reshape(-1,2)
+    P2 = np.asarray(P2, dtype=float).reshape(-1,2)
+    R = np.abs(np.asarray(R, dtype=float)).reshape(-1,2)
+    n = len(P0)
+    angle = np.broadcast_to(np.asarray(angle, dtype=float), (n,))
+    large_arc_flag = np.broadcast_to(np.asarray(large_arc_flag, dtype=bool), (n,))
+    sweep_flag = np.broadcast_to(np.asarray(sweep_flag, dtype=bool), (n,))
+    (x0, y0), (x2, y2), (rx, ry) = P0.T, P2.T, R.T
+    cos_a, sin_a = np.cos(angle), np.sin(angle)
+
+    # Calculate the middle point between the current and the final points
+    dx2 = (x0 - x2) / 2.0
+    dy2 = (y0 - y2) / 2.0
+
+    # Calculate (x1, y1)
+    x1 =  cos_a * dx2 + sin_a * dy2
+    y1 = -sin_a * dx2 + cos_a * dy2
+    line = (rx == 0) | (ry == 0) | ((x1 == 0) & (y1 == 0))
+    rx, ry = np.where(line, 1, rx), np.where(line, 1, ry)
+
+    # Check that radii are large enough
+    px1, py1 = x1 * x1, y1 * y1
+    radii_check = px1/(rx*rx) + py1/(ry*ry)
+    scale = np.sqrt(np.maximum(radii_check, 1.0))
+    rx, ry = rx*scale, ry*scale
+    prx, pry = rx * rx, ry * ry
+
+    # Calculate (cx1, cy1)
+    sign = np.where(large_arc_flag == sweep_flag, -1.0, +1.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sq = (prx*pry - prx*py1 - pry*px1) / (prx*py1 + pry*px1)
+    coef = sign*np.sqrt(np.maximum(np.nan_to_num(sq), 0))
+    cx1  = coef *  ((rx * y1) / ry)
+    cy1  = coef * -((ry * x1) / rx)
+
+    # Calculate (cx, cy) from (cx1, cy1)
+    sx2 = (x0 + x2) / 2.0
+    sy2 = (y0 + y2) / 2.0
+    cx = sx2 + (cos_a * cx1 - sin_a * cy1)
+    cy = sy2 + (sin_a * cx1 + cos_a * cy1)
+
+    # Calculate the start_angle (angle1) and the sweep_angle (dangle)
+    ux =  (x1 - cx1) / rx
+    uy =  (y1 - cy1) / ry
+    vx = (-x1 - cx1) / rx
+    vy = (-y1 - cy1) / ry
+    with np.errstate(divide='ignore', invalid='ignore'):
+        v = np.clip(ux / np.sqrt(ux*ux + uy*uy), -1.0, 1.0)
+        start_angle = np.where(uy < 0, -1.0, 1.0) * np.arccos(v)
+        v = (ux*vx + uy*vy) / np.sqrt((ux*ux + uy*uy) * (vx*vx + vy*vy))
+        v = np.clip(v, -1.0, 1.0)
+        sweep_angle = np.where(ux*vy - uy*vx < 0, -1.0, 1.0) * np.arccos(v)
+    sweep_angle -= 2*math.pi * (~sweep_flag & (sweep_angle > 0))
+    sweep_angle += 2*math.pi * (sweep_flag & (sweep_angle < 0))
+    start_angle = np.fmod(start_angle, 2.0 * math.pi)
+    sweep_angle = np.clip(sweep_angle, -2.0*math.pi, 2.0*math.pi)
+
+    # Number of intermediate vertices (see arc)
+    ra = (rx + ry) / 2.0
+    da = np.arccos(ra / (ra + 0.125)) * 2.0
+    t = np.abs(sweep_angle)/da - 0.25
+    count = np.where(sweep_flag, np.ceil(t), np.floor(t)+1)
+    count = np.where(line | ~np.isfinite(t) | (t < 0), 0, count).astype(int)
+
+    # Vertices (first and last vertices are the exact endpoints)
+    offsets = np.zeros(n+1, dtype=int)
+    offsets[1:] = np.cumsum(np.maximum(count, 1) + 1)
+    V = np.empty((offsets[-1],2))
+    A = np.repeat(np.arange(n), count)
+    i = np.arange(len(A)) - (np.cumsum(count) - count)[A]
+    theta = start_angle[A] + i*np.where(sweep_flag, da, -da)[A]
+    X = np.cos(theta)*rx[A]
+    Y = np.sin(theta)*ry[A]
+    index = offsets[A] + i
+    V[index,0] = cos_a[A]*X - sin_a[A]*Y + cx[A]
+    V[index,1] = sin_a[A]*X + cos_a[A]*Y + cy[A]
+    V[offsets[:-1]] = P0
+    V[offsets[1:]-1] = P2
+    return V, offsets
+
+
+
+def _angle(ax, ay, bx, by):
+    """ Vectorized |atan2(a) - atan2(b)| folded into [0, pi] """
+    da = np.abs(np.arctan2(ay, ax) - np.arctan2(by, bx))
+    return np.where(da >= math.pi, 2*math.pi - da, da)
+
+
+def _sq_distance(P1, P2):
+    """ Vectorized squared distance between two (n,2) arrays """
+    dx, dy = (P2-P1).T
+    return dx*dx + dy*dy
+
+
+class _Emitter(object):
+    """
+    Collect points emitted by the iterative subdivision together with the
+    information needed to put them back in recursive (depth-first) order.
+    """
+
+    def __init__(self):
+        self.points, self.keys = [], []
+
+    def emit(self, points, curves, keys, level, sub=0):
+        if not len(points):
+            return
+        # Subdivision paths are left-aligned such that sorting on the key
+        # gives the order of a depth-first traversal of the subdivision tree.
+        # Curve index uses the upper bits and the point index (sub) the
+        # lowest one.
+        shift = curve_recursion_limit + 1 - level
+        self.points.append(points)
+        self.keys.append((curves << (curve_recursion_limit + 3))
+                         | (keys << (shift + 1)) | sub)
+
+    def assemble(self, first, last, n):
+        """
+        Sort emitted points and add curve endpoints where needed, exactly as
+        `quadratic` and `cubic` do for a single curve.
+        """
+        if self.points:
+            points = np.concatenate(self.points)
+            keys = np.concatenate(self.keys)
+            order = np.argsort(keys)
+            points = points[order]
+            curves = keys[order] >> (curve_recursion_limit + 3)
+        else:
+            points = np.zeros((0,2))
+            curves = np.zeros(0, dtype=np.int64)
+
+        count = np.bincount(curves, minlength=n)
+        start = np.zeros(n+1, dtype=int)
+        start[1:] = np.cumsum(count)
+        empty = count == 0
+        if len(points):
+            head = points[np.minimum(start[:-1], len(points)-1)]
+            tail = points[np.maximum(start[1:]-1, 0)]
+        else:
+            head, tail = first, last
+        prepend = empty | (_sq_distance(head, first) > epsilon)
+        append  = empty | (_sq_distance(tail, last) > epsilon)
+
+        offsets = np.zeros(n+1, dtype=int)
+        offsets[1:] = np.cumsum(count + prepend + append)
+        V = np.empty((offsets[-1],2))
+        V[offsets[:-1][prepend]] = first[prepend]
+        V[offsets[1:][append]-1] = last[append]
+        index = np.arange(len(points)) + np.repeat(offsets[:-1] + prepend - start[:-1], count)
+        V[index] = points
+        return V, offsets
+
+
+def _subdivide(P, curves, keys, rest):
+    """
+    Split (de Casteljau) curves with given indices in two halves. Children of
+    a curve are kept next to each other.
+    """
+    P = P[rest]
+    m, n = P.shape[:2]
+    children = np.empty((m,2,n,2))
+    children[:,0,0] = P[:,0]
+    children[:,1,n-1] = P[:,n-1]
+    for i in range(1,n):
+        P = (P[:,:-1] + P[:,1:]) / 2.
+        children[:,0,i] = P[:,0]
+        children[:,1,n-1-i] = P[:,-1]
+    keys = 2*keys[rest]
+    return (children.reshape(2*m,n,2), np.repeat(curves[rest], 2),
+            np.dstack((keys, keys+1)).ravel())
+
+
+
+def quadratic_batch(P):
+    """
+    Flatten many quadratic Bézier curves at once.
+
+    This is an iterative (breadth-first) version of `quadratic_recursive`
+    where all the curves are subdivided simultaneously, level after level.
+
+    Parameters
+    ----------
+    P : array_like
+        The ``(n, 3, 2)`` control points of the n curves.
+
+    Returns
+    -------
+    (V, offsets) where V is the ``(m, 2)`` array of all vertices and offsets
+    the ``n+1`` array such that V[offsets[i]:offsets[i+1]] are the vertices of
+    curve i.
+    """
+    P = np.asarray(P, dtype=float).reshape(-1,3,2)
+    n = len(P)
+    first, last = P[:,0].copy(), P[:,2].copy()
+    curves = np.arange(n, dtype=np.int64)
+    keys = np.zeros(n, dtype=np.int64)
+    emitter = _Emitter()
+
+    level = 0
+    while len(P) and level <= curve_recursion_limit:
+        x1, y1 = P[:,0,0], P[:,0,1]
+        x2, y2 = P[:,1,0], P[:,1,1]
+        x3, y3 = P[:,2,0], P[:,2,1]
+        dx = x3 - x1
+        dy = y3 - y1
+        D = dx*dx + dy*dy
+        d = np.abs((x2-x3)*dy - (y2-y3)*dx)
+        done = np.zeros(len(P), dtype=bool)
+
+        # Regular case
+        regular = d > curve_collinearity_epsilon
+        I = np.flatnonzero(regular & (d*d <= m_distance_tolerance_square * D))
+        if m_angle_tolerance >= curve_angle_tolerance_epsilon:
+            I = I[_angle(x3[I]-x2[I], y3[I]-y2[I],
+                         x2[I]-x1[I], y2[I]-y1[I]) < m_angle_tolerance]
+        # Emit mid-point of the curve
+        Q = P[I]
+        emitter.emit((Q[:,0] + 2*Q[:,1] + Q[:,2])/4., curves[I], keys[I], level)
+        done[I] = True
+
+        # Collinear case
+        I = np.flatnonzero(~regular)
+        if len(I):
+            Q = P[I]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t = ((x2[I]-x1[I])*dx[I] + (y2[I]-y1[I])*dy[I]) / D[I]
+            # Simple collinear case, 1---2---3, we can leave just two endpoints
+            simple = (D[I] != 0) & (t > 0) & (t < 1)
+            d = np.where((D[I] == 0) | (t <= 0), _sq_distance(Q[:,1], Q[:,0]),
+                                                 _sq_distance(Q[:,1], Q[:,2]))
+            stop = ~simple & (d < m_distance_tolerance_square)
+            emitter.emit(Q[stop,1], curves[I[stop]], keys[I[stop]], level)
+            done[I[simple | stop]] = True
+
+        # Continue subdivision
+        P, curves, keys = _subdivide(P, curves, keys, np.flatnonzero(~done))
+        level += 1
+
+    return emitter.assemble(first, last, n)
+
+
+
+def cubic_batch(P):
+    """
+    Flatten many cubic Bézier curves at once.
+
+    This is an iterative (breadth-first) version of `cubic_recursive` where
+    all the curves are subdivided simultaneously, level after level.
+
+    Parameters
+    ----------
+    P : array_like
+        The ``(n, 4, 2)`` control points of the n curves.
+
+    Returns
+    -------
+    (V, offsets) where V is the ``(m, 2)`` array of all vertices and offsets
+    the ``n+1`` array such that V[offsets[i]:offsets[i+1]] are the vertices of
+    curve i.
+    """
+    P = np.asarray(P, dtype=float).reshape(-1,4,2)
+    n = len(P)
+    first, last = P[:,0].copy(), P[:,3].copy()
+    curves = np.arange(n, dtype=np.int64)
+    keys = np.zeros(n, dtype=np.int64)
+    emitter = _Emitter()
+    angle = m_angle_tolerance >= curve_angle_tolerance_epsilon
+
+    level = 0
+    while len(P) and level <= curve_recursion_limit:
+        x1, y1 = P[:,0,0], P[:,0,1]
+        x2, y2 = P[:,1,0], P[:,1,1]
+        x3, y3 = P[:,2,0], P[:,2,1]
+        x4, y4 = P[:,3,0], P[:,3,1]
+
+        # Try to approximate the full cubic curve by a single straight line
+        dx = x4 - x1
+        dy = y4 - y1
+        D = dx*dx + dy*dy
+        d2 = np.abs((x2 - x4) * dy - (y2 - y4) * dx)
+        d3 = np.abs((x3 - x4) * dy - (y3 - y4) * dx)
+        b2 = d2 > curve_collinearity_epsilon
+        b3 = d3 > curve_collinearity_epsilon
+        tolerance = m_distance_tolerance_square * D
+        done = np.zeros(len(P), dtype=bool)
+
+        # All collinear OR p1==p4
+        I = np.flatnonzero(~b2 & ~b3)
+        if len(I):
+            P1, P2, P3, P4 = P[I,0], P[I,1], P[I,2], P[I,3]
+            zero = D[I] == 0
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t2 = ((P2-P1)*(P4-P1)).sum(axis=-1) / D[I]
+                t3 = ((P3-P1)*(P4-P1)).sum(axis=-1) / D[I]
+            simple = ~zero & (t2 > 0) & (t2 < 1) & (t3 > 0) & (t3 < 1)
+            c2 = np.where(t2 <= 0, _sq_distance(P2, P1),
+                 np.where(t2 >= 1, _sq_distance(P2, P4),
+                          _sq_distance(P2, P1 + t2[:,np.newaxis]*(P4-P1))))
+            c3 = np.where(t3 <= 0, _sq_distance(P3, P1),
+                 np.where(t3 >= 1, _sq_distance(P3, P4),
+                          _sq_distance(P3, P1 + t3[:,np.newaxis]*(P4-P1))))
+            c2 = np.where(zero, _sq_distance(P1, P2), c2)
+            c3 = np.where(zero, _sq_distance(P4, P3), c3)
+            stop2 = ~simple & (c2 > c3) & (c2 < m_distance_tolerance_square)
+            stop3 = ~simple & (c2 <= c3) & (c3 < m_distance_tolerance_square)
+            emitter.emit(P2[stop2], curves[I[stop2]], keys[I[stop2]], level)
+            emitter.emit(P3[stop3], curves[I[stop3]], keys[I[stop3]], level)
+            done[I[simple | stop2 | stop3]] = True
+
+        # p1,p2,p4 are collinear, p3 is significant (s1)
+        # p1,p3,p4 are collinear, p2 is significant (s2)
+        for s, dk, (a, b, c), cusp in [(~b2 & b3, d3, (1, 2, 3), 2),
+                                       (b2 & ~b3, d2, (0, 1, 2), 1)]:
+            I = np.flatnonzero(s & (dk * dk <= tolerance))
+            if not len(I):
+                continue
+            if not angle:
+                emitter.emit((P[I,1] + P[I,2])/2., curves[I], keys[I], level)
+                done[I] = True
+                continue
+            A, B, C = P[I,a], P[I,b], P[I,c]
+            da1 = _angle(*(C-B).T, *(B-A).T)
+            stop = da1 < m_angle_tolerance
+            emitter.emit(P[I[stop],1], curves[I[stop]], keys[I[stop]], level, 0)
+            emitter.emit(P[I[stop],2], curves[I[stop]], keys[I[stop]], level, 1)
+            done[I[stop]] = True
+            if m_cusp_limit != 0.0:
+                stop = ~stop & (da1 > m_cusp_limit)
+                emitter.emit(P[I[stop],cusp], curves[I[stop]], keys[I[stop]], level)
+                done[I[stop]] = True
+
+        # Regular case
+        I = np.flatnonzero(b2 & b3 & ((d2 + d3)*(d2 + d3) <= tolerance))
+        if len(I):
+            P23 = (P[I,1] + P[I,2])/2.
+            if not angle:
+                emitter.emit(P23, curves[I], keys[I], level)
+                done[I] = True
+            else:
+                k   = np.arctan2(y3[I] - y2[I], x3[I] - x2[I])
+                da1 = np.abs(k - np.arctan2(y2[I] - y1[I], x2[I] - x1[I]))
+                da2 = np.abs(np.arctan2(y4[I] - y3[I], x4[I] - x3[I]) - k)
+                da1 = np.where(da1 >= math.pi, 2*math.pi - da1, da1)
+                da2 = np.where(da2 >= math.pi, 2*math.pi - da2, da2)
+                stop = da1 + da2 < m_angle_tolerance
+                emitter.emit(P23[stop], curves[I[stop]], keys[I[stop]], level)
+                done[I[stop]] = True
+                if m_cusp_limit != 0.0:
+                    stop2 = ~stop & (da1 > m_cusp_limit)
+                    stop3 = ~stop & ~stop2 & (da2 > m_cusp_limit)
+                    emitter.emit(P[I[stop2],1], curves[I[stop2]], keys[I[stop2]], level)
+                    emitter.emit(P[I[stop3],2], curves[I[stop3]], keys[I[stop3]], level)
+                    done[I[stop2 | stop3]] = True
+
+        # Continue subdivision
+        P, curves, keys = _subdivide(P, curves, keys, np.flatnonzero(~done))
+        level += 1
+
+    return emitter.assemble(first, last, n)
+
+
+
+def flatten(P):
+    """
+    Flatten many quadratic ``(n,3,2)`` or cubic ``(n,4,2)`` Bézier curves at
+    once (see `quadratic_batch` and `cubic_batch`).
+    """
+    P = np.asarray(P, dtype=float)
+    if P.shape[-2] == 3:
+        return quadratic_batch(P)
+    elif P.shape[-2] == 4:
+        return cubic_batch(P)
+    raise ValueError("Control points must be of shape (n,3,2) or (n,4,2)")
@@ -4,7 +4,7 @@
 # Copyright (c) 2018, Nicolas P. Rougier
 # Distributed under the 2-Clause BSD License.
 # -----------------------------------------------------------------------------
-import triangle
+import triangulation
 import numpy as np
 from glumpy import app, gl, gloo
 
@@ -45,13 +45,7 @@ def star(inner=0.35, outer=0.9, n=5):
     P[:,1]= R*np.sin(T)
     return P
 
-def triangulate(vertices):
-    n = len(vertices)
-    segments = (np.repeat(np.arange(n+1),2)[1:-1]) % n
-    T = triangle.triangulate({'vertices': vertices, 'segments': segments}, "p")
-    return T["vertices"], T["triangles"]
-
-P, I = triangulate(star())
+P, I = triangulation.triangulate(star())
 polygon = gloo.Program(vertex, fragment, count=len(P))
 polygon["position"] = P
 I = I.astype(np.uint32).view(gloo.IndexBuffer)
@@ -0,0 +1,532 @@
+# -----------------------------------------------------------------------------
+# Python, OpenGL & Scientific Visualization
+# www.labri.fr/perso/nrougier/python+opengl
+# Copyright (c) 2018, Nicolas P. Rougier
+# Distributed under the 2-Clause BSD License.
+# -----------------------------------------------------------------------------
+# Vectorized ear clipping triangulation (fallback for the triangle package)
+#
+# Contours are stored as doubly linked lists (next/prev arrays) and all the
+# ears of all the contours are clipped at once: at each round, convex vertices
+# whose triangle does not contain any reflex vertex (found using sorted
+# slabs) are ears and a set of non adjacent ears is removed. Holes are first
+# bridged to their enclosing contour (like in the earcut library).
+# -----------------------------------------------------------------------------
+import numpy as np
+
+EVENODD = "evenodd"
+NONZERO = "nonzero"
+
+
+def winding(points, verts, segments, chunk=2**22, labels=None):
+    """
+    Compute the winding number of points relatively to a set of segments
+
+    Parameters
+    ----------
+    points : array_like
+        The ``(n, 2)`` points to test.
+
+    verts : array_like
+        The ``(m, 2)`` vertices of the contours.
+
+    segments : array_like
+        The ``(k, 2)`` indices of contour edges.
+
+    chunk : int
+        Maximum number of point/edge pairs considered at once.
+
+    labels : (array_like, array_like)
+        Optional labels of points and segments. A segment is ignored for
+        the points having the same label.
+    """
+
+    points = np.asarray(points, dtype=float).reshape(-1,2)
+    A, B = verts[segments[:,0]], verts[segments[:,1]]
+    W = np.zeros(len(points), dtype=int)
+    step = max(1, chunk // max(1, len(segments)))
+    for i in range(0, len(points), step):
+        x = points[i:i+step,0,np.newaxis]
+        y = points[i:i+step,1,np.newaxis]
+        side = (B[:,0]-A[:,0])*(y-A[:,1]) - (x-A[:,0])*(B[:,1]-A[:,1])
+        up   = (A[:,1] <= y) & (B[:,1] >  y) & (side > 0)
+        down = (A[:,1] >  y) & (B[:,1] <= y) & (side < 0)
+        if labels is not None:
+            other = labels[0][i:i+step,np.newaxis] != labels[1]
+            up, down = up & other, down & other
+        W[i:i+step] = up.sum(axis=1) - down.sum(axis=1)
+    return W
+
+
+def _cross(A, B, C):
+    """ Cross product of (B-A) and (C-B) """
+
+    return ((B[...,0]-A[...,0])*(C[...,1]-B[...,1]) -
+            (B[...,1]-A[...,1])*(C[...,0]-B[...,0]))
+
+
+def _inside(X, Y, T, lower, upper, t, p):
+    """
+    Whether points p are inside or on the border of counterclockwise
+    triangles T[t] (whose bounding boxes are given by lower and upper),
+    points identical to a triangle vertex being excluded.
+    """
+
+    x, y = X[p], Y[p]
+    keep = ((x >= lower[t,0]) & (x <= upper[t,0]) &
+            (y >= lower[t,1]) & (y <= upper[t,1]))
+    t, p, x, y = t[keep], p[keep], x[keep], y[keep]
+    for i, j in (0,1), (1,2), (2,0):
+        xi, yi = X[T[t,i]], Y[T[t,i]]
+        keep = (X[T[t,j]]-xi)*(y-yi) - (Y[T[t,j]]-yi)*(x-xi) >= 0
+        t, p, x, y = t[keep], p[keep], x[keep], y[keep]
+    corner = np.zeros(len(t), dtype=bool)
+    for i in range(3):
+        corner |= (X[T[t,i]] == x) & (Y[T[t,i]] == y)
+    return t[~corner]
+
+
+def _bounds(X, Y, T):
+    """ Lower and upper bounds of triangles T """
+
+    A, B, C = T[:,0], T[:,1], T[:,2]
+    lower = np.stack([np.minimum(np.minimum(X[A], X[B]), X[C]),
+                      np.minimum(np.minimum(Y[A], Y[B]), Y[C])], axis=1)
+    upper = np.stack([np.maximum(np.maximum(X[A], X[B]), X[C]),
+                      np.maximum(np.maximum(Y[A], Y[B]), Y[C])], axis=1)
+    return lower, upper
+
+
+class _Slabs(object):
+    """
+    Points sorted in vertical slabs (whose width is about the size of
+    triangles to be tested) and by ordinate inside each slab (horizontal
+    slabs are obtained by swapping coordinates). A triangle is
+    cut by each slab it overlaps into a convex piece whose ordinate range is
+    computed exactly, such that it is only tested against the points of the
+    slabs that are inside this range (thin triangles crossing dense point
+    runs are tested against a few points only).
+
+    Parameters
+    ----------
+    X, Y : np.ndarray
+        Coordinates of vertices
+
+    P : np.ndarray
+        Indices of points
+
+    size : float
+        Width of slabs
+    """
+
+    def __init__(self, X, Y, P, size):
+        self.X, self.Y, self.size = X, Y, size
+        self.x0 = X[P].min() if len(P) else 0
+        self.y0, y1 = (Y[P].min(), Y[P].max()) if len(P) else (0, 0)
+        self.height = y1 - self.y0 if y1 > self.y0 else 1.0
+
+        # Points sorted by slab then ordinate (mapped into [slab, slab+0.5])
+        key = np.floor((X[P] - self.x0)/size) + self.ordinate(Y[P])
+        order = np.argsort(key)
+        self.P, self.key = P[order], key[order]
+
+    def __len__(self):
+        return len(self.P)
+
+    def ordinate(self, y):
+        return 0.5*np.clip((y - self.y0)/self.height, 0, 1)
+
+    def occupied(self, T, mask=None, chunk=2**22):
+        """
+        Whether counterclockwise triangles T contain any of the points
+
+        Parameters
+        ----------
+        T : np.ndarray
+            ``(n, 3)`` indices of triangles vertices
+
+        mask : np.ndarray
+            Boolean mask (over vertices) of the points to be considered
+            (default is all points)
+        """
+
+        occupied = np.zeros(len(T), dtype=bool)
+        if not len(T) or not len(self.P):
+            return occupied
+
+        X, Y, x0, size = self.X, self.Y, self.x0, self.size
+        TX, TY = [X[T[:,i]] for i in range(3)], [Y[T[:,i]] for i in range(3)]
+        lower, upper = _bounds(X, Y, T)
+        xmin, ymin, xmax, ymax = lower[:,0], lower[:,1], upper[:,0], upper[:,1]
+
+        # Pieces of triangles inside the slabs they overlap
+        first = np.floor((xmin - x0)/size).astype(np.int64)
+        count = np.floor((xmax - x0)/size).astype(np.int64) - first + 1
+        t = np.repeat(np.arange(len(T)), count)
+        s = first[t] + np.arange(len(t)) - np.repeat(np.cumsum(count)-count,
+                                                     count)
+
+        # Ordinate range of pieces: edges clipped to the slab are evaluated
+        # at both ends (vertical edges span their whole range), triangles
+        # inside a single slab being a single piece.
+        bottom, top = ymin[t], ymax[t]
+        k = np.flatnonzero(count[t] > 1)
+        if len(k):
+            u, slab = t[k], s[k]
+            left = np.maximum(x0 + slab*size, xmin[u])
+            right = np.minimum(x0 + (slab+1)*size, xmax[u])
+            low, high = np.full(len(k), np.inf), np.full(len(k), -np.inf)
+            for i, j in (0,1), (1,2), (2,0):
+                ax, ay, bx, by = TX[i][u], TY[i][u], TX[j][u], TY[j][u]
+                a = np.maximum(np.minimum(ax, bx), left)
+                b = np.minimum(np.maximum(ax, bx), right)
+                valid = a <= b
+                dx = bx - ax
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    ya = np.where(dx != 0, ay + (a - ax)*(by - ay)/dx, ay)
+                    yb = np.where(dx != 0, ay + (b - ax)*(by - ay)/dx, by)
+                low = np.where(valid, np.minimum(low, np.minimum(ya, yb)), low)
+                high = np.where(valid, np.maximum(high, np.maximum(ya, yb)),
+                                high)
+            bottom[k], top[k] = low, high
+
+        # Points of each slab inside the (slightly enlarged) ordinate range
+        epsilon = 1e-9
+        start = np.searchsorted(self.key, s + self.ordinate(bottom) - epsilon)
+        count = np.searchsorted(self.key, s + self.ordinate(top) + epsilon,
+                                "right") - start
+        count = np.maximum(count, 0)
+        t = np.repeat(t, count)
+        p = self.P[np.arange(len(t)) +
+                   np.repeat(start - np.cumsum(count) + count, count)]
+        if mask is not None:
+            t, p = t[mask[p]], p[mask[p]]
+        for i in range(0, len(t), chunk):
+            hit = _inside(X, Y, T, lower, upper, t[i:i+chunk], p[i:i+chunk])
+            occupied[hit] = True
+        return occupied
+
+
+def _rings(following):
+    """
+    Label cycles of the `following` permutation with their smallest index
+    (using pointer jumping).
+    """
+
+    label = np.arange(len(following))
+    jump = following.copy()
+    length = 1
+    while length < len(following):
+        label = np.minimum(label, label[jump])
+        jump = jump[jump]
+        length *= 2
+    return label
+
+
+def triangulate(tri, opts="p", rule=EVENODD):
+    """
+    Triangulate a set of closed contours using vectorized ear clipping
+
+    Parameters
+    ----------
+    tri : dict
+        Dictionary with ``vertices`` (``(n, 2)`` floats) and ``segments``
+        (``(m, 2)`` integers) describing closed, non intersecting contours
+        (each vertex starts at most one segment), as for
+        ``triangle.triangulate``.
+
+    opts : str
+        Kept for compatibility with ``triangle.triangulate`` (only the 'p'
+        behavior is supported).
+
+    rule : "evenodd" or "nonzero"
+        Fill rule deciding which contours are outer boundaries and which
+        ones are holes.
+
+    Returns
+    -------
+    Dictionary with ``vertices`` (the input vertices, no vertex is added) and
+    ``triangles``, the ``(k, 3)`` counterclockwise triangles indices.
+    """
+
+    if rule not in (EVENODD, NONZERO):
+        raise ValueError("Unknown fill rule '%s'" % rule)
+    V = np.asarray(tri["vertices"], dtype=float).reshape(-1,2)
+    S = np.asarray(tri.get("segments", np.zeros((0,2))), dtype=int)
+    S = S.reshape(-1,2)
+    T = {"vertices": V, "triangles": np.zeros((0,3), dtype=np.int32)}
+    if not len(S):
+        return T
+
+    # Contours as cycles over segment starts
+    n = len(V)
+    following = np.arange(n)
+    following[S[:,0]] = S[:,1]
+    label = _rings(following)
+    used = following != np.arange(n)
+    nodes = np.flatnonzero(used)
+
+    # Signed area and leftmost vertex of contours
+    P, Q = V[nodes], V[following[nodes]]
+    area = np.bincount(label[nodes], P[:,0]*Q[:,1] - P[:,1]*Q[:,0], n)/2
+    order = np.lexsort((V[nodes,1], V[nodes,0], label[nodes]))
+    ring = label[nodes[order]]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = ring[1:] != ring[:-1]
+    ring, leftmost = ring[first], nodes[order[first]]
+
+    # Contour status depends on winding number inside & outside of contours
+    outside = winding(V[leftmost], V, np.stack([nodes, following[nodes]], 1),
+                      labels=(ring, label[nodes]))
+    inside = outside + np.sign(area[ring]).astype(int)
+    if rule == EVENODD:
+        filled_in, filled_out = inside % 2 != 0, outside % 2 != 0
+    else:
+        filled_in, filled_out = inside != 0, outside != 0
+    outer = filled_in & ~filled_out & (area[ring] != 0)
+    hole = ~filled_in & filled_out & (area[ring] != 0)
+
+    # Linked lists (outer contours counterclockwise, holes clockwise)
+    capacity = n + 2*hole.sum()
+    vertex = np.zeros(capacity, dtype=int)
+    vertex[:n] = np.arange(n)
+    next = np.arange(capacity)
+    prev = np.arange(capacity)
+    next[:n] = following
+    prev[following[nodes]] = nodes
+    reverse = np.zeros(n, dtype=bool)
+    reverse[ring[outer & (area[ring] < 0)]] = True
+    reverse[ring[hole & (area[ring] > 0)]] = True
+    reverse = reverse[label] & used
+    next[:n][reverse], prev[:n][reverse] = prev[:n][reverse], next[:n][reverse]
+    alive = np.zeros(capacity, dtype=bool)
+    alive[:n] = used & np.isin(label, ring[outer])
+
+    # Bridge holes (from left to right) to the outer contour on their left
+    count = n
+    for h in np.argsort(V[leftmost[hole],0], kind="stable"):
+        b = leftmost[hole][h]
+        m = _bridge(V, vertex, next, prev, alive, b)
+        if m < 0:
+            continue
+        alive[:n] |= used & (label == label[b])
+        b2, m2 = count, count+1
+        vertex[b2], vertex[m2] = vertex[b], vertex[m]
+        mn, bp = next[m], prev[b]
+        next[m], prev[b] = b, m
+        next[m2], prev[mn] = mn, m2
+        next[b2], prev[m2] = m2, b2
+        next[bp], prev[b2] = b2, bp
+        alive[[b2, m2]] = True
+        count += 2
+
+    T["triangles"] = _clip(V, vertex, next, prev, alive)
+    return T
+
+
+def _bridge(V, vertex, next, prev, alive, h):
+    """
+    Find the vertex of the current contours to be connected with the
+    (leftmost) hole vertex h.
+    """
+
+    nodes = np.flatnonzero(alive)
+    hx, hy = V[h]
+    A, B = V[vertex[nodes]], V[vertex[next[nodes]]]
+
+    # Closest edge (going down) intersected by a ray from h to the left
+    down = (A[:,1] >= hy) & (B[:,1] <= hy) & (A[:,1] != B[:,1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = A[:,0] + (hy - A[:,1])*(B[:,0]-A[:,0])/(B[:,1]-A[:,1])
+    down &= x <= hx
+    if not down.any():
+        return -1
+    e = np.flatnonzero(down)[np.argmax(x[down])]
+    qx = x[e]
+    m = nodes[e] if A[e,0] < B[e,0] else next[nodes[e]]
+    if qx == hx:
+        return m
+
+    # Reflex vertices inside the (h, intersection, m) triangle may hide m
+    mx, my = V[vertex[m]]
+    P = V[vertex[nodes]]
+    H = np.array([hx if hy < my else qx, hy])
+    Q = np.array([qx if hy < my else hx, hy])
+    M = np.array([mx, my])
+    inside = ((_cross(H, M, P) >= 0) & (_cross(M, Q, P) >= 0) &
+              (_cross(Q, H, P) >= 0))
+    inside |= ((_cross(H, M, P) <= 0) & (_cross(M, Q, P) <= 0) &
+               (_cross(Q, H, P) <= 0))
+    inside &= (P[:,0] >= mx) & (P[:,0] <= hx) & (P[:,0] != hx)
+
+    # Vertices must see h from the inner side of their corner
+    a, b, c = V[vertex[prev[nodes]]], P, V[vertex[next[nodes]]]
+    H = np.broadcast_to(V[h], P.shape)
+    seen = np.where(_cross(a, b, c) > 0,
+                    (_cross(b, H, c) <= 0) & (_cross(b, a, H) <= 0),
+                    (_cross(b, H, a) > 0) | (_cross(b, c, H) > 0))
+    candidates = np.flatnonzero(inside & seen)
+    if len(candidates):
+        with np.errstate(divide="ignore"):
+            tan = np.abs(hy - P[candidates,1])/(hx - P[candidates,0])
+        best = np.lexsort((-P[candidates,0], tan))[0]
+        if tan[best] < np.inf:
+            m = nodes[candidates[best]]
+    return m
+
+
+def _clip(V, vertex, next, prev, alive, fan=16):
+    """ Clip ears of all contours simultaneously """
+
+    triangles = []
+    X, Y = V[:,0].copy(), V[:,1].copy()
+    label = _rings(next)
+    size = np.bincount(label[alive], minlength=len(vertex))
+    priority = np.random.RandomState(1).permutation(len(vertex))
+    convex = np.zeros(len(vertex), dtype=bool)
+    ear = np.zeros(len(vertex), dtype=bool)
+    dirty = alive.copy()
+    slabs = {}
+
+    def finish(nodes):
+        """ Remove contours (of given nodes) reduced to a triangle or less """
+
+        nodes = nodes[alive[nodes] & (size[label[nodes]] <= 3)]
+        nodes = nodes[np.unique(label[nodes], return_index=True)[1]]
+        last = nodes[size[label[nodes]] == 3]
+        triangles.append(vertex[np.stack([prev[last], last, next[last]], 1)])
+        for n in prev[nodes], nodes, next[nodes]:
+            alive[n] = ear[n] = dirty[n] = False
+
+    def occupied(T, kind):
+        """
+        Whether triangles T contain any (current) reflex vertex. Wide
+        triangles are cut into vertical slabs and tall ones into horizontal
+        slabs (using swapped coordinates). Reflex vertices are only sorted
+        again when most of them are not reflex anymore or when triangles (of
+        a given kind) are of a different size than before.
+        """
+
+        lower, upper = _bounds(X, Y, T)
+        dx, dy = upper[:,0] - lower[:,0], upper[:,1] - lower[:,1]
+        result = np.zeros(len(T), dtype=bool)
+        for axis, (U, W), i in ((0, (X, Y), np.flatnonzero(dx >= dy)),
+                                (1, (Y, X), np.flatnonzero(dx < dy))):
+            if not len(i):
+                continue
+            width = np.median(np.maximum(dx[i], dy[i]))
+            width = width*(2 if kind == "ear" else 0.25) if width > 0 else 1
+            s = slabs.get((kind, axis))
+            ratio = max(width/s.size, s.size/width) if s is not None else 1
+            if s is None or len(s) > 2*len(reflex) or (
+                    ratio > 2 and 8*ratio*len(i) > len(reflex)):
+                s = slabs[kind, axis] = _Slabs(U, W, reflex, width)
+            result[i] = s.occupied(T[i] if axis == 0 else T[i,::-1], blocking)
+        return result
+
+    finish(np.flatnonzero(alive))
+    while alive.any():
+        # Dead nodes are dropped once they are the vast majority such that
+        # the (many) last rounds only work on the remaining nodes
+        nodes = np.flatnonzero(alive)
+        if len(nodes) < len(alive)//4:
+            index = np.zeros(len(alive), dtype=int)
+            index[nodes] = np.arange(len(nodes))
+            vertex = vertex[nodes]
+            next, prev = index[next[nodes]], index[prev[nodes]]
+            priority, convex = priority[nodes], convex[nodes]
+            ear, dirty = ear[nodes], dirty[nodes]
+            alive = alive[nodes]
+            rings, label = np.unique(label[nodes], return_inverse=True)
+            size = size[rings]
+
+        # Convex vertices whose triangle does not contain any reflex vertex.
+        # Clipping an ear removes a convex vertex and can only make its
+        # neighbours more convex: an ear remains an ear and only vertices
+        # whose neighbours changed need to be tested again.
+        index = np.flatnonzero(dirty)
+        a, c = prev[index], next[index]
+        convex[index] = _cross(V[vertex[a]], V[vertex[index]],
+                               V[vertex[c]]) > 0
+        stale = (alive & convex & ~dirty).any()
+        candidates = index[convex[index]]
+        T = vertex[np.stack([prev[candidates], candidates,
+                             next[candidates]], axis=1)]
+        reflex = vertex[np.flatnonzero(alive & ~convex)]
+        blocking = np.zeros(len(X), dtype=bool)
+        blocking[reflex] = True
+        ear[index] = False
+        ear[candidates] = ~occupied(T, "ear")
+        dirty[index] = False
+
+        # Ears next to a reflex vertex are extended into fans (clipping
+        # successive ears around the same vertex) such that long reflex
+        # chains do not need as many rounds as they have vertices.
+        v = np.flatnonzero(ear)
+        backward = ~convex[prev[v]]
+        forward = ~backward & ~convex[next[v]]
+        anchor = np.where(backward, next[v], prev[v])
+        chain = [v, np.where(backward, prev[v], next[v])]
+        for j in range(fan):
+            chain.append(np.where(backward, prev[chain[-1]], next[chain[-1]]))
+        chain = np.stack(chain, axis=1)
+        count = np.ones(len(v), dtype=int)
+        f = np.flatnonzero(backward | forward)
+        if len(f):
+            p, q = chain[f,1:-1], chain[f,2:]
+            o = np.broadcast_to(anchor[f,np.newaxis], p.shape)
+            b = backward[f,np.newaxis]
+            T = np.stack([np.where(b, q, o), p, np.where(b, o, q)], axis=-1)
+            T = vertex[T.reshape(-1,3)]
+            valid = (_cross(V[T[:,0]], V[T[:,1]], V[T[:,2]]) > 0)
+            valid &= (q != o).ravel()
+            valid = np.logical_and.accumulate(valid.reshape(p.shape), axis=1)
+            valid = valid.ravel()
+            valid[valid] = ~occupied(T[valid], "fan")
+            count[f] += np.logical_and.accumulate(
+                valid.reshape(p.shape), axis=1).sum(axis=1)
+
+        # Non overlapping fans (a fan may only share its ends with others),
+        # longest fans first
+        rank = count*len(priority) + priority[v]
+        i = np.repeat(np.arange(len(v)), count)
+        j = np.arange(len(i)) - np.repeat(np.cumsum(count) - count, count)
+        last = chain[np.arange(len(v)), count]
+        eaten, touched = np.full(len(alive), -1), np.full(len(alive), -1)
+        np.maximum.at(eaten, chain[i,j], rank[i])
+        np.maximum.at(touched, chain[i,j], rank[i])
+        np.maximum.at(touched, anchor, rank)
+        np.maximum.at(touched, last, rank)
+        mine = touched[chain[i,j]] == rank[i]
+        win = ((eaten[anchor] < rank) & (eaten[last] < rank) &
+               (np.bincount(i, mine, len(v)) == count))
+        if not win.any():
+            if stale:
+                # Reflex vertices may have become convex since last tests
+                dirty[:] = alive
+                continue
+            # Degenerate or self-intersecting contours: clip anyway
+            v = np.flatnonzero(alive & convex)[:1]
+            if not len(v):
+                v = np.flatnonzero(alive)[:1]
+            i = j = np.zeros(1, dtype=int)
+            anchor, last, backward = prev[v], next[v], np.zeros(1, bool)
+            chain = np.stack([v, next[v]], axis=1)
+            win = np.ones(1, dtype=bool)
+
+        # Clip fans
+        w = win[i]
+        i, j = i[w], j[w]
+        p, q, o = chain[i,j], chain[i,j+1], anchor[i]
+        b = backward[i]
+        triangles.append(vertex[np.stack([np.where(b, q, o), p,
+                                          np.where(b, o, q)], axis=1)])
+        alive[p] = ear[p] = False
+        size -= np.bincount(label[p], minlength=len(size))
+        o, e, b = anchor[win], last[win], backward[win]
+        next[np.where(b, e, o)] = np.where(b, o, e)
+        prev[np.where(b, o, e)] = np.where(b, e, o)
+        dirty[o] = dirty[e] = True
+        finish(np.concatenate([o, e]))
+
+    return np.concatenate(triangles).astype(np.int32)
@@ -5,7 +5,7 @@
 # Distributed under the 2-Clause BSD License.
 # -----------------------------------------------------------------------------
 import svg
-import triangle
+import triangulation
 import numpy as np
 from glumpy import app, gl, gloo
 
@@ -36,24 +36,17 @@ def on_draw(dt):
 
     gl.glLineWidth(3.0)
     polygon["color"] = 0.00, 0.00, 0.00, 1.00
-    polygon.draw(gl.GL_LINE_LOOP, O)
-
-
-def triangulate(vertices):
-    n = len(vertices)
-    segments = (np.repeat(np.arange(n+1),2)[1:-1]) % n
-    T = triangle.triangulate({'vertices': vertices, 'segments': segments}, "p")
-    return T["vertices"], T["triangles"]
+    polygon.draw(gl.GL_LINES, O)
 
 
 V,C = svg.path("firefox.svg", "firefox")
 V = .95*(2*(V-V.min())/(V.max()-V.min()) - 1)
 V[:,1] = -V[:,1] 
-V, I = triangulate(V)
+_, S = triangulation.contours(V, C)
+V, I = triangulation.triangulate(V, C)
 
 polygon = gloo.Program(vertex, fragment, count=len(V))
 polygon["position"] = V
 I = I.astype(np.uint32).view(gloo.IndexBuffer)
-O = (np.repeat(np.arange(len(V)+1),2)[1:-1]) % len(V)
-O = O.astype(np.uint32).view(gloo.IndexBuffer)
+O = S.astype(np.uint32).view(gloo.IndexBuffer)
 app.run()
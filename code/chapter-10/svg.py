@@ -21,8 +21,10 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 # -----------------------------------------------------------------------------
+import os
 import re
 import bezier
+import collections
 import numpy as np
 from lxml import etree
 from matplotlib.path import Path
@@ -33,104 +35,513 @@ CURVE4 = 3
 CURVE3 = 4
 CLOSE  = 5
 
+class Document(object):
+    """
+    SVG document that is parsed only once and indexes all its elements by id.
+
+    Tesselated paths are cached (up to `maxsize` of them, least recently used
+    ones are discarded first) and the document is reloaded when the file
+    modification time changes.
+    """
+
+    def __init__(self, filename, maxsize=1024):
+        self.filename = filename
+        self.maxsize = maxsize
+        self.cache = collections.OrderedDict()
+        self.load()
+
+    def load(self):
+        """ Parse the document and index elements by id """
+
+        self.mtime = os.stat(self.filename).st_mtime_ns
+        root = etree.parse(self.filename).getroot()
+        self.elements = {}
+        for element in root.iter(tag=etree.Element):
+            if element.get("id") is not None:
+                self.elements[element.get("id")] = element
+        self.cache.clear()
+
+    def update(self):
+        """ Reload the document if the file has been modified """
+
+        if os.stat(self.filename).st_mtime_ns != self.mtime:
+            self.load()
+
+    def get(self, name):
+        """ Read a given element path command """
+
+        self.update()
+        return self.elements[name].get("d")
+
+    def path(self, name):
+        """ Read and convert a given element into a path representation """
+
+        self.update()
+        if name in self.cache:
+            self.cache.move_to_end(name)
+        else:
+            verts, codes = convert(self.elements[name].get("d"))
+            self.cache[name] = tesselate(verts, codes)
+            if len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+        verts, codes = self.cache[name]
+        return verts.copy(), codes.copy()
+
+
+_documents = {}
+
+def document(filename):
+    """
+    Get the (cached) document corresponding to filename
+    """
+    key = os.path.abspath(filename)
+    if key not in _documents:
+        _documents[key] = Document(filename)
+    return _documents[key]
+
+
 def get(filename, name):
     """
     Read a given element from an SVG file
     """
-    root = etree.parse(filename).getroot()
-    return root.xpath("//*[@id='%s']" % name)[0].get("d")
+    return document(filename).get(name)
 
 
 def path(filename, name):
     """
     Read and convert an SVG path command into a path representation
     """
-    path = get(filename, name)
-    verts, codes = convert(path)
-    verts, codes = tesselate(verts, codes)
-    return verts, codes
+    return document(filename).path(name)
+
+
+# Number of parameters, number of vertices and path code for each SVG path
+# command (arcs are flattened into a variable number of line segments)
+COMMANDS = { "M": (2, 1, MOVETO),
+             "L": (2, 1, LINETO),
+             "H": (1, 1, LINETO),
+             "V": (1, 1, LINETO),
+             "C": (6, 3, CURVE4),
+             "S": (4, 3, CURVE4),
+             "Q": (4, 2, CURVE3),
+             "T": (2, 2, CURVE3),
+             "A": (7, 1, LINETO),
+             "Z": (0, 1, CLOSE) }
+
+# Lookup tables used by the tokenizer
+_valid = b" \t\r\n\f,+-.0123456789eEMmZzLlHhVvCcSsQqTtAa"
+_keep = np.array([0] + [(2**64 - 1) << 8*(8-n) & (2**64 - 1)
+                        for n in range(1, 9)], dtype=np.uint64)
+_below = np.array([(1 << 8*n) - 1 for n in range(8)] + [0], dtype=np.uint64)
+_above = np.array([(2**64 - 1) << 8*(n+1) & (2**64 - 1)
+                   for n in range(8)] + [2**64 - 1], dtype=np.uint64)
+_pow10 = 10**np.arange(9, dtype=np.uint64)
+_sign = np.ones(256)
+_sign[ord("-")] = -1
+_number_re = re.compile(br"[-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?")
+_arity = np.full(256, -1, dtype=int)
+_vertices = np.zeros(256, dtype=int)
+_codes = np.zeros(256, dtype=np.uint8)
+for c, (n, m, code) in COMMANDS.items():
+    _arity[ord(c)], _vertices[ord(c)], _codes[ord(c)] = n, m, code
+
+# Arc parameters: the large-arc and sweep flags are single '0'/'1' characters
+# that may be written without any separator ("a10 10 0 0110 10")
+_arc_re = re.compile(r"[Aa][^MmZzLlHhVvCcSsQqTtAa]*")
+_number = r"\s*,?\s*([-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?)"
+_flag = r"\s*,?\s*([01])"
+_arc_params_re = re.compile(3*_number + 2*_flag + 2*_number)
+
+
+def _arc_flags(match):
+    """ Rewrite the parameters of an arc command with explicit separators """
+
+    command, data = match.group(0)[0], match.group(0)[1:]
+    params, position = [], 0
+    while data[position:].strip(" \t\r\n,"):
+        parsed = _arc_params_re.match(data, position)
+        if parsed is None:
+            return match.group(0)
+        params.extend(parsed.groups())
+        position = parsed.end()
+    return command + " " + " ".join(params) + " "
+
+
+def _match(W, byte):
+    """
+    High bit of the bytes equal to a given byte in each 8 bytes word of W
+    """
+
+    T = W ^ np.uint64(byte * 0x0101010101010101)
+    low = np.uint64(0x7F7F7F7F7F7F7F7F)
+    return ~(((T & low) + low) | T | low)
+
+
+def _first(Z):
+    """
+    Index (0 to 7, or 8 if none) of the first byte (little endian words, i.e.
+    first byte is lowest) whose high bit is set in each 8 bytes word of Z
+    """
+
+    # Lowest set bit (high bit of the first byte) is 2**(8*i+7) and its
+    # exponent (read from its float representation) is 8*i+7 while the
+    # exponent of zero is -1023
+    Z = Z & (~Z + np.uint64(1))
+    E = (Z.astype(float).view(np.int64) >> 52) - 1030
+    return np.where(E < 0, 8, E >> 3)
+
+
+def _digits(W, count):
+    """
+    Integer value of the count (at most 8) decimal digits ending each 8 bytes
+    word of W, parsed all at once using SIMD within a register arithmetic.
+    """
+
+    keep = _keep[count]
+    W = (W & keep) - (np.uint64(0x3030303030303030) & keep)
+    W = W*np.uint64(10) + (W >> np.uint64(8))
+    W = (((W & np.uint64(0x000000FF000000FF)) *
+          np.uint64(100 + (1000000 << 32))) +
+         (((W >> np.uint64(16)) & np.uint64(0x000000FF000000FF)) *
+          np.uint64(1 + (10000 << 32)))) >> np.uint64(32)
+    return W & np.uint64(0xFFFFFFFF)
+
+
+def _short(W, length):
+    """
+    Parse the unsigned numbers of at most 8 characters (digits and an
+    optional point) ending each 8 bytes word of W
+
+    Digits before the point are shifted over it such that all the digits are
+    parsed at once, the mantissa (less than 10**8) being then exactly divided
+    by a power of ten.
+
+    Returns
+    -------
+    (values, valid) where valid tells whether a number is short enough, has
+    at most one point and at least one digit.
+    """
+
+    valid = length <= 8
+    length = np.minimum(length, 8)
+    Z = _match(W, 46) & _keep[length]
+    point = _first(Z)
+    valid &= (Z & (Z - np.uint64(1))) == 0
+    count = length - (point < 8)
+    valid &= count > 0
+    W = (W & _above[point]) | ((W & _below[point]) << np.uint64(8))
+    values = _digits(W, count).astype(float)
+    values /= _pow10[np.maximum(7 - point, 0)]
+    return values, valid
+
+
+def _numbers(data, W, start, stop):
+    """
+    Parse the first number of runs of number characters
+
+    Numbers of at most 8 characters are parsed from the 8 bytes word ending
+    them (see _short). Longer numbers are split into an integer and a
+    fractional part, each parsed from the 8 bytes word ending it. A number
+    ends at the end of its run or at a second point ("1.5.5" is 1.5 followed
+    by .5).
+
+    Parameters
+    ----------
+    data : np.ndarray
+        Path characters (uint8)
+
+    W : np.ndarray
+        Overlapping 8 bytes words of the path (W[i] ends before data[i])
+
+    start, stop : np.ndarray
+        Bounds of the runs
+
+    Returns
+    -------
+    (values, end, slow) where end is the end of each number and slow tells
+    whether a number could not be parsed exactly (more than 8 digits in a
+    part or more than 15 significant digits).
+    """
+
+    first = data[start]
+    digits = start + ((first == 43) | (first == 45))
+    values, short = _short(W[stop], stop - digits)
+    end, slow = stop, np.zeros(len(start), dtype=bool)
+
+    if not np.all(short):
+        L = ~short
+        digits, stop = digits[L], stop[L]
+
+        # First point (if any) and second point (if any) which ends the number
+        i = _first(_match(W[digits+8], 46))
+        point = np.where(digits + i < stop, digits + i, stop)
+        j = _first(_match(W[point+9], 46))
+        last = np.where((point < stop) & (point+1+j < stop), point+1+j, stop)
+        integer = point - digits
+        fraction = np.maximum(last - point - 1, 0)
+        slow[L] = ((i == 8) & (stop - digits > 8)) | (integer > 8) | \
+                  ((j == 8) & (stop - point - 1 > 8))
+        if np.any((integer + fraction == 0) & ~slow[L]):
+            raise ValueError("Invalid SVG path")
+        integer, fraction = np.minimum(integer, 8), np.minimum(fraction, 8)
+
+        # The division of an exact mantissa by an exact power of ten is
+        # correctly rounded (i.e. it gives the same result as parsing the
+        # number as a whole)
+        mantissa = (_digits(W[point], integer)*_pow10[fraction] +
+                    _digits(W[last], fraction))
+        slow[L] |= mantissa >= 2**53
+        values[L] = mantissa.astype(float) / _pow10[fraction]
+        end = end.copy()
+        end[L] = last
+
+    values *= _sign[first]
+    return values, end, slow
+
+
+def tokenize(path):
+    """
+    Separate commands and numbers of an SVG path command
+
+    The raw bytes of the path are classified (digits, points, signs,
+    exponents and commands) and all the numbers are parsed at once from
+    machine words of the path (see _numbers). Numbers with an exponent or too
+    many digits are parsed individually.
+
+    Parameters
+    ----------
+    path : string
+        A valid SVG path command
+
+    Returns
+    -------
+    (commands, numbers, index) where commands is the array of commands (ASCII
+    codes), numbers the array of all numbers and index the index (inside
+    numbers) of the first parameter of each command.
+    """
+
+    if "A" in path or "a" in path:
+        path = _arc_re.sub(_arc_flags, path)
+    text = path.encode("utf-8")
+    if text.translate(None, _valid):
+        raise ValueError("Invalid SVG path")
+    W = np.frombuffer(b"0"*8 + text + b"0"*16, dtype=np.uint8)
+    W = np.ndarray(len(W)-7, dtype="<u8", buffer=W, strides=(1,))
+    data = np.frombuffer(text, dtype=np.uint8)
+
+    # Runs of number characters, knowing that a sign starts a new number
+    # unless it follows an exponent ("1-2" is 1 and -2, "1e-2" is one number)
+    sign = (data == 43) | (data == 45)
+    exponent = (data | 32) == 101
+    number = ((data - 48) < 10) | (data == 46) | sign | exponent
+    follow = np.zeros(len(data)+1, dtype=bool)
+    follow[1:-1] = number[1:] & number[:-1] & ~(sign[1:] & ~exponent[:-1])
+    start = np.flatnonzero(number & ~follow[:-1])
+    stop = np.flatnonzero(number & ~follow[1:]) + 1
+    command = np.flatnonzero((data >= 65) & ~exponent)
+
+    # Runs with an exponent are parsed individually
+    runs, positions, numbers = [], [], []
+    if b"e" in text or b"E" in text:
+        slow = np.zeros(len(start), dtype=bool)
+        slow[np.searchsorted(start, np.flatnonzero(exponent), "right")-1] = 1
+        runs.append((start[slow], stop[slow]))
+        start, stop = start[~slow], stop[~slow]
+    while len(start):
+        values, end, slow = _numbers(data, W, start, stop)
+        if np.any(slow):
+            runs.append((start[slow], stop[slow]))
+            start, values, end, stop = (start[~slow], values[~slow],
+                                        end[~slow], stop[~slow])
+        positions.append(start)
+        numbers.append(values)
+        more = end < stop
+        start, stop = end[more], stop[more]
+    for start, stop in zip(*[np.concatenate(R) for R in zip(*runs)]):
+        chunk, end = data[start:stop].tobytes(), 0
+        for match in _number_re.finditer(chunk):
+            if match.start() != end:
+                break
+            positions.append([start + end])
+            numbers.append([float(match.group(0))])
+            end = match.end()
+        if end != len(chunk):
+            raise ValueError("Invalid SVG path")
+
+    # Numbers are sorted by position unless runs have been split
+    positions = np.concatenate(positions) if positions else np.zeros(0, int)
+    numbers = np.concatenate(numbers) if numbers else np.zeros(0)
+    if len(positions) > 1 and np.any(positions[1:] < positions[:-1]):
+        order = np.argsort(positions, kind="stable")
+        positions, numbers = positions[order], numbers[order]
+    index = np.searchsorted(positions, command)
+    if len(numbers) and (not len(index) or index[0] != 0):
+        raise ValueError("Invalid SVG path")
+    return data[command], numbers, index
+
+
+def resolve(parent, value):
+    """
+    Compute absolute values from relative ones (using pointer jumping)
+
+    Parameters
+    ----------
+    parent : array_like
+        For each item, index of the (previous) item it is relative to or -1 if
+        the item is absolute.
+
+    value : array_like
+        Value (or (x,y) pair of values) of each item relatively to its parent.
+    """
+
+    parent = np.array(parent)
+    value = np.array(value, dtype=float)
+    # Pairs are processed as complex numbers (faster indexing)
+    items = value.view(complex).ravel() if value.ndim == 2 else value
+    active = np.flatnonzero(parent >= 0)
+    while len(active):
+        P = parent[active]
+        items[active] += items[P]
+        parent[active] = parent[P]
+        active = active[parent[active] >= 0]
+    return value
 
 
 def convert(path):
     """
     Parse and convert an SVG path command into a path representation
 
+    All commands are processed at once: implicit repetitions are expanded
+    into segments, relative coordinates are resolved from the current point
+    and vertices are written into arrays whose size is known in advance.
+
     Parameters
     ----------
     path : string
         A valid SVG path command
     """
 
-    # First we separate tokens inside the path
-    tokens = []
-    COMMANDS = set('MmZzLlHhVvCcSsQqTtAa')
-    COMMAND_RE = re.compile("([MmZzLlHhVvCcSsQqTtAa])")
-    FLOAT_RE = re.compile("[-+]?[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?")
-    for x in COMMAND_RE.split(path):
-        if x in COMMANDS:
-            tokens.append(x)
-        for token in FLOAT_RE.findall(x):
-            tokens.append(float(token))
-
-    # Then we process and convert commands
-    # (Note that not all commands have been implemented)
-    commands = { 'M': [MOVETO, 2],
-                 'm': [MOVETO, 2],
-                 'L': [LINETO, 2],
-                 'l': [LINETO, 2], 
-                 # 'V': [Path.LINETO, 1],
-                 # 'v': [Path.LINETO, 1],
-                 # 'H': [Path.LINETO, 1],
-                 # 'h': [Path.LINETO, 1], 
-                 'C': [CURVE4, 6],
-                 'c': [CURVE4, 6],
-                 # 'S': [Path.CURVE4, 4],
-                 # 's': [Path.CURVE4, 4],
-                 'Q': [CURVE3, 4],
-                 'q': [CURVE3, 4],
-                 # 'T': [Path.CURVE3, 2],
-                 # 't': [Path.CURVE3, 2],
-                 # 'A': [None,        7],
-                 # 'a': [None,        7],
-                 'Z': [CLOSE, 0],
-                 'z': [CLOSE, 0] }
-    index = 0
-    codes, verts = [], []
-    last_vertice = np.array([[0, 0]])
-    while index < len(tokens):
-        # Token is a command
-        # (else, we re-use last command because
-        #   SVG allows to omit command when it is the same as the last command)
-        if isinstance(tokens[index], str):
-            last_command = tokens[index]
-            code, n = commands[last_command]
-            index += 1
-        if n > 0:
-            vertices = np.array(tokens[index:index+n]).reshape(n//2,2)
-            if last_command.islower():
-                vertices += last_vertice
-            last_vertice = vertices[-1]
-            codes.extend([code,]*len(vertices))
-            verts.extend(vertices.tolist())
-            index += n
-        else:
-            codes.append(code)
-            verts.append(last_vertice.tolist())
+    commands, numbers, index = tokenize(path)
+    upper = commands & 0xdf
+    arity = _arity[upper]
+    if np.any(arity < 0):
+        c = chr(upper[arity < 0][0])
+        raise ValueError("Unsupported SVG path command '%s'" % c)
+
+    # Expand commands into segments
+    # (SVG allows to omit command when it is the same as the last command)
+    count = np.diff(np.append(index, len(numbers)))
+    repeat = np.where(arity > 0, count // np.maximum(arity, 1), 1)
+    if np.any(repeat*arity != count) or np.any(repeat == 0):
+        raise ValueError("Invalid number of parameters in SVG path")
+    n = repeat.sum()
+    S = np.repeat(np.arange(len(commands)), repeat)
+    segments = np.arange(n)
+    start = index[S] + (segments - (np.cumsum(repeat)-repeat)[S])*arity[S]
+    relative = (commands & 0x20)[S] > 0
+    kind = upper[S]
+    arity = arity[S]
+
+    # A 'M/m' followed by several vertices means implicit 'L/l'
+    # for subsequent vertices
+    moveto = kind == ord("M")
+    moveto[1:] &= S[1:] != S[:-1]
+    kind[(kind == ord("M")) & ~moveto] = ord("L")
+    close = kind == ord("Z")
+
+    # Position of the current point after each segment, knowing that closing
+    # a path moves the current point to the subpath start point and that
+    # horizontal and vertical lines keep one of the coordinates.
+    # Each axis is resolved separately if there are H/V since these are
+    # absolute on one axis only.
+    is_ = dict((c, kind == ord(c)) for c in COMMANDS.keys())
+    pairs = np.append(numbers, [0,0])
+    pairs = np.lib.stride_tricks.sliding_window_view(pairs, 2)
+    value = pairs[np.maximum(start + arity - 2, 0)]
+    value[close] = 0
+    parent = np.where(relative, segments-1, -1)
+    parent[close] = np.maximum.accumulate(np.where(moveto, segments, -1))[close]
+    parent = np.repeat(parent[:,np.newaxis], 2, axis=1)
+    if np.any(is_["H"]) or np.any(is_["V"]):
+        H, V = is_["H"], is_["V"]
+        value[H | V] = 0
+        value[H,0] = numbers[start[H]]
+        value[V,1] = numbers[start[V]]
+        parent[H,1] = segments[H]-1
+        parent[V,0] = segments[V]-1
+        cursor = np.stack([resolve(parent[:,0], value[:,0]),
+                           resolve(parent[:,1], value[:,1])], axis=1)
+    else:
+        cursor = resolve(parent[:,0], value)
+    before = np.zeros((n,2))
+    before[1:] = cursor[:-1]
+
+    # Arcs
+    npairs = _vertices[kind]
+    A = np.flatnonzero(is_["A"])
+    if len(A):
+        end = value[A] + (parent[A] == A[:,np.newaxis]-1)*before[A]
+        p = numbers[start[A,np.newaxis] + np.arange(5)]
+        arcs, offsets = bezier.elliptical_arc_batch(
+            before[A], p[:,:2], np.radians(p[:,2]), p[:,3] != 0, p[:,4] != 0, end)
+        npairs[A] = np.diff(offsets) - 1
+        # Intermediate vertices (without start and end points)
+        interior = np.ones(len(arcs), dtype=bool)
+        interior[offsets[:-1]] = interior[offsets[1:]-1] = False
+        arcs = arcs[interior]
+
+    # Vertices & codes
+    # Vertices are the parameters pairs (relative ones being relative to the
+    # current point), the last pair of a segment being its end point, except
+    # for the vertices computed below. End points are thus computed the same
+    # way as control points (instead of using cursor) such that coincident
+    # points are kept exactly coincident.
+    first = np.cumsum(npairs) - npairs
+    last = first + npairs - 1
+    src = np.repeat(start + arity - 2*(first + npairs), npairs)
+    src += 2*np.arange(len(src))
+    verts = pairs.take(src, axis=0, mode="clip")
+    verts += np.repeat(relative[:,np.newaxis]*before, npairs, axis=0)
+    codes = np.repeat(_codes[kind], npairs)
+    previous = np.zeros(n, dtype=kind.dtype)
+    previous[1:] = kind[:-1]
 
-        # A 'M/m' follows by several vertices means implicit 'L/l' for
-        # subsequent vertices
-        if last_command == 'm':
-            last_command, code = 'l', LINETO
-        elif last_command == 'M':
-            last_command, code = 'L', LINETO
+    P = np.flatnonzero(is_["H"] | is_["V"] | is_["A"])
+    verts[last[P]] = value[P] + (parent[P] == P[:,np.newaxis]-1)*before[P]
+    verts[first[close]] = before[close]
+    if len(A):
+        interior = np.repeat(is_["A"], npairs)
+        interior[last[A]] = False
+        verts[interior] = arcs
 
-    return np.array(verts), codes
+    # Smooth cubic: first control point is the reflection of the second
+    # control point of the previous command (if any)
+    if np.any(is_["S"]):
+        verts[first[is_["S"]]] = before[is_["S"]]
+        P = is_["S"] & ((previous == ord("C")) | (previous == ord("S")))
+        verts[first[P]] = 2*before[P] - verts[first[P]-2]
+
+    # Smooth quadratic: control point is the reflection of the control point
+    # of the previous command (if any). Since reflections may be chained,
+    # they are resolved all at once using alternate signs.
+    if np.any(is_["T"]):
+        P = is_["T"] & ((previous == ord("Q")) | (previous == ord("T")))
+        ctrl = before.copy()
+        ctrl[is_["Q"]] = verts[first[is_["Q"]]]
+        sign = np.where(segments % 2, -1.0, 1.0)[:,np.newaxis]
+        value = sign * ctrl
+        value[P] *= 2
+        ctrl = sign * resolve(np.where(P, segments-1, -1), value)
+        verts[first[is_["T"]]] = ctrl[is_["T"]]
+    return verts, codes
 
 
 def tesselate(verts, codes):
     """
     Tesselate a matplotlib path with the given vertices and codes.
 
+    All quadratic (resp. cubic) curves are flattened at once and resulting
+    vertices are scattered back into place using per item output counts.
+
     Parameters
     ----------
     vertices : array_like
@@ -140,34 +551,35 @@ def tesselate(verts, codes):
     codes : array_like
         n-length array integers representing the codes of the path.
     """
-    
-    tesselated_verts = []
-    tesselated_codes = []
-    index = 0 
-    while index < len(codes):
-        if codes[index] in [MOVETO, LINETO]:
-            tesselated_codes.append(codes[index])
-            tesselated_verts.append(verts[index])
-            index += 1
-        elif codes[index] == CURVE3:
-            p1, p2, p3 = verts[index-1:index+2]
-            V = bezier.quadratic(p1,p2,p3)
-            C = [LINETO,]*len(V)
-            tesselated_codes.extend(C[1:])
-            tesselated_verts.extend(V[1:])
-            index += 2
-        elif codes[index] == CURVE4:
-            p1, p2, p3, p4 = verts[index-1:index+3]
-            V = bezier.cubic(p1,p2,p3,p4)
-            C = [LINETO,]*len(V)
-            tesselated_codes.extend(C[1:])
-            tesselated_verts.extend(V[1:])
-            index += 3
-        elif codes[index] == CLOSE:
-            index += 1
-        else:
-            index += 1
 
-    verts = tesselated_verts
-    codes = tesselated_codes
-    return np.array(verts), codes
+    verts = np.asarray(verts, dtype=float).reshape(-1,2)
+    codes = np.asarray(codes)
+    index = np.arange(len(codes))
+
+    # Curves start every 2 (quadratic) or 3 (cubic) vertices inside a run of
+    # identical codes and use the previous vertex as first control point
+    first = np.ones(len(codes), dtype=bool)
+    first[1:] = codes[1:] != codes[:-1]
+    rank = index - np.maximum.accumulate(np.where(first, index, 0))
+    lines = (codes == MOVETO) | (codes == LINETO)
+    count = lines.astype(int)
+    curves = []
+    for code, n, flatten in [(CURVE3, 3, bezier.quadratic_batch),
+                             (CURVE4, 4, bezier.cubic_batch)]:
+        I = np.flatnonzero((codes == code) & (rank % (n-1) == 0) & (index > 0))
+        V, offsets = flatten(verts[I[:,np.newaxis] + np.arange(-1, n-1)])
+        # First vertex of each curve is the previous vertex
+        keep = np.ones(len(V), dtype=bool)
+        keep[offsets[:-1]] = False
+        count[I] = np.diff(offsets) - 1
+        curves.append((I, V[keep]))
+
+    offsets = np.cumsum(count) - count
+    tesselated_verts = np.empty((count.sum(), 2))
+    tesselated_codes = np.full(count.sum(), LINETO, dtype=np.uint8)
+    tesselated_verts[offsets[lines]] = verts[lines]
+    tesselated_codes[offsets[lines]] = codes[lines]
+    for I, V in curves:
+        J = np.repeat(offsets[I] - (np.cumsum(count[I]) - count[I]), count[I])
+        tesselated_verts[J + np.arange(len(V))] = V
+    return tesselated_verts, tesselated_codes
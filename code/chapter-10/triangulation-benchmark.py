@@ -0,0 +1,43 @@
+# -----------------------------------------------------------------------------
+# Python & OpenGL for Scientific Visualization
+# www.labri.fr/perso/nrougier/python+opengl
+# Copyright (c) 2018, Nicolas P. Rougier
+# Distributed under the 2-Clause BSD License.
+# -----------------------------------------------------------------------------
+# Compare the triangle package (constrained Delaunay triangulation) and the
+# vectorized ear clipping fallback (earclip) on star shaped outlines.
+# -----------------------------------------------------------------------------
+import timeit
+import numpy as np
+import earclip
+try:
+    import triangle
+except ImportError:
+    triangle = None
+
+def outline(n, noise=True):
+    T = np.linspace(0, 2*np.pi, n, endpoint=False)
+    R = 1 + 0.3*np.sin(37*T) + (0.1*np.sin(501*T) if noise else 0)
+    V = np.stack([R*np.cos(T), R*np.sin(T)], axis=1)
+    I = np.arange(n)
+    S = np.stack([I, (I+1) % n], axis=1)
+    return { 'vertices': V, 'segments': S }
+
+def area(T):
+    A, B, C = T["vertices"][T["triangles"]].transpose(1,0,2)
+    return 0.5*np.abs((B[:,0]-A[:,0])*(C[:,1]-A[:,1]) -
+                      (B[:,1]-A[:,1])*(C[:,0]-A[:,0])).sum()
+
+methods = [("earclip", lambda P: earclip.triangulate(P))]
+if triangle is not None:
+    methods.append(("triangle", lambda P: triangle.triangulate(P, "p")))
+
+for n in 1000, 10000, 100000:
+    for noise in False, True:
+        P = outline(n, noise)
+        for method, func in methods:
+            T = func(P)
+            duration = min(timeit.repeat(lambda: func(P), number=1, repeat=3))
+            print("%6d vertices (%-6s) %-9s: %6d triangles, area %.6f, %7.1f ms"
+                  % (n, "noisy" if noise else "smooth", method,
+                     len(T["triangles"]), area(T), 1000*duration))
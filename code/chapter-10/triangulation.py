@@ -0,0 +1,158 @@
+# -----------------------------------------------------------------------------
+# Python, OpenGL & Scientific Visualization
+# www.labri.fr/perso/nrougier/python+opengl
+# Copyright (c) 2018, Nicolas P. Rougier
+# Distributed under the 2-Clause BSD License.
+# -----------------------------------------------------------------------------
+# Polygon triangulation taking path codes (subpaths) and fill rule into account
+# -----------------------------------------------------------------------------
+import hashlib
+import collections
+import numpy as np
+import earclip
+from earclip import winding
+try:
+    import triangle
+except ImportError:
+    triangle = None
+
+MOVETO = 1
+LINETO = 2
+CLOSE  = 5
+
+EVENODD = "evenodd"
+NONZERO = "nonzero"
+
+# Cache of triangulated paths (least recently used ones are discarded first)
+maxsize = 256
+_cache = collections.OrderedDict()
+
+
+def contours(verts, codes=None):
+    """
+    Split a (tesselated) path into closed contours on MOVETO/CLOSE codes
+
+    Parameters
+    ----------
+    verts : array_like
+        The ``(n, 2)`` vertices of the path.
+
+    codes : array_like
+        n-length array integers representing the codes of the path. If None,
+        the path is made of a single contour.
+
+    Returns
+    -------
+    (vertices, segments) where vertices are the contour vertices (without
+    consecutive duplicates) and segments the ``(m, 2)`` indices of contour
+    edges. Each contour is closed by an edge from its last to its first
+    vertex.
+    """
+
+    verts = np.asarray(verts, dtype=float).reshape(-1,2)
+    if codes is None:
+        codes = np.full(len(verts), LINETO)
+        codes[:1] = MOVETO
+    codes = np.asarray(codes)
+
+    # Closing vertices are not part of the contour
+    keep = codes != CLOSE
+    start = np.ones(len(codes), dtype=bool)
+    start[1:] = (codes[1:] == MOVETO) | (codes[:-1] == CLOSE)
+    verts, start = verts[keep], start[keep]
+    if not len(verts):
+        return verts, np.zeros((0,2), dtype=int)
+    start[0] = True
+
+    # Remove consecutive duplicates inside a contour
+    same = np.zeros(len(verts), dtype=bool)
+    same[1:] = (verts[1:] == verts[:-1]).all(axis=1) & ~start[1:]
+    verts, start = verts[~same], start[~same]
+
+    # Remove last vertex of a contour when identical to the first one
+    first = np.flatnonzero(start)
+    last = np.append(first[1:], len(verts)) - 1
+    same = (verts[first] == verts[last]).all(axis=1) & (last > first)
+    keep = np.ones(len(verts), dtype=bool)
+    keep[last[same]] = False
+    verts, start = verts[keep], start[keep]
+
+    # Edges from each vertex to the next one in the same contour
+    first = np.flatnonzero(start)
+    count = np.diff(np.append(first, len(verts)))
+    index = np.arange(len(verts))
+    following = index + 1
+    following[first + count - 1] = first
+    segments = np.stack([index, following], axis=1)
+
+    # Contours with less than 3 vertices do not enclose anything
+    segments = segments[np.repeat(count >= 3, count)]
+    return verts, segments
+
+
+def triangulate(verts, codes=None, rule=EVENODD, cache=True):
+    """
+    Triangulate a (tesselated) path made of one or several contours
+
+    The constrained Delaunay triangulation of all contours is computed and
+    triangles are kept or discarded depending on the winding number of their
+    centroid such that holes and multiple subpaths are handled without any
+    stencil pass. When the triangle package is not available, contours are
+    triangulated using (vectorized) ear clipping, which requires contours
+    not to intersect each other.
+
+    Parameters
+    ----------
+    verts : array_like
+        The ``(n, 2)`` vertices of the path.
+
+    codes : array_like
+        n-length array integers representing the codes of the path. If None,
+        the path is made of a single contour.
+
+    rule : "evenodd" or "nonzero"
+        Fill rule
+
+    cache : bool
+        Whether to use the cache of triangulated paths
+
+    Returns
+    -------
+    (vertices, triangles) where triangles index vertices. Vertices start with
+    contour vertices (see `contours`) and may include additional vertices at
+    segment intersections.
+    """
+
+    if rule not in (EVENODD, NONZERO):
+        raise ValueError("Unknown fill rule '%s'" % rule)
+    verts = np.ascontiguousarray(verts, dtype=float).reshape(-1,2)
+    key = None
+    if cache:
+        key = hashlib.sha1(verts.tobytes())
+        if codes is not None:
+            key.update(np.ascontiguousarray(codes, dtype=np.int64).tobytes())
+        key.update(rule.encode())
+        key = key.hexdigest()
+        if key in _cache:
+            _cache.move_to_end(key)
+            V, I = _cache[key]
+            return V.copy(), I.copy()
+
+    V, S = contours(verts, codes)
+    if len(S) and triangle is None:
+        T = earclip.triangulate({'vertices': V, 'segments': S}, rule=rule)
+        I = T["triangles"]
+    elif len(S):
+        T = triangle.triangulate({'vertices': V, 'segments': S}, "pc")
+        V, I = T["vertices"], T["triangles"]
+        W = winding(V[I].mean(axis=1), V, S)
+        I = I[(W % 2 != 0) if rule == EVENODD else (W != 0)]
+    else:
+        I = np.zeros((0,3), dtype=int)
+
+    if cache:
+        _cache[key] = V, I
+        if len(_cache) > maxsize:
+            _cache.popitem(last=False)
+        V, I = V.copy(), I.copy()
+    return V, I
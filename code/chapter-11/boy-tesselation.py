@@ -39,7 +39,7 @@ def on_draw(dt):
     gl.glEnable(gl.GL_BLEND)
     gl.glDepthMask(gl.GL_FALSE)
     program["color"] = 0.0, 0.0, 0.0, 1.0
-    program.draw(gl.GL_LINES, indices)
+    program.draw(gl.GL_LINES, edges)
     gl.glDepthMask(gl.GL_TRUE)
     
 @window.event
@@ -53,45 +53,71 @@ def on_init():
     gl.glEnable(gl.GL_LINE_SMOOTH)
 
 def surface(func, umin=0, umax=np.pi, ucount=64,
-                  vmin=0, vmax=np.pi, vcount=64):
+                  vmin=0, vmax=np.pi, vcount=64, itype=np.uint32):
+    """
+    Tesselate a parametric surface
+
+    Parameters
+    ----------
+    func : callable
+        Function f(U,V) -> (X,Y,Z) evaluated on arrays of parameters.
+
+    umin, umax, ucount : float, float, int
+        Range and number of subdivisions along u
+
+    vmin, vmax, vcount : float, float, int
+        Range and number of subdivisions along v
+
+    itype : np.uint16 or np.uint32
+        Type of indices
+
+    Returns
+    -------
+    (vertices, indices, edges) where indices describe triangles and edges
+    describe lines, each edge of the mesh being used once.
+    """
+
     vtype = [('position', np.float32, 3)]
-    itype = np.uint32
     vcount += 1
     ucount += 1
     n = vcount*ucount
-    Un = np.repeat(np.linspace(0, 1, ucount, endpoint=True), vcount)
-    Vn = np.tile  (np.linspace(0, 1, vcount, endpoint=True), ucount)
-    U = umin+Un*(umax-umin)
-    V = vmin+Vn*(vmax-vmin)
+    if n > np.iinfo(itype).max + 1:
+        raise ValueError("Too many vertices (%d) for %s indices"
+                         % (n, np.dtype(itype).name))
+    Un = np.linspace(0, 1, ucount, endpoint=True)
+    Vn = np.linspace(0, 1, vcount, endpoint=True)
+    U = np.repeat(umin+Un*(umax-umin), vcount)
+    V = np.tile(vmin+Vn*(vmax-vmin), ucount)
     vertices = np.zeros(n, dtype=vtype)
-    for i,(u,v) in enumerate(zip(U,V)):
-        x,y,z = func(u,v)
-        vertices["position"][i] = x,y,z
-    indices = []
-    for i in range(ucount-1):
-        for j in range(vcount-1):
-            indices.append(i*(vcount) + j        )
-            indices.append(i*(vcount) + j+1      )
-            indices.append(i*(vcount) + j+vcount+1)
-            indices.append(i*(vcount) + j+vcount  )
-            indices.append(i*(vcount) + j+vcount+1)
-            indices.append(i*(vcount) + j        )
-    indices = np.array(indices, dtype=itype)
-    return vertices.view(gloo.VertexBuffer), indices.view(gloo.IndexBuffer)
+    vertices["position"] = np.stack(np.broadcast_arrays(*func(U,V)), axis=-1)
+
+    # Two triangles per quad
+    grid = np.arange(n, dtype=itype).reshape(ucount, vcount)
+    I = grid[:-1,:-1].ravel()
+    indices = np.stack([I, I+1, I+vcount+1,
+                        I+vcount, I+vcount+1, I], axis=1).ravel()
+
+    # Rows, columns and diagonals of the grid
+    edges = np.concatenate([
+        np.stack([grid[:,:-1].ravel(),  grid[:,1:].ravel()], axis=1),
+        np.stack([grid[:-1,:].ravel(),  grid[1:,:].ravel()], axis=1),
+        np.stack([grid[:-1,:-1].ravel(), grid[1:,1:].ravel()], axis=1)]).ravel()
+
+    return (vertices.view(gloo.VertexBuffer),
+            indices.view(gloo.IndexBuffer), edges.view(gloo.IndexBuffer))
 
 def boy(u, v):
-    from math import cos, sin, sqrt
-    s2 = sqrt(2)
-    cu, su = cos(u), sin(u)
-    cv, sv = cos(v), sin(v)
-    c2v, s2v = cos(2*v), sin(2*v)
-    s2u, s3v = sin(2*u), sin(3*v)
+    s2 = np.sqrt(2)
+    cu, su = np.cos(u), np.sin(u)
+    cv, sv = np.cos(v), np.sin(v)
+    c2v, s2v = np.cos(2*v), np.sin(2*v)
+    s2u, s3v = np.sin(2*u), np.sin(3*v)
     x = 2/3 * (cu * c2v + s2*su*cv) * cu/(s2-s2u*s3v)
     y = 2/3 * (cu * s2v - s2*su*sv) * cu/(s2-s2u*s3v)
     z = -s2*cu*cu/(s2-s2u*s3v)
     return x, y, z
 
-vertices, indices = surface(boy)
+vertices, indices, edges = surface(boy)
 program = gloo.Program(vertex, fragment)
 program.bind(vertices)
 view = np.eye(4, dtype=np.float32)